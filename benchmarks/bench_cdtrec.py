@@ -0,0 +1,55 @@
+"""
+基准：JSONL 与 cdtrec 二进制记录格式的写入、顺序读取与随机读取对比。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_cdtrec.py [对话数量]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSink, FileSource
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+def make_convs(n: int) -> list:
+    return [
+        Conversation(
+            [
+                Message("system", "You are a helpful assistant."),
+                Message("user", f"Question number {i}? " * 8),
+                Message("assistant", f"Answer number {i}. " * 32),
+            ],
+            meta={"id": i, "source": "bench"},
+        )
+        for i in range(n)
+    ]
+
+
+def timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+def main(n: int = 100_000) -> None:
+    convs = make_convs(n)
+    indices = random.Random(0).sample(range(n), min(n, 1000))
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("jsonl", "cdtrec"):
+            path = os.path.join(tmp, f"bench.{fmt}")
+            cfg = FileConfig(path=path, format=fmt, index=True)
+            timed(f"{fmt} write", lambda: FileSink(file_cfg=cfg).save(convs))
+            source = FileSource(file_cfg=cfg)
+            timed(f"{fmt} load", lambda: sum(1 for _ in source.load()))
+            src = FileSource(file_cfg=cfg)
+            timed(f"{fmt} open + len", src.count)
+            timed(f"{fmt} get_many(1000)", lambda: src.get_many(indices))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,67 @@
+"""
+基准：各 JSON 编解码器在对话数据形状上的 loads/dumps 吞吐量对比。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_codecs.py [对话数量]
+未安装的编解码器会被跳过。
+"""
+
+import gc
+import sys
+import time
+from typing import Any, Callable, Dict, List
+from chatbot_dataset_tools.connectors import get_codec
+
+CODECS = ("stdlib", "orjson", "msgspec", "ujson")
+
+
+def make_records(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "messages": [
+                {"role": "system", "content": "你是一个乐于助人的助手。", "metadata": {}},
+                {"role": "user", "content": f"Question {i}: " + "why? " * 20},
+                {"role": "assistant", "content": f"Answer {i}. " + "because. " * 60},
+            ],
+            "metadata": {"id": i, "source": "bench"},
+        }
+        for i in range(n)
+    ]
+
+
+def bench(func: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main(n: int = 50_000) -> None:
+    records = make_records(n)
+    lines = [get_codec("stdlib").dumps(r) for r in records]
+    size = sum(len(line) for line in lines) / 2**20
+    print(f"{n} conversations, {size:.1f} MiB as JSONL")
+    print(f"{'codec':<10} {'loads':>10} {'dumps':>10} {'loads MiB/s':>12}")
+
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name:<10} (not installed)")
+            continue
+        loads = bench(lambda: [codec.loads(line) for line in lines])
+        dumps = bench(lambda: [codec.dumps(r) for r in records])
+        print(
+            f"{name:<10} {loads * 1000:8.1f}ms {dumps * 1000:8.1f}ms "
+            f"{size / loads:12.1f}"
+        )
+    print(f"auto -> {get_codec('auto').name}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
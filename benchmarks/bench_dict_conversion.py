@@ -0,0 +1,87 @@
+"""
+微基准：逐条 from_dict/to_dict (原实现) 与批量 from_dicts/to_dicts 快速路径对比。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_dict_conversion.py [对话数量]
+"""
+
+import gc
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List
+from chatbot_dataset_tools.types import Conversation
+
+
+# --- 原实现：dataclass Message + Message(**m) + dataclasses.asdict ---
+
+
+@dataclass
+class LegacyMessage:
+    role: str
+    content: str = ""
+    metadata: dict = field(default_factory=dict)
+
+
+class LegacyConversation:
+    def __init__(self, data=[], meta: dict = {}):
+        self.data = list(data)
+        self.metadata = meta
+
+
+def legacy_from_dict(data: Dict[str, Any]) -> LegacyConversation:
+    messages = [LegacyMessage(**m) for m in list(data.get("messages", []))]
+    return LegacyConversation(messages, data.get("metadata", {}))
+
+
+def legacy_to_dict(conv: LegacyConversation) -> Dict[str, Any]:
+    return {"messages": [asdict(m) for m in conv.data], "metadata": conv.metadata}
+
+
+def make_records(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "messages": [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": f"question {i}"},
+                {"role": "assistant", "content": f"answer {i}"},
+                {"role": "user", "content": "thanks"},
+            ],
+            "metadata": {"id": i},
+        }
+        for i in range(n)
+    ]
+
+
+def bench(label: str, func, repeat: int = 3) -> float:
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    print(f"{label:<28} {best * 1000:8.1f} ms")
+    return best
+
+
+def main(n: int = 100_000) -> None:
+    records = make_records(n)
+    convs = Conversation.from_dicts(records)
+    legacy_convs = [legacy_from_dict(r) for r in records]
+    print(f"conversations: {n} x 4 messages")
+
+    slow = bench("from_dict (per record)", lambda: [legacy_from_dict(r) for r in records])
+    fast = bench("Conversation.from_dicts", lambda: Conversation.from_dicts(records))
+    print(f"{'speedup':<28} {slow / fast:8.2f} x")
+
+    slow = bench(
+        "to_dict (per record)", lambda: [legacy_to_dict(c) for c in legacy_convs]
+    )
+    fast = bench("Conversation.to_dicts", lambda: Conversation.to_dicts(convs))
+    print(f"{'speedup':<28} {slow / fast:8.2f} x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
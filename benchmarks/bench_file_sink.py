@@ -0,0 +1,65 @@
+"""
+基准：原 FileSink 写法 (逐条 json.dump + write("\\n")) 与分块编码 + 后台双缓冲写入对比。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_file_sink.py [对话数量]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSink
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+def make_conversations(n: int) -> List[Conversation]:
+    return [
+        Conversation(
+            [
+                Message("system", "You are a helpful assistant."),
+                Message("user", f"Question {i}? " * 10),
+                Message("assistant", f"Answer {i}. " * 40),
+            ],
+            meta={"id": i},
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_save_jsonl(path: str, convs: List[Conversation]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for conv in convs:
+            json.dump(conv.to_dict(), f)
+            f.write("\n")
+
+
+def bench(label: str, path: str, func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path) / 2**20
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  {size:7.1f} MiB")
+    return elapsed
+
+
+def main(n: int = 100_000) -> None:
+    convs = make_conversations(n)
+    print(f"{n} conversations")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.jsonl")
+        slow = bench("json.dump per record", path, lambda: legacy_save_jsonl(path, convs))
+
+        sink = FileSink(file_cfg=FileConfig(path=path, format="jsonl"))
+        fast = bench("FileSink (buffered)", path, lambda: sink.save(convs))
+        print(f"{'speedup':<28} {slow / fast:8.2f} x")
+
+        gz_path = path + ".gz"
+        gz_sink = FileSink(file_cfg=FileConfig(path=gz_path, format="jsonl"))
+        bench("FileSink (.gz, level 6)", gz_path, lambda: gz_sink.save(convs))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,70 @@
+"""
+基准：顺序解析 JSONL 与按字节分片的进程池并行解析对比。
+
+解码结果需要 pickle 传回主进程，只有标准库 json 解码明显慢于 pickle.loads
+(内容含大量转义/非 ASCII 字符) 时并行才有收益；orjson 等快速编解码器
+FileSource 会自动退回顺序解析。需要多个空闲核心才能看到加速。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_jsonl_parallel.py [对话数量] [进程数]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from chatbot_dataset_tools.config import config, FileConfig
+from chatbot_dataset_tools.connectors import FileSource
+
+
+def write_file(path: str, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            record = {
+                "messages": [
+                    {"role": "system", "content": "你是一个乐于助人的助手。"},
+                    {"role": "user", "content": f"第 {i} 个问题？\n" * 8},
+                    {"role": "assistant", "content": f"第 {i} 个\"回答\"。\n" * 32},
+                ],
+                "metadata": {"id": i},
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def bench(label: str, cfg: FileConfig) -> float:
+    start = time.perf_counter()
+    count = sum(1 for _ in FileSource(file_cfg=cfg).load())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:8.1f} ms  ({count} items)")
+    return elapsed
+
+
+def main(n: int = 200_000, workers: int = os.cpu_count() or 1) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.jsonl")
+        write_file(path, n)
+        size = os.path.getsize(path) / 2**20
+        print(f"file: {size:.1f} MiB, {n} conversations, {workers} workers")
+
+        base = FileConfig(path=path, format="jsonl", shard_size=4 * 2**20)
+        cases = [
+            ("stdlib", base.derive(codec="stdlib")),
+            (
+                "stdlib+fields",
+                base.derive(codec="stdlib", fields=("messages.role", "metadata.id")),
+            ),
+        ]
+        with config.switch(max_workers=workers):
+            for name, cfg in cases:
+                slow = bench(f"{name}: sequential", cfg)
+                fast = bench(f"{name}: parallel (ordered)", cfg.derive(parallel=True))
+                bench(
+                    f"{name}: parallel (unordered)",
+                    cfg.derive(parallel=True, ordered=False),
+                )
+                print(f"{name + ': speedup (ordered)':<34} {slow / fast:8.2f} x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,65 @@
+"""
+基准：ConcatDataset 逐个读取多个 FileSource 与 MultiFileSource 后台预取对比。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_multi_file.py [文件数] [每个文件的对话数]
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from chatbot_dataset_tools.connectors import FileSource, MultiFileSource
+from chatbot_dataset_tools.datasets import ConcatDataset, DatasetLoader
+
+
+def write_files(directory: str, files: int, n: int) -> None:
+    for part in range(files):
+        lines = []
+        for i in range(n):
+            record = {
+                "messages": [
+                    {"role": "user", "content": f"Question {part}-{i}? " * 8},
+                    {"role": "assistant", "content": f"Answer {part}-{i}. " * 32},
+                ]
+            }
+            lines.append(json.dumps(record))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with open(os.path.join(directory, f"part-{part:04d}.jsonl.gz"), "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6))
+
+
+def bench(label: str, make) -> float:
+    start = time.perf_counter()
+    count = sum(1 for _ in make())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  ({count} items)")
+    return elapsed
+
+
+def main(files: int = 50, n: int = 2_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        write_files(tmp, files, n)
+        paths = sorted(os.path.join(tmp, p) for p in os.listdir(tmp))
+        print(f"{files} gzip files x {n} conversations")
+
+        slow = bench(
+            "ConcatDataset",
+            lambda: ConcatDataset(
+                [DatasetLoader.from_source(FileSource(path=p)) for p in paths]
+            ),
+        )
+        fast = bench(
+            "MultiFileSource (ordered)", lambda: MultiFileSource(path=tmp).load()
+        )
+        bench(
+            "MultiFileSource (interleave)",
+            lambda: MultiFileSource(path=tmp, ordered=False, prefetch=4).load(),
+        )
+        print(f"{'speedup (ordered)':<28} {slow / fast:8.2f} x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
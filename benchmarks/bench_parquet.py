@@ -0,0 +1,61 @@
+"""
+基准：JSONL 与 Parquet 的加载速度、文件大小对比 (需要 pyarrow)。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_parquet.py [对话数量]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from chatbot_dataset_tools.connectors import (
+    FileSink,
+    FileSource,
+    ParquetSink,
+    ParquetSource,
+)
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+def make_convs(n: int) -> list:
+    return [
+        Conversation(
+            [
+                Message("system", "You are a helpful assistant."),
+                Message("user", f"Question number {i}? " * 8),
+                Message("assistant", f"Answer number {i}. " * 32),
+            ],
+            meta={"id": i, "source": "bench"},
+        )
+        for i in range(n)
+    ]
+
+
+def bench(label: str, source) -> float:
+    start = time.perf_counter()
+    count = sum(1 for _ in source.load())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:8.1f} ms  ({count} items)")
+    return elapsed
+
+
+def main(n: int = 100_000) -> None:
+    convs = make_convs(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = os.path.join(tmp, "bench.jsonl")
+        parquet = os.path.join(tmp, "bench.parquet")
+        FileSink(path=jsonl, format="jsonl").save(convs)
+        ParquetSink(path=parquet).save(convs)
+        for path in (jsonl, parquet):
+            size = os.path.getsize(path) / 2**20
+            print(f"{os.path.basename(path):<32} {size:8.1f} MiB")
+
+        slow = bench("jsonl", FileSource(path=jsonl, format="jsonl"))
+        fast = bench("parquet", ParquetSource(path=parquet))
+        for columns in [("messages",), ("messages.role",)]:
+            bench(f"parquet {columns}", ParquetSource(path=parquet, columns=columns))
+        print(f"{'speedup (all columns)':<32} {slow / fast:8.2f} x")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,79 @@
+"""
+内存基准：对比 slots 版 Message/MessageList/Conversation 与原 dataclass 实现。
+
+运行 (需先 pip install -e .)：python benchmarks/bench_types_memory.py [对话数量]
+"""
+
+import sys
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from chatbot_dataset_tools.types import Message, Conversation
+
+
+# --- 原实现 (dataclass + __dict__ + 每条消息一个空 metadata 字典) ---
+
+
+@dataclass
+class LegacyMessage:
+    role: str
+    content: str = ""
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class LegacyMessageList:
+    messages: List[LegacyMessage]
+
+    def __init__(self, msgs=[]):
+        self.messages = list(msgs)
+
+
+@dataclass
+class LegacyConversation:
+    data: LegacyMessageList
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __init__(self, data=[], meta: dict = {}):
+        self.data = LegacyMessageList(data)
+        self.metadata = meta
+        self._cached_uid = None
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    objs = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return current
+
+
+def main(n: int = 100_000) -> None:
+    # 内容字符串在两侧共享，只比较容器本身的开销
+    contents = [f"message content {i}" for i in range(4)]
+    roles = ["system", "user", "assistant", "user"]
+
+    legacy = _measure(
+        lambda: [
+            LegacyConversation([LegacyMessage(r, c) for r, c in zip(roles, contents)])
+            for _ in range(n)
+        ]
+    )
+    slotted = _measure(
+        lambda: [
+            Conversation([Message(r, c) for r, c in zip(roles, contents)])
+            for _ in range(n)
+        ]
+    )
+
+    print(f"conversations: {n} x {len(roles)} messages")
+    print(f"legacy dataclass : {legacy / n:8.1f} B/conv  ({legacy / 2**20:.1f} MiB)")
+    print(f"slotted          : {slotted / n:8.1f} B/conv  ({slotted / 2**20:.1f} MiB)")
+    print(f"saving           : {1 - slotted / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
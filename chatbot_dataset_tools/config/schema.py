@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field, replace, fields
-from typing import Dict, Any, Optional, List, TypeVar, Type
+from typing import Dict, Any, Optional, List, Tuple, TypeVar, Type
 from pathlib import Path
 
 T = TypeVar("T", bound="BaseConfig")
@@ -37,6 +37,36 @@ class FileConfig(BaseConfig):
     format: str = "jsonl"
     encoding: str = "utf-8"
     indent: int = 2
+    # JSON 编解码器：auto (orjson > msgspec > ujson > stdlib) 或指定名称
+    codec: str = "auto"
+    # 压缩格式：auto (按扩展名 .gz/.bz2/.xz 识别) / none / gzip / bz2 / xz
+    compression: str = "auto"
+    compression_level: Optional[int] = None  # None 表示使用各格式的默认级别
+    # ShardedFileSink 分片上限 (0 表示不限制)：记录数 / 编码后压缩前的字节数
+    shard_max_records: int = 0
+    shard_max_bytes: int = 0
+    # FileSink 写缓冲区大小：攒满后整块交给后台线程写盘
+    write_buffer_size: int = 4 * 2**20
+    # 超过该字节数的 JSON 数组文件改为增量流式解析，不再整体读入内存
+    json_stream_threshold: int = 64 * 2**20
+    # JSONL 偏移索引：写入 <path>.idx 侧车文件，支持 O(1) 的长度/随机读取/采样/切分
+    index: bool = False
+    # JSONL 并行解析：按换行对齐的字节区间分片，在进程池中解码 (进程数取 proc.max_workers)
+    # 只在 codec="stdlib"、内容含大量转义/非 ASCII 字符且有多个空闲核心时有收益；
+    # 快速编解码器 (orjson/msgspec/ujson) 退回顺序解析
+    parallel: bool = False
+    ordered: bool = True  # False 时按分片完成顺序产出，吞吐量更高
+    shard_size: int = 16 * 2**20  # 每个分片的目标字节数
+    # 加载时的字段投影，例如 ("messages.role", "metadata.source")；None 表示完整读取
+    fields: Optional[Tuple[str, ...]] = None
+    # Parquet：每个 row group 的对话数 (读取时也按此行数分批解码)、文件内压缩格式
+    row_group_size: int = 64 * 1024
+    parquet_compression: str = "zstd"
+    # Parquet 只读取的列：messages / messages.role / messages.content /
+    # messages.metadata / metadata，None 表示全部读取
+    columns: Optional[Tuple[str, ...]] = None
+    # MultiFileSource 同时在后台读取的文件数；ordered=False 时各文件按批次交错产出
+    prefetch: int = 2
 
 
 @dataclass(frozen=True)
@@ -50,6 +80,32 @@ class HTTPConfig(BaseConfig):
         default_factory=lambda: ["data"]
     )  # 用于定位 JSON 响应中对话列表的键
     timeout: int = 60
+    codec: str = "auto"  # 请求/响应体的 JSON 编解码器，同 FileConfig.codec
+    fields: Optional[Tuple[str, ...]] = None  # 加载时的字段投影，同 FileConfig.fields
+    # 响应格式：auto (按 Content-Type 识别 NDJSON) / json / ndjson (每行一条对话)
+    response_format: str = "auto"
+    # 流式解码：边接收边解析并产出，不等待完整响应体 (作用于 none/link 分页)
+    stream: bool = False
+    # 分页：none / offset (offset+limit) / page (页码+limit) / cursor / link (Link 头)
+    pagination: str = "none"
+    page_size: int = 100  # 每页条数，通过 limit_param 传给服务端
+    limit_param: str = "limit"
+    offset_param: str = "offset"
+    page_param: str = "page"
+    first_page: int = 1  # page 模式的起始页码
+    cursor_param: str = "cursor"
+    # 响应中下一页游标的位置 (与 data_path 写法相同)，为空/缺失表示没有下一页
+    cursor_path: List[str] = field(default_factory=lambda: ["next_cursor"])
+    max_pages: int = 0  # 最多请求的页数，0 表示不限制
+    # offset/page 模式同时在途的页数 (共用一个连接池)，内存占用以此为上界
+    page_concurrency: int = 4
+    # HTTPSink 分块上传：每个请求最多的记录数 / 请求体字节数，均为 0 时整体一次发送
+    upload_records: int = 0
+    upload_bytes: int = 0
+    upload_concurrency: int = 4  # 同时在途的上传请求数 (共用一个连接池)
+    # 失败分块 (网络错误、429、5xx) 的重试次数；第 n 次重试前等待 backoff * 2**(n-1) 秒
+    upload_retries: int = 3
+    upload_backoff: float = 0.5
 
 
 @dataclass(frozen=True)
@@ -81,6 +137,16 @@ class DatasetDefaults(BaseConfig):
         }
     )
     msg_sep: str = "\n"
+    # 内容 UID 的指纹算法：sha256 / sha256-legacy (与旧版 UID 一致) / blake2b-64 / int64
+    fingerprint: str = "sha256"
+    # 字符串驻留 (opt-in)：角色总是驻留，内容重复达到阈值后进入有界池
+    intern_strings: bool = False
+    intern_threshold: int = 2
+    intern_pool_size: int = 65536
+    # token 计数所用的分词器：whitespace / bytes / regex 或自行注册的实现
+    tokenizer: str = "whitespace"
+    # Dataset.cache() 未指定路径时的缓存目录，空字符串表示系统临时目录下的子目录
+    cache_dir: str = ""
 
 
 @dataclass(frozen=True)
@@ -1,6 +1,10 @@
 from . import traits
 from .base import DataSource, DataSink
+from .codec import BaseCodec, get_codec
 from .file import FileSource, FileSink
+from .sharded import ShardedFileSink
+from .multi_file import MultiFileSource
+from .parquet import ParquetSource, ParquetSink
 from .http import HTTPSource, HTTPSink
 
 __version__ = "0.8.5"
@@ -8,8 +12,14 @@ __all__ = [
     "traits",
     "DataSource",
     "DataSink",
+    "BaseCodec",
+    "get_codec",
     "FileSource",
     "FileSink",
+    "ShardedFileSink",
+    "MultiFileSource",
+    "ParquetSource",
+    "ParquetSink",
     "HTTPSource",
     "HTTPSink",
 ]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, Iterable, TypeVar, Generic
+from typing import Iterator, Iterable, Optional, TypeVar, Generic
 from chatbot_dataset_tools.types import Conversation
 
 T = TypeVar("T", bound=Conversation)
@@ -9,6 +9,10 @@ class DataSource(Generic[T], ABC):
     @abstractmethod
     def load(self) -> Iterator[T]: ...
 
+    def fingerprint(self) -> Optional[str]:
+        """数据内容的指纹 (用于缓存键)，无法确定时返回 None"""
+        return None
+
 
 class DataSink(Generic[T], ABC):
     @abstractmethod
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import queue
+import threading
+from typing import Any, BinaryIO, Optional
+
+
+class BackgroundWriter:
+    """
+    双缓冲写入器：调用方把编码好的字节追加到内存缓冲区，缓冲区满 buffer_size
+    后整体交给后台 I/O 线程写入底层文件，同时调用方继续填充新的缓冲区。
+
+    底层文件 (包括压缩流) 的 write 在后台线程执行，写盘/压缩与 JSON 编码因此可以重叠。
+    后台写入出错时，异常会在下一次 write() 或 close() 时重新抛出。
+    """
+
+    def __init__(self, f: BinaryIO, buffer_size: int = 4 * 2**20):
+        self._f = f
+        self._size = max(1, buffer_size)
+        self._buf = bytearray()
+        # 最多一个缓冲区排队等待写入，再加上正在写入与正在填充的，内存上界约为 3 个缓冲区
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self.bytes_written = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="file-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            buf = self._queue.get()
+            if buf is None:
+                return
+            if self._error is not None:
+                continue  # 出错后丢弃剩余数据，只需把队列消费完
+            try:
+                self._f.write(buf)
+            except BaseException as e:
+                self._error = e
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _flush_buffer(self) -> None:
+        if self._buf:
+            self._queue.put(self._buf)
+            self._buf = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._raise_error()
+        self._buf += data
+        self.bytes_written += len(data)
+        if len(self._buf) >= self._size:
+            self._flush_buffer()
+        return len(data)
+
+    def close(self) -> None:
+        """写出剩余数据并等待后台线程结束 (不会关闭底层文件)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_buffer()
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> BackgroundWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
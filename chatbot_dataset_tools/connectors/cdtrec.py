@@ -0,0 +1,183 @@
+from __future__ import annotations
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# 文件布局 (所有整数均为小端)：
+#   "CDTREC1\0"
+#   记录区：每条记录为 uint32 长度 + marshal 载荷
+#           (role_ids, contents, 消息 metadata 或 None, 对话 metadata 或 None)
+#   角色表：marshal 编码的角色字符串列表，role_ids 即该表下标
+#   索引：  count + 1 个 uint64，第 i 条记录位于 [offsets[i], offsets[i + 1])
+#   文件尾：角色表偏移 + 索引偏移 + 记录数 + "CDTEND1\0"
+_MAGIC = b"CDTREC1\0"
+_END_MAGIC = b"CDTEND1\0"
+_FOOTER = struct.Struct("<QQQ8s")
+_LENGTH = struct.Struct("<I")
+# marshal 格式版本 4 自 Python 3.4 起保持不变
+_MARSHAL_VERSION = 4
+
+
+class CdtrecWriter:
+    """
+    顺序写入 cdtrec 文件：逐条写出记录，close() 时追加角色表、偏移索引与文件尾。
+    f 只需支持 write (例如 BackgroundWriter)，写入过程中不需要 seek。
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._pos = 0
+        self._offsets = array("Q")
+        self._roles: Dict[str, int] = {}
+        self._write(_MAGIC)
+
+    def _write(self, data: bytes) -> None:
+        self._f.write(data)
+        self._pos += len(data)
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        """写入一条对话字典 (与 to_dict() 的结构相同)"""
+        roles = self._roles
+        role_ids: List[int] = []
+        contents: List[str] = []
+        metas: List[Optional[dict]] = []
+        for m in record.get("messages", ()):
+            role = m["role"]
+            rid = roles.get(role)
+            if rid is None:
+                rid = roles[role] = len(roles)
+            role_ids.append(rid)
+            contents.append(m.get("content", ""))
+            metas.append(m.get("metadata") or None)
+
+        payload = marshal.dumps(
+            (
+                tuple(role_ids),
+                tuple(contents),
+                tuple(metas) if any(metas) else None,
+                record.get("metadata") or None,
+            ),
+            _MARSHAL_VERSION,
+        )
+        self._offsets.append(self._pos)
+        self._write(_LENGTH.pack(len(payload)))
+        self._write(payload)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self) -> None:
+        """写出角色表、索引与文件尾 (不会关闭 f)"""
+        count = len(self._offsets)
+        roles_offset = self._pos
+        self._write(marshal.dumps(list(self._roles), _MARSHAL_VERSION))
+
+        offsets = array("Q", self._offsets)
+        offsets.append(roles_offset)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        index_offset = self._pos
+        self._write(offsets.tobytes())
+        self._write(_FOOTER.pack(roles_offset, index_offset, count, _END_MAGIC))
+
+
+class CdtrecFile:
+    """
+    通过 mmap 读取 cdtrec 文件：打开时只读取文件尾、角色表与索引，
+    len() 为 O(1)，任意下标的记录只解码其自身的字节区间，不经过 JSON 解析。
+
+    载荷使用 marshal 编码，只应读取自己写出的可信文件 (用于中间结果落盘)。
+    接口与 JsonlIndex 保持一致 (span / records / is_stale / close)。
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        st = os.stat(path)
+        self._stat_key_value = (st.st_size, st.st_mtime_ns)
+        if st.st_size < len(_MAGIC) + _FOOTER.size:
+            raise ValueError(f"Not a cdtrec file: {path}")
+
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+
+        roles_offset, index_offset, count, end_magic = _FOOTER.unpack(
+            self._view[-_FOOTER.size :]
+        )
+        if self._view[: len(_MAGIC)] != _MAGIC or end_magic != _END_MAGIC:
+            self.close()
+            raise ValueError(f"Not a cdtrec file (or truncated): {path}")
+
+        self.roles: List[str] = marshal.loads(self._view[roles_offset:index_offset])
+        index = self._view[index_offset : index_offset + 8 * (count + 1)]
+        if sys.byteorder == "little":
+            self._offsets: Any = index.cast("Q")
+        else:
+            self._offsets = array("Q", index)
+            self._offsets.byteswap()
+        self._index_view = index
+
+    def is_stale(self) -> bool:
+        """文件在打开后是否被修改过"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (st.st_size, st.st_mtime_ns) != self._stat_key_value
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def span(self, i: int) -> Tuple[int, int]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("cdtrec record index out of range")
+        return self._offsets[i], self._offsets[i + 1]
+
+    def record(self, i: int) -> Dict[str, Any]:
+        """解码第 i 条记录为对话字典"""
+        start, end = self.span(i)
+        role_ids, contents, metas, metadata = marshal.loads(
+            self._view[start + _LENGTH.size : end]
+        )
+        roles = self.roles
+        messages = [
+            {"role": roles[r], "content": c} for r, c in zip(role_ids, contents)
+        ]
+        if metas is not None:
+            for m, meta in zip(messages, metas):
+                if meta:
+                    m["metadata"] = meta
+        return {"messages": messages, "metadata": metadata}
+
+    def records(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.record(i) for i in indices]
+
+    def close(self) -> None:
+        if getattr(self, "_index_view", None) is not None:
+            if isinstance(self._offsets, memoryview):
+                self._offsets.release()
+            self._index_view.release()
+            self._index_view = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None  # type: ignore[assignment]
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None  # type: ignore[assignment]
+
+    def __enter__(self) -> CdtrecFile:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<CdtrecFile {self.path} ({len(self)} records, roles={self.roles})>"
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Union
+from .projection import Projection
+from chatbot_dataset_tools.registry import register_codec, codecs
+from chatbot_dataset_tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class BaseCodec(ABC):
+    """
+    JSON 编解码器，全程以 bytes 为单位工作。
+
+    - loads 接受 bytes 或 str；解析失败统一抛出 ValueError (json.JSONDecodeError 是其子类)。
+    - dumps 返回 UTF-8 编码的 bytes，非 ASCII 字符原样输出 (ensure_ascii=False)。
+    """
+
+    name: str = ""
+    # 解码不慢于 pickle.loads：并行解析 JSONL 时结果要 pickle 传回主进程，
+    # 这类编解码器在子进程中解码不会更快，并行解析时退回顺序解析
+    fast_decode: bool = False
+
+    @abstractmethod
+    def loads(self, data: bytes | str) -> Any: ...
+
+    @abstractmethod
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes: ...
+
+    def record_loader(
+        self, projection: Optional[Projection] = None
+    ) -> Callable[[bytes | str], Any]:
+        """
+        返回解码单条对话记录的函数。指定投影时只保留选中的字段；
+        默认实现先完整解码再裁剪，支持按类型解码的实现可以直接跳过未选中的部分。
+        """
+        if projection is None:
+            return self.loads
+        loads, apply = self.loads, projection.apply
+        return lambda data: apply(loads(data))
+
+
+@register_codec("stdlib")
+class StdlibCodec(BaseCodec):
+    """标准库 json，始终可用"""
+
+    name = "stdlib"
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=indent).encode("utf-8")
+
+
+@register_codec("orjson")
+class OrjsonCodec(BaseCodec):
+    """orjson：最快的通用实现；仅支持 2 空格缩进，其它缩进退回标准库"""
+
+    name = "orjson"
+    fast_decode = True
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes:
+        # 与标准库一致：int/float/bool/None 等非字符串键转换为字符串
+        option = self._orjson.OPT_NON_STR_KEYS
+        if not indent:
+            return self._orjson.dumps(obj, option=option)
+        if indent == 2:
+            return self._orjson.dumps(obj, option=option | self._orjson.OPT_INDENT_2)
+        return StdlibCodec.dumps(self, obj, indent)
+
+
+@register_codec("msgspec")
+class MsgspecCodec(BaseCodec):
+    name = "msgspec"
+    fast_decode = True
+
+    def __init__(self):
+        import msgspec
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def record_loader(
+        self, projection: Optional[Projection] = None
+    ) -> Callable[[bytes | str], Any]:
+        """
+        按投影生成的结构体类型解码：未选中的字段只做语法校验，不会构造 Python 对象。
+        记录不符合预期结构 (例如 metadata 是字符串) 时退回完整解码后再裁剪，
+        结果与其它编解码器一致。
+        """
+        if projection is None:
+            return self.loads
+        msgspec = self._msgspec
+        decoder = msgspec.json.Decoder(_projected_type(msgspec, projection))
+        to_builtins = msgspec.to_builtins
+        generic = super().record_loader(projection)
+
+        def loads(data: bytes | str) -> Any:
+            try:
+                return to_builtins(decoder.decode(data))
+            except msgspec.ValidationError as e:
+                try:
+                    return generic(data)
+                except Exception:
+                    # 通用路径同样无法处理 (例如消息缺少 role)
+                    raise ValueError(str(e)) from e
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+
+        return loads
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes:
+        buf = self._encoder.encode(obj)
+        if indent:
+            buf = self._msgspec.json.format(buf, indent=indent)
+        return buf
+
+
+def _projected_type(msgspec, projection: Projection) -> Any:
+    """根据投影构造 msgspec 结构体类型；转换回字典时省略默认值 (即未出现的字段)"""
+
+    def meta_type(name: str, keys) -> Any:
+        if keys is None:
+            return Any
+        # JSON 键不一定是合法标识符，结构体字段使用占位名并通过 rename 映射
+        fields = [(f"k{i}", Any, msgspec.UNSET) for i in range(len(keys))]
+        rename = {f"k{i}": key for i, key in enumerate(keys)}
+        return Optional[msgspec.defstruct(name, fields, rename=rename)]
+
+    def struct(name: str, fields: List[tuple]) -> Any:
+        return msgspec.defstruct(name, fields, omit_defaults=True)
+
+    message_fields: List[tuple] = [("role", Any)]
+    if projection.has_content:
+        message_fields.append(("content", Any, ""))
+    if projection.has_message_meta:
+        meta = meta_type("MessageMeta", projection.message_meta_keys)
+        message_fields.append(("metadata", meta, None))
+    message = struct("ProjectedMessage", message_fields)
+
+    conv_fields: List[tuple] = []
+    if projection.has_messages:
+        conv_fields.append(("messages", List[message], msgspec.field(default_factory=list)))
+    if projection.has_meta:
+        conv_fields.append(("metadata", meta_type("Meta", projection.meta_keys), None))
+    conversation = struct("ProjectedConversation", conv_fields)
+    # 与 from_dict 一致：也接受单纯的消息列表 (未选中消息时交给通用路径，结果为空对话)
+    if not projection.has_messages:
+        return conversation
+    return Union[conversation, List[message]]
+
+
+@register_codec("ujson")
+class UjsonCodec(BaseCodec):
+    name = "ujson"
+    fast_decode = True
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes:
+        text = self._ujson.dumps(obj, ensure_ascii=False, indent=indent or 0)
+        return text.encode("utf-8")
+
+
+def record_codec(
+    name: Optional[str], projection: Optional[Projection] = None
+) -> BaseCodec:
+    """
+    选择解码对话记录的编解码器：指定了投影且 name 为 auto 时优先使用 msgspec
+    (按类型解码可直接跳过未选中的字段)，其余情况同 get_codec
+    """
+    if projection is not None and (name or "auto") == "auto":
+        try:
+            return get_codec("msgspec")
+        except ImportError:
+            pass
+    return get_codec(name)
+
+
+# codec="auto" 时按此顺序选择第一个已安装的实现
+AUTO_ORDER = ("orjson", "msgspec", "ujson", "stdlib")
+
+_INSTANCES: Dict[str, BaseCodec] = {}
+
+
+def get_codec(name: Optional[str] = None) -> BaseCodec:
+    """
+    获取编解码器实例。name 为 None 或 "auto" 时自动选择已安装的最快实现；
+    显式指定了未安装的实现时抛出 ImportError。
+    """
+    name = name or "auto"
+    codec = _INSTANCES.get(name)
+    if codec is not None:
+        return codec
+
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            try:
+                codec = get_codec(candidate)
+                break
+            except ImportError:
+                continue
+        logger.debug(f"Auto-selected JSON codec: {codec.name}")
+    else:
+        codec = codecs.get(name)()
+
+    _INSTANCES[name] = codec
+    return codec
@@ -0,0 +1,155 @@
+from __future__ import annotations
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+# 扩展名 -> 压缩格式
+EXTENSIONS: Dict[str, str] = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".lzma": "xz",
+}
+
+# 未指定 compression_level 时使用的默认级别 (gzip 默认的 9 太慢，这里取 6)
+DEFAULT_LEVELS: Dict[str, int] = {"gzip": 6, "bz2": 9, "xz": 6}
+
+_READERS: Dict[str, Callable[[Any], BinaryIO]] = {
+    "gzip": lambda path: gzip.open(path, "rb"),
+    "bz2": lambda path: bz2.open(path, "rb"),
+    "xz": lambda path: lzma.open(path, "rb"),
+}
+
+_WRITERS: Dict[str, Callable[[Any, int], BinaryIO]] = {
+    "gzip": lambda path, level: gzip.open(path, "wb", compresslevel=level),
+    "bz2": lambda path, level: bz2.open(path, "wb", compresslevel=level),
+    "xz": lambda path, level: lzma.open(path, "wb", preset=level),
+}
+
+READ_SIZE = 1 << 20
+
+
+def detect_compression(
+    path: str | Path, setting: Optional[str] = "auto"
+) -> Optional[str]:
+    """
+    解析压缩格式：setting 为 "auto" 时按扩展名识别，"none"/空值表示不压缩，
+    其它值必须是 gzip / bz2 / xz 之一。返回 None 表示不压缩。
+    """
+    if not setting or setting == "none":
+        return None
+    if setting == "auto":
+        return EXTENSIONS.get(Path(path).suffix.lower())
+    if setting not in _READERS:
+        raise ValueError(
+            f"Unsupported compression '{setting}'. "
+            f"Available: {['auto', 'none', *_READERS]}"
+        )
+    return setting
+
+
+class _ThreadedReader(io.RawIOBase):
+    """
+    在后台线程中读取 (解压) 底层流，通过有界队列把数据块交给消费者。
+    zlib/bz2/lzma 解压时会释放 GIL，因此解压可以与 JSON 解析真正重叠。
+    """
+
+    _EOF = object()
+
+    def __init__(self, raw: BinaryIO, chunk_size: int = READ_SIZE, depth: int = 4):
+        super().__init__()
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._pending = memoryview(b"")
+        self._eof = False
+
+        self._thread = threading.Thread(
+            target=self._produce, name="decompress", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            while True:
+                chunk = self._raw.read(self._chunk_size)
+                if not chunk:
+                    break
+                if not self._put(chunk):
+                    return
+        except BaseException as e:
+            self._error = e
+        self._put(self._EOF)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is self._EOF:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+                return 0
+            self._pending = memoryview(item)
+
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # 清空队列，让阻塞在 put 上的生产者尽快退出
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._raw.close()
+        super().close()
+
+
+def open_read(
+    path: str | Path, compression: Optional[str], threaded: bool = True
+) -> BinaryIO:
+    """以二进制模式打开文件；压缩文件会被透明解压 (默认在后台线程中进行)"""
+    if compression is None:
+        return open(path, "rb")
+    raw = _READERS[compression](path)
+    if not threaded:
+        return raw
+    reader = io.BufferedReader(_ThreadedReader(raw), buffer_size=1 << 16)
+    return reader  # type: ignore[return-value]
+
+
+def open_write(
+    path: str | Path, compression: Optional[str], level: Optional[int] = None
+) -> BinaryIO:
+    """以二进制模式打开待写文件；指定压缩格式时流式压缩写入"""
+    if compression is None:
+        return open(path, "wb")
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+    return _WRITERS[compression](path, level)
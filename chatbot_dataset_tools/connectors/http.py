@@ -1,6 +1,11 @@
+import time
 import httpx
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import (
     Any,
+    Deque,
     Iterable,
     Iterator,
     Optional,
@@ -9,17 +14,26 @@ from typing import (
     Union,
     Sequence,
     Mapping,
+    Tuple,
     Type,
 )
 from .base import T, DataSource, DataSink
-from .traits import FromDictType, ToDictType
-from chatbot_dataset_tools.types import Conversation
+from .traits import FromDictType, ToDictType, from_dicts, to_dicts
+from .codec import BaseCodec, get_codec
+from .projection import Projection
+from .json_stream import iter_byte_lines, iter_json_path, iter_text_chunks
+from chatbot_dataset_tools.types import Conversation, get_intern_pool
 from chatbot_dataset_tools.config import HTTPConfig, config
 from chatbot_dataset_tools.registry import register_source, register_sink
-from chatbot_dataset_tools.utils import get_logger
+from chatbot_dataset_tools.utils import get_logger, chunked
 
 logger = get_logger(__name__)
 
+PAGINATIONS = ("none", "offset", "page", "cursor", "link")
+RESPONSE_FORMATS = ("auto", "json", "ndjson")
+# auto 模式下按 Content-Type 识别为 NDJSON 的关键字
+_NDJSON_TYPES = ("ndjson", "jsonl", "jsonlines")
+
 
 @register_source()
 class HTTPSource(DataSource[T]):
@@ -42,52 +56,305 @@ class HTTPSource(DataSource[T]):
         self.json_data = self.http_cfg.json_data
         self.data_path = self.http_cfg.data_path
         self.timeout = self.http_cfg.timeout
+        self.codec: BaseCodec = get_codec(self.http_cfg.codec)
+        # 字段投影 (http.fields)，None 表示读取完整记录
+        self.projection = Projection.parse(self.http_cfg.fields)
+        # 未开启 ds.intern_strings 时为 None
+        self.intern_pool = get_intern_pool()
+        # 批量构造对话时的分块大小
+        self.batch_size = config.current.settings.proc.batch_size
+        self.pagination = self.http_cfg.pagination.lower()
+        if self.pagination not in PAGINATIONS:
+            raise ValueError(
+                f"Unsupported pagination '{self.http_cfg.pagination}'. "
+                f"Available: {list(PAGINATIONS)}"
+            )
+        self.page_size = max(1, self.http_cfg.page_size)
+        self.response_format = self.http_cfg.response_format.lower()
+        if self.response_format not in RESPONSE_FORMATS:
+            raise ValueError(
+                f"Unsupported response_format '{self.http_cfg.response_format}'. "
+                f"Available: {list(RESPONSE_FORMATS)}"
+            )
+        self.stream = self.http_cfg.stream
+
+    def _build_many(self, records: List[Any]) -> List[T]:
+        if self.projection is not None:
+            records = self.projection.apply_many(records)
+        if self.intern_pool is not None:
+            for raw in records:
+                self.intern_pool.intern_record(raw)
+        return from_dicts(self.conv_type, records)
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        请求本身 (URL、方法、参数与请求体) 的指纹。无法察觉服务端数据的变化，
+        远端内容更新后需要换一个缓存路径或删除缓存。请求头 (可能含凭据) 不参与计算。
+        """
+        return repr(
+            (
+                type(self).__name__,
+                self.url,
+                self.method.upper(),
+                self.params,
+                self.json_data,
+                list(self.data_path),
+                self.http_cfg.fields,
+                self.pagination,
+                self.page_size,
+                self.response_format,
+                self.http_cfg.max_pages,
+                self.conv_type.__qualname__,
+            )
+        )
 
     def load(self) -> Iterator[T]:
-        logger.info(f"Fetching data from {self.url} (method={self.method})")
+        logger.info(
+            f"Fetching data from {self.url} "
+            f"(method={self.method}, pagination={self.pagination})"
+        )
 
         try:
             with httpx.Client(timeout=self.timeout) as cli:
-                resp = cli.request(
-                    method=self.method,
-                    url=self.url,
-                    params=self.params,
-                    headers=self.headers,
-                    json=self.json_data,
+                count = pages = 0
+                for records in self._iter_pages(cli):
+                    pages += 1
+                    for chunk in chunked(records, self.batch_size):
+                        count += len(chunk)
+                        yield from self._build_many(chunk)
+
+                logger.info(f"Parsed {count} items from {pages} HTTP response(s)")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP Error {e.response.status_code} for {e.request.url}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to load from HTTP: {e}")
+            raise
+
+    # --- 请求与分页 ---
+
+    def _request(
+        self, cli: httpx.Client, url: str, params: Optional[Dict]
+    ) -> httpx.Response:
+        resp = cli.request(
+            method=self.method,
+            url=url,
+            params=params,
+            headers=self.headers,
+            json=self.json_data,
+        )
+        resp.raise_for_status()
+        logger.debug(f"HTTP {resp.status_code} from {resp.url}")
+        return resp
+
+    def _records(self, body: Any) -> List[Any]:
+        """按 data_path 取出响应中的对话列表"""
+        raw_data = body
+        for path in self.data_path:
+            if isinstance(path, str) and isinstance(raw_data, Dict):
+                raw_data = raw_data.get(path, {})
+            elif isinstance(path, int) and isinstance(raw_data, List):
+                raw_data = raw_data[path]
+            else:
+                raise ValueError(
+                    f"Response data path '{path}' invalid for current structure!"
                 )
-                resp.raise_for_status()
 
-                logger.info(f"HTTP Request successful. Status: {resp.status_code}")
+        if not isinstance(raw_data, list):
+            raise ValueError(
+                f"Expected a list of conversations at path {self.data_path}, "
+                f"got {type(raw_data)}"
+            )
+        return raw_data
+
+    def _is_ndjson(self, resp: httpx.Response) -> bool:
+        if self.response_format != "auto":
+            return self.response_format == "ndjson"
+        ctype = resp.headers.get("content-type", "").lower()
+        return any(t in ctype for t in _NDJSON_TYPES)
+
+    def _fetch(
+        self, cli: httpx.Client, url: str, params: Optional[Dict]
+    ) -> Tuple[httpx.Response, List[Any], Any]:
+        """请求一页并完整解码，返回 (响应, 记录列表, 解析后的响应体)；NDJSON 没有响应体"""
+        resp = self._request(cli, url, params)
+        # 直接解析原始响应字节，不经过 httpx 的文本解码与标准库 json
+        if self._is_ndjson(resp):
+            loads = self.codec.loads
+            lines = resp.content.split(b"\n")
+            return resp, [loads(line) for line in lines if line.strip()], None
+        body = self.codec.loads(resp.content)
+        return resp, self._records(body), body
+
+    @contextmanager
+    def _open_stream(
+        self, cli: httpx.Client, url: str, params: Optional[Dict]
+    ) -> Iterator[httpx.Response]:
+        with cli.stream(
+            method=self.method,
+            url=url,
+            params=params,
+            headers=self.headers,
+            json=self.json_data,
+        ) as resp:
+            resp.raise_for_status()
+            logger.debug(f"HTTP {resp.status_code} from {resp.url} (streaming)")
+            yield resp
+
+    def _stream_records(self, resp: httpx.Response) -> Iterator[Any]:
+        """
+        边接收边解码：NDJSON 逐行解析；JSON 增量走到 data_path 处的数组后逐个产出元素。
+        内存占用只与单条记录及网络读块大小有关。
+        """
+        chunks = resp.iter_bytes()
+        if self._is_ndjson(resp):
+            loads = self.codec.loads
+            for line in iter_byte_lines(chunks):
+                if line.strip():
+                    yield loads(line)
+        else:
+            text = iter_text_chunks(chunks, resp.charset_encoding or "utf-8")
+            yield from iter_json_path(text, self.data_path)
+
+    def _first_params(self) -> Optional[Dict]:
+        if self.pagination == "none":
+            return self.params
+        return {**(self.params or {}), self.http_cfg.limit_param: self.page_size}
+
+    def _iter_pages(self, cli: httpx.Client) -> Iterator[List[Any]]:
+        """逐页产出记录列表 (未分页时只有一页)"""
+        if self.pagination in ("offset", "page"):
+            yield from self._iter_numbered_pages(cli)
+        elif self.pagination in ("cursor", "link"):
+            yield from self._iter_chained_pages(cli)
+        elif self.stream:
+            with self._open_stream(cli, self.url, self._first_params()) as resp:
+                yield self._stream_records(resp)
+        else:
+            yield self._fetch(cli, self.url, self._first_params())[1]
+
+    def _page_params(self, pos: int) -> Dict:
+        """pos：offset 分页时为记录偏移，page 分页时为从 0 开始的页序号"""
+        cfg = self.http_cfg
+        params = self._first_params() or {}
+        if self.pagination == "offset":
+            params[cfg.offset_param] = pos
+        else:
+            params[cfg.page_param] = cfg.first_page + pos
+        return params
+
+    def _iter_numbered_pages(self, cli: httpx.Client) -> Iterator[List[Any]]:
+        """
+        offset/page 分页：页地址可以预先算出，因此同时请求 page_concurrency 页，
+        按页序产出，遇到空页才结束，之后已发出的多余请求被丢弃。
+
+        服务端可能把 limit 截断到自己的上限，短页因此不代表最后一页：
+        page 分页的页仍然连续，照常继续；offset 分页按页实际返回的条数
+        重新计算之后的偏移 (取消已发出的请求)，不会跳过记录。
+        """
+        window = max(1, self.http_cfg.page_concurrency)
+        max_pages = self.http_cfg.max_pages
+        by_offset = self.pagination == "offset"
+        # offset 分页时每页前进的条数，发现服务端截断 limit 后随之调小
+        step = self.page_size
+        pending: Deque[Tuple[int, Future]] = deque()
+        next_pos = 0
+        requested = 0
+        short = warned = False
 
-                raw_data: Dict | List = resp.json()
+        def fetch(pos: int) -> List[Any]:
+            return self._fetch(cli, self.url, self._page_params(pos))[1]
 
-                for path in self.data_path:
-                    if isinstance(path, str) and isinstance(raw_data, Dict):
-                        raw_data = raw_data.get(path, {})
-                    elif isinstance(path, int) and isinstance(raw_data, List):
-                        raw_data = raw_data[path]
-                    else:
-                        raise ValueError(
-                            f"Response data path '{path}' invalid for current structure!"
-                        )
+        executor = ThreadPoolExecutor(
+            max_workers=window, thread_name_prefix="http-page"
+        )
 
-                if not isinstance(raw_data, list):
-                    raise ValueError(
-                        f"Expected a list of conversations at path {self.data_path}, got {type(raw_data)}"
+        def fill() -> None:
+            nonlocal next_pos, requested
+            while len(pending) < window and not (max_pages and requested >= max_pages):
+                pending.append((next_pos, executor.submit(fetch, next_pos)))
+                next_pos += step if by_offset else 1
+                requested += 1
+
+        try:
+            fill()
+            while pending:
+                pos, fut = pending.popleft()
+                records = fut.result()
+                if not records:
+                    break
+                if short and not warned:
+                    # 短页之后还有数据：服务端截断了 limit
+                    logger.warning(
+                        f"Server returned pages shorter than page_size="
+                        f"{self.page_size} before the end of {self.url}; it "
+                        f"probably caps the limit, consider lowering page_size"
                     )
+                    warned = True
+                yield records
 
-                count = 0
-                for item in raw_data:
-                    count += 1
-                    yield self.conv_type.from_dict(item)
+                short = len(records) < self.page_size
+                if by_offset and len(records) < step:
+                    # 从实际返回的位置继续，丢弃按旧步长发出的请求
+                    for _, stale in pending:
+                        stale.cancel()
+                    requested -= len(pending)
+                    pending.clear()
+                    step = len(records)
+                    next_pos = pos + step
+                fill()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+            executor.shutdown(wait=True)
+
+    def _iter_chained_pages(self, cli: httpx.Client) -> Iterator[List[Any]]:
+        """cursor/link 分页：下一页地址取决于上一页的响应，只能顺序请求"""
+        cfg = self.http_cfg
+        url: Optional[str] = self.url
+        params = self._first_params()
+        pages = 0
+        while url is not None:
+            if self.stream and self.pagination == "link":
+                with self._open_stream(cli, url, params) as resp:
+                    yield self._stream_records(resp)
+                body = None
+            else:
+                resp, records, body = self._fetch(cli, url, params)
+                if records:
+                    yield records
+            pages += 1
+            if cfg.max_pages and pages >= cfg.max_pages:
+                return
+
+            if self.pagination == "link":
+                # 下一页的 URL 已包含全部查询参数
+                next_url = resp.links.get("next", {}).get("url")
+                url = str(resp.url.join(next_url)) if next_url else None
+                params = None
+            else:
+                cursor = _lookup(body, cfg.cursor_path)
+                if cursor is None or cursor == "":
+                    return
+                params = {**(self._first_params() or {}), cfg.cursor_param: cursor}
 
-                logger.info(f"Parsed {count} items from HTTP response")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP Error {e.response.status_code} for {self.url}")
-            raise
-        except Exception as e:
-            logger.error(f"Failed to load from HTTP: {e}")
-            raise
+
+def _retryable(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def _lookup(data: Any, path: Sequence[Union[str, int]]) -> Any:
+    """按路径取值，路径不存在时返回 None"""
+    for key in path:
+        if isinstance(key, str) and isinstance(data, Mapping):
+            data = data.get(key)
+        elif isinstance(key, int) and isinstance(data, list):
+            if not -len(data) <= key < len(data):
+                return None
+            data = data[key]
+        else:
+            return None
+    return data
 
 
 @register_sink()
@@ -104,9 +371,27 @@ class HTTPSink(DataSink[T]):
         self.headers = self.http_cfg.headers
         self.data_path = self.http_cfg.data_path
         self.timeout = self.http_cfg.timeout
+        self.codec: BaseCodec = get_codec(self.http_cfg.codec)
+        # 批量序列化时的分块大小
+        self.batch_size = config.current.settings.proc.batch_size
+        # 分块上传的限制，均为 0 时 save() 整体一次发送
+        self.upload_records = max(0, self.http_cfg.upload_records)
+        self.upload_bytes = max(0, self.http_cfg.upload_bytes)
+        self.upload_concurrency = max(1, self.http_cfg.upload_concurrency)
+
+    def _json_headers(self) -> Dict[str, str]:
+        headers = dict(self.headers or {})
+        if not any(k.lower() == "content-type" for k in headers):
+            headers["Content-Type"] = "application/json"
+        return headers
 
     def save(self, data: Iterable[ToDictType]) -> None:
-        payload_list = [item.to_dict() for item in data]
+        if self.upload_records or self.upload_bytes:
+            return self.save_chunked(data)
+
+        payload_list = []
+        for chunk in chunked(data, self.batch_size):
+            payload_list.extend(to_dicts(chunk))
 
         count = len(payload_list)
         logger.info(f"Posting {count} items to {self.url}")
@@ -118,8 +403,8 @@ class HTTPSink(DataSink[T]):
                     method=self.method,
                     url=self.url,
                     params=self.params,
-                    headers=self.headers,
-                    json=final_json,
+                    headers=self._json_headers(),
+                    content=self.codec.dumps(final_json),
                 )
                 resp.raise_for_status()
                 logger.info("Data posted successfully.")
@@ -129,19 +414,136 @@ class HTTPSink(DataSink[T]):
 
     def save_streaming(self, data: Iterable[ToDictType]) -> None:
         """
-        逐条发送数据。如果数据集非常大，推荐使用此方法。
+        逐条发送数据 (每个请求体是单条记录，不经过 data_path 包装)。
+        大数据集更推荐 save_chunked()：每个请求携带多条记录且并发发送。
         """
-        # TODO: 添加日志输出
+        logger.info(f"Posting items one by one to {self.url}")
+        headers = self._json_headers()
+        count = 0
         with httpx.Client(timeout=self.timeout) as cli:
-            for item in data:
+            for chunk in chunked(data, self.batch_size):
+                for payload in to_dicts(chunk):
+                    self._send(cli, self.codec.dumps(payload), headers)
+                    count += 1
+        logger.info(f"Posted {count} items to {self.url}")
+
+    def _envelope(self) -> Tuple[bytes, bytes]:
+        """data_path 包装后请求体中记录列表前后的字节，各分块的记录拼接在两者之间"""
+        body = self.codec.dumps(self._wrap_data([]))
+        # 最内层的空列表之后只有闭合括号，以及负下标在它后面补位的 ",null"；
+        # 键都在各自的值之前，因此最后一个 "[]" 就是记录列表
+        i = body.rindex(b"[]")
+        return body[: i + 1], body[i + 1 :]
+
+    def _iter_bodies(self, data: Iterable[ToDictType]) -> Iterator[Tuple[bytes, int]]:
+        """
+        按 upload_records/upload_bytes 切分为请求体，产出 (请求体, 记录数)。
+        每条记录只编码一次；单条记录超过字节上限时独占一个请求。
+        """
+        prefix, suffix = self._envelope()
+        overhead = len(prefix) + len(suffix)
+        dumps = self.codec.dumps
+        parts: List[bytes] = []
+        size = overhead
+
+        def body() -> bytes:
+            return prefix + b",".join(parts) + suffix
+
+        for chunk in chunked(data, self.batch_size):
+            for record in to_dicts(chunk):
+                encoded = dumps(record)
+                added = len(encoded) + (1 if parts else 0)
+                if parts and (
+                    (self.upload_records and len(parts) >= self.upload_records)
+                    or (self.upload_bytes and size + added > self.upload_bytes)
+                ):
+                    yield body(), len(parts)
+                    parts = []
+                    size = overhead
+                    added = len(encoded)
+                parts.append(encoded)
+                size += added
+        if parts:
+            yield body(), len(parts)
+
+    def save_chunked(self, data: Iterable[ToDictType]) -> None:
+        """
+        分块上传：每个请求最多 upload_records 条记录 / upload_bytes 字节，
+        最多 upload_concurrency 个请求同时在途 (共用一个连接池)，
+        内存占用约为 (upload_concurrency + 1) 个请求体。
+        失败的分块按 upload_retries/upload_backoff 重试，重试耗尽后抛出异常。
+        """
+        logger.info(
+            f"Posting to {self.url} in chunks (records={self.upload_records}, "
+            f"bytes={self.upload_bytes}, concurrency={self.upload_concurrency})"
+        )
+        headers = self._json_headers()
+        pending: Deque[Future] = deque()
+        count = requests = 0
+        limits = httpx.Limits(
+            max_connections=self.upload_concurrency,
+            max_keepalive_connections=self.upload_concurrency,
+        )
+        with httpx.Client(timeout=self.timeout, limits=limits) as cli:
+            executor = ThreadPoolExecutor(
+                max_workers=self.upload_concurrency, thread_name_prefix="http-upload"
+            )
+            try:
+                for body, n in self._iter_bodies(data):
+                    # 在途请求达到上限时等待最早的一个完成，限制内存中的请求体数量
+                    while len(pending) >= self.upload_concurrency:
+                        count += pending.popleft().result()
+                        requests += 1
+                    pending.append(
+                        executor.submit(self._send_chunk, cli, body, n, headers)
+                    )
+                while pending:
+                    count += pending.popleft().result()
+                    requests += 1
+            except BaseException:
+                for fut in pending:
+                    fut.cancel()
+                logger.error(f"Failed to post data to {self.url}")
+                raise
+            finally:
+                executor.shutdown(wait=True)
+
+        logger.info(f"Posted {count} items to {self.url} in {requests} requests")
+
+    def _send_chunk(
+        self, cli: httpx.Client, body: bytes, n: int, headers: Dict[str, str]
+    ) -> int:
+        self._send(cli, body, headers)
+        logger.debug(f"Posted chunk of {n} items ({len(body)} bytes)")
+        return n
+
+    def _send(self, cli: httpx.Client, body: bytes, headers: Dict[str, str]) -> None:
+        """发送一个请求体；网络错误、429 与 5xx 按指数退避重试"""
+        retries = max(0, self.http_cfg.upload_retries)
+        for attempt in range(retries + 1):
+            try:
                 resp = cli.request(
                     method=self.method,
                     url=self.url,
                     params=self.params,
-                    headers=self.headers,
-                    json=item.to_dict(),
+                    headers=headers,
+                    content=body,
                 )
                 resp.raise_for_status()
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and not _retryable(
+                    e.response.status_code
+                ):
+                    raise
+                if attempt >= retries:
+                    raise
+                delay = self.http_cfg.upload_backoff * 2**attempt
+                logger.warning(
+                    f"Upload to {self.url} failed ({e}), "
+                    f"retrying in {delay:.1f}s ({attempt + 1}/{retries})"
+                )
+                time.sleep(delay)
 
     def _wrap_data(
         self, data_list: Sequence[Mapping[str, Any]]
@@ -151,12 +553,14 @@ class HTTPSink(DataSink[T]):
             return data_list
 
         # 逆向构建，例如 path=["a", "b"] -> {"a": {"b": data_list}}
-        res = data_list
+        # 整数表示数组下标，其余位置填 None，例如 path=["a", 1] -> {"a": [None, data_list]}
+        res: Any = data_list
         for key in reversed(self.data_path):
             if isinstance(key, str):
                 res = {key: res}
+            elif key >= 0:
+                res = [None] * key + [res]
             else:
-                # TODO: 支持路径中有 index
-                continue
+                res = [res] + [None] * (-key - 1)
 
         return res
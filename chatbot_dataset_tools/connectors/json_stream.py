@@ -0,0 +1,232 @@
+from __future__ import annotations
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Sequence, Union
+
+# JSON 规范中的空白字符
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+READ_SIZE = 1 << 20
+# 可能被缓冲区末尾截断的最长记号 (\uXXXX 转义、数字的指数部分等)
+_TAIL = 6
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+
+def iter_text_chunks(
+    byte_chunks: Iterable[bytes], encoding: str = "utf-8"
+) -> Iterator[str]:
+    """使用增量解码器把字节块转换为文本块，多字节字符跨块时也能正确解码"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_file_chunks(f: BinaryIO, size: int = READ_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _TextBuffer:
+    """在文本块流上维护一个滑动缓冲区；已消费的部分在读入新块时才丢弃"""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """
+        读入更多文本，返回是否读到了新内容。
+        至少读入与当前未消费部分等长的文本，超大元素的重试解析总开销因此是线性的。
+        """
+        pending = self.buf[self.pos :]
+        parts = [pending]
+        need = max(len(pending), 1)
+        got = 0
+        for chunk in self._chunks:
+            parts.append(chunk)
+            got += len(chunk)
+            if got >= need:
+                break
+        else:
+            self.eof = True
+
+        self.buf = "".join(parts)
+        self.pos = 0
+        return got > 0
+
+    def peek(self) -> Optional[str]:
+        """跳过空白，返回下一个字符 (不消费)；到达末尾时返回 None"""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more() and self.eof:
+                return None
+
+    def decode_value(self) -> Any:
+        """
+        从当前位置解析一个完整的 JSON 值，必要时读入更多文本。
+        只有错误可能由缓冲区末尾截断引起时才继续读入，格式错误立即抛出，
+        不会为了一个损坏的元素读完整个文件。
+        """
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # 值之后只剩下可能属于数字的字符时 (例如 "1." 或 "2.5e") 可能被截断，
+                # 需确认后面还有其它内容
+                rest = len(self.buf) - end
+                if self.eof or rest > _TAIL or not _NUMBER_TAIL.match(self.buf, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or not self._truncated(e):
+                    raise
+            self.more()
+
+    def _truncated(self, e: json.JSONDecodeError) -> bool:
+        """解析错误是否可能只是因为文本还没读完"""
+        # 未闭合的字符串报告的是起始引号的位置，与缓冲区末尾的距离不定
+        if e.msg.startswith("Unterminated string"):
+            return True
+        return e.pos >= len(self.buf) - _TAIL
+
+
+def _iter_array_items(reader: _TextBuffer) -> Iterator[Any]:
+    """逐个产出当前位置 (已消费 "[") 的数组元素，直到并消费 "]" """
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        if reader.peek() is None:
+            raise ValueError("Unterminated JSON array")
+        yield reader.decode_value()
+
+        sep = reader.peek()
+        if sep == ",":
+            reader.pos += 1
+        elif sep == "]":
+            reader.pos += 1
+            return
+        else:
+            raise ValueError(
+                f"Expected ',' or ']' in JSON array, got {sep!r}"
+                if sep is not None
+                else "Unterminated JSON array"
+            )
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    增量解析顶层为数组的 JSON 文本，逐个产出数组元素。
+
+    内存占用只与单个元素及读块大小有关，与整个文件的大小无关；
+    元素内部可以任意嵌套。顶层不是数组时抛出 ValueError("Json Data Must be a list")。
+    """
+    reader = _TextBuffer(chunks)
+
+    if reader.peek() != "[":
+        raise ValueError("Json Data Must be a list")
+    reader.pos += 1
+    yield from _iter_array_items(reader)
+
+    if reader.peek() is not None:
+        raise ValueError("Extra data after JSON array")
+
+
+def _skip_to_key(reader: _TextBuffer, key: str) -> bool:
+    """在对象内 (已消费 "{") 前进到键 key 的值之前；对象中没有该键时返回 False"""
+    while True:
+        c = reader.peek()
+        if c == "}":
+            return False
+        if c != '"':
+            raise ValueError(
+                f"Expected a key in JSON object, got {c!r}"
+                if c is not None
+                else "Unterminated JSON object"
+            )
+        name = reader.decode_value()
+        if reader.peek() != ":":
+            raise ValueError("Expected ':' in JSON object")
+        reader.pos += 1
+        if name == key:
+            return True
+
+        if reader.peek() is None:
+            raise ValueError("Unterminated JSON object")
+        reader.decode_value()  # 跳过不需要的值
+        sep = reader.peek()
+        if sep == ",":
+            reader.pos += 1
+        elif sep != "}":
+            raise ValueError(f"Expected ',' or '}}' in JSON object, got {sep!r}")
+
+
+def _skip_to_index(reader: _TextBuffer, index: int) -> bool:
+    """在数组内 (已消费 "[") 前进到第 index 个元素之前；数组不够长时返回 False"""
+    for _ in range(index):
+        if reader.peek() in ("]", None):
+            return False
+        reader.decode_value()
+        if reader.peek() != ",":
+            return False
+        reader.pos += 1
+    return reader.peek() not in ("]", None)
+
+
+def iter_json_path(
+    chunks: Iterable[str], path: Sequence[Union[str, int]]
+) -> Iterator[Any]:
+    """
+    增量定位到 path (例如 ["results", "items"]，整数表示数组下标) 处的数组，
+    逐个产出其元素。路径之前的兄弟值会被解析后丢弃，数组之后的内容不再读取。
+    path 为空时等同于 iter_json_array (但不检查数组后的多余内容)。
+    """
+    reader = _TextBuffer(chunks)
+    for key in path:
+        c = reader.peek()
+        if isinstance(key, str) and c == "{":
+            reader.pos += 1
+            found = _skip_to_key(reader, key)
+        elif isinstance(key, int) and key >= 0 and c == "[":
+            reader.pos += 1
+            found = _skip_to_index(reader, key)
+        else:
+            raise ValueError(
+                f"Response data path '{key}' invalid for current structure!"
+            )
+        if not found:
+            raise ValueError(f"Response data path '{key}' not found")
+
+    if reader.peek() != "[":
+        raise ValueError(f"Expected a list of conversations at path {list(path)}")
+    reader.pos += 1
+    yield from _iter_array_items(reader)
+
+
+def iter_byte_lines(byte_chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """把字节块流按 \n 切分为行 (不含换行符)，用于 NDJSON 等按行分隔的流"""
+    parts: List[bytes] = []
+    for chunk in byte_chunks:
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            parts.append(chunk)
+            continue
+        parts.append(lines[0])
+        yield b"".join(parts)
+        yield from lines[1:-1]
+        parts = [lines[-1]] if lines[-1] else []
+    if parts:
+        yield b"".join(parts)
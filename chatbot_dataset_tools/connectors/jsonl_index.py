@@ -0,0 +1,175 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+from chatbot_dataset_tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+# 文件头：魔数 + 数据文件大小 + 数据文件 mtime_ns + 记录数
+_MAGIC = b"CDTIDX1\0"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+class JsonlIndex:
+    """
+    JSONL 文件的行偏移索引，存储在数据文件旁的 <path>.idx 中。
+
+    索引内容为 count + 1 个小端 uint64：第 i 条记录 (跳过空行后计数) 位于
+    [offsets[i], offsets[i + 1]) 字节区间，最后一个偏移即数据文件大小。
+    数据文件的大小或 mtime 变化后索引自动失效并重建。
+    索引与数据文件都通过 mmap 读取，打开索引本身不需要读入整个文件。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        offsets,
+        stat_key: Tuple[int, int],
+        data_mm: Optional[mmap.mmap],
+    ):
+        self.path = Path(path)
+        self._offsets = offsets  # memoryview('Q') 或 array('Q')
+        self._stat_key_value = stat_key
+        self._data_mm = data_mm
+        # 从 .idx 加载时持有的映射与视图，close() 时释放
+        self._index_mm: Optional[mmap.mmap] = None
+        self._index_view: Optional[memoryview] = None
+
+    @staticmethod
+    def sidecar_path(path: str | Path) -> Path:
+        return Path(f"{path}.idx")
+
+    @staticmethod
+    def _stat_key(path: str | Path) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    # --- 构建与加载 ---
+
+    @classmethod
+    def open(cls, path: str | Path, persist: bool = True) -> JsonlIndex:
+        """加载有效的索引文件，不存在或已过期时重新构建 (persist=True 时写回磁盘)"""
+        index = cls._load(path)
+        if index is None:
+            index = cls.build(path, persist=persist)
+        return index
+
+    @classmethod
+    def _load(cls, path: str | Path) -> Optional[JsonlIndex]:
+        idx_path = cls.sidecar_path(path)
+        try:
+            with open(idx_path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return None
+                magic, size, mtime_ns, count = _HEADER.unpack(header)
+                if magic != _MAGIC or (size, mtime_ns) != cls._stat_key(path):
+                    logger.debug(f"Index {idx_path} is stale, rebuilding")
+                    return None
+                if os.fstat(f.fileno()).st_size != _HEADER.size + 8 * (count + 1):
+                    return None
+                index_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        view = memoryview(index_mm)[_HEADER.size :]
+        if sys.byteorder == "little":
+            offsets = view.cast("Q")
+        else:
+            offsets = array("Q", view)
+            offsets.byteswap()
+        index = cls(path, offsets, (size, mtime_ns), cls._map_data(path, size))
+        index._index_mm = index_mm
+        index._index_view = view
+        return index
+
+    @classmethod
+    def build(cls, path: str | Path, persist: bool = True) -> JsonlIndex:
+        """扫描数据文件，记录每条非空记录的起始偏移"""
+        size, mtime_ns = cls._stat_key(path)
+        offsets = array("Q")
+        pos = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                pos += len(line)
+        count = len(offsets)
+        offsets.append(pos)
+
+        if persist:
+            cls._write(path, offsets, size, mtime_ns, count)
+        logger.debug(f"Built JSONL index for {path}: {count} records")
+        return cls(path, offsets, (size, mtime_ns), cls._map_data(path, size))
+
+    @classmethod
+    def _write(cls, path, offsets: array, size: int, mtime_ns: int, count: int):
+        idx_path = cls.sidecar_path(path)
+        tmp_path = idx_path.with_name(idx_path.name + ".tmp")
+        data = array("Q", offsets)
+        if sys.byteorder != "little":
+            data.byteswap()
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, size, mtime_ns, count))
+                data.tofile(f)
+            os.replace(tmp_path, idx_path)
+        except OSError as e:
+            # 只读目录等情况下仅在内存中使用索引
+            logger.warning(f"Could not write index {idx_path}: {e}")
+
+    @staticmethod
+    def _map_data(path, size: int) -> Optional[mmap.mmap]:
+        if size == 0:
+            return None  # 空文件无法 mmap
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def is_stale(self) -> bool:
+        """数据文件在索引建立后是否被修改过"""
+        try:
+            return self._stat_key(self.path) != self._stat_key_value
+        except FileNotFoundError:
+            return True
+
+    # --- 访问 ---
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def span(self, i: int) -> Tuple[int, int]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("JSONL record index out of range")
+        return self._offsets[i], self._offsets[i + 1]
+
+    def record(self, i: int) -> bytes:
+        """返回第 i 条记录的原始字节 (可能带有行尾换行与其后的空行)"""
+        start, end = self.span(i)
+        return self._data_mm[start:end]
+
+    def records(self, indices) -> List[bytes]:
+        return [self.record(i) for i in indices]
+
+    def close(self) -> None:
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if self._index_view is not None:
+            self._index_view.release()
+            self._index_view = None
+        if self._index_mm is not None:
+            self._index_mm.close()
+            self._index_mm = None
+        if self._data_mm is not None:
+            self._data_mm.close()
+            self._data_mm = None
+
+    def __repr__(self) -> str:
+        return f"<JsonlIndex {self.path} ({len(self)} records)>"
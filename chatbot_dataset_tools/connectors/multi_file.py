@@ -0,0 +1,194 @@
+from __future__ import annotations
+import contextvars
+import glob
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Type
+from .base import T, DataSource
+from .file import FileSource
+from .compression import EXTENSIONS
+from .traits import FromDictType
+from chatbot_dataset_tools.types import Conversation
+from chatbot_dataset_tools.config import FileConfig, config
+from chatbot_dataset_tools.registry import register_source
+from chatbot_dataset_tools.utils import get_logger, chunked
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+
+class _FileReader(threading.Thread):
+    """后台线程：完整读取一个文件，按批次放入队列，结束时放入 _DONE 或异常"""
+
+    def __init__(
+        self, source: FileSource, out: queue.Queue, stop: threading.Event, batch: int
+    ):
+        super().__init__(name=f"prefetch-{Path(source.path).name}", daemon=True)
+        self.source = source
+        self.path = str(source.path)
+        self.queue = out
+        self.count = 0
+        self._stop_event = stop
+        self._batch = batch
+        # 在调用方的配置上下文中读取
+        self._ctx = contextvars.copy_context()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put((self, item), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self) -> None:
+        self._ctx.run(self._read)
+
+    def _read(self) -> None:
+        items = self.source.load()
+        try:
+            for batch in chunked(items, self._batch):
+                if not self._put(batch):
+                    return
+                self.count += len(batch)
+        except BaseException as e:
+            self._put(e)
+            return
+        finally:
+            items.close()
+        self._put(_DONE)
+
+
+@register_source()
+class MultiFileSource(DataSource[T]):
+    """
+    从多个文件加载：path 可以是 glob 模式 ("data/part-*.jsonl"、"data/**/*.jsonl.gz")
+    或目录 (读取目录下扩展名与 format 相符的文件，可带压缩扩展名)。文件按路径排序。
+
+    最多 file.prefetch 个文件同时在后台线程中读取解析。file.ordered 为 True 时
+    严格按文件顺序产出；为 False 时按批次交错产出，哪个文件先解析好就先产出哪个。
+
+    每个文件读完后记录其条数 (file_counts)，全部已知后数据集的 len() 即可使用；
+    开启 file.index 时直接从各文件的偏移索引获取条数。
+    """
+
+    def __init__(
+        self,
+        file_cfg: Optional[FileConfig] = None,
+        conv_type: Type[FromDictType[T]] = Conversation,
+        **overrides,
+    ) -> None:
+        base_cfg = config.current.settings.file
+        if file_cfg:
+            base_cfg = file_cfg
+        self.file_cfg = base_cfg.derive(**overrides)
+        self.conv_type = conv_type
+
+        self.path = self.file_cfg.path
+        self.format = self.file_cfg.format.lower()
+        self.prefetch = max(1, self.file_cfg.prefetch)
+        self.ordered = self.file_cfg.ordered
+        self.batch_size = config.current.settings.proc.batch_size
+        # 文件路径 -> 记录数，只包含已完整读取 (或可从索引得知) 的文件
+        self.file_counts: Dict[str, int] = {}
+
+    def paths(self) -> List[str]:
+        """解析出的文件列表 (已排序)；没有匹配的文件时抛出 FileNotFoundError"""
+        path = Path(self.path)
+        if path.is_dir():
+            suffixes = {f".{self.format}"} | {
+                f".{self.format}{ext}" for ext in EXTENSIONS
+            }
+            files = [
+                str(p)
+                for p in path.iterdir()
+                if p.is_file()
+                and not p.name.startswith(".")
+                and any(p.name.lower().endswith(s) for s in suffixes)
+            ]
+        else:
+            matches = glob.glob(str(path), recursive=True)
+            files = [p for p in matches if Path(p).is_file()]
+
+        if not files:
+            raise FileNotFoundError(f"No files match: {self.path}")
+        return sorted(files)
+
+    def _file_source(self, path: str) -> FileSource[T]:
+        return FileSource(
+            file_cfg=self.file_cfg.derive(path=path), conv_type=self.conv_type
+        )
+
+    def known_count(self) -> Optional[int]:
+        """所有文件的条数都已知时返回总数，否则返回 None"""
+        total = 0
+        for path in self.paths():
+            if path not in self.file_counts:
+                source = self._file_source(path)
+                if not source.random_access:
+                    return None
+                self.file_counts[path] = source.count()
+            total += self.file_counts[path]
+        return total
+
+    def fingerprint(self) -> Optional[str]:
+        """各文件指纹的组合：增删或修改任何一个文件都会改变结果"""
+        try:
+            paths = self.paths()
+        except FileNotFoundError:
+            return None
+        parts = [self._file_source(path).fingerprint() for path in paths]
+        if any(part is None for part in parts):
+            return None
+        return repr((type(self).__name__, self.ordered, parts))
+
+    def load(self) -> Iterator[T]:
+        files = deque(self.paths())
+        logger.info(
+            f"Loading {len(files)} files from {self.path} "
+            f"(prefetch={self.prefetch}, ordered={self.ordered})"
+        )
+
+        stop = threading.Event()
+        # 交错模式下所有文件共用一个队列，按完成顺序消费
+        shared: Optional[queue.Queue] = (
+            None if self.ordered else queue.Queue(maxsize=2 * self.prefetch)
+        )
+        active: Deque[_FileReader] = deque()
+
+        def start_next() -> None:
+            out = shared if shared is not None else queue.Queue(maxsize=2)
+            reader = _FileReader(
+                self._file_source(files.popleft()), out, stop, self.batch_size
+            )
+            reader.start()
+            active.append(reader)
+
+        total = 0
+        try:
+            while files and len(active) < self.prefetch:
+                start_next()
+
+            while active:
+                q = shared if shared is not None else active[0].queue
+                reader, item = q.get()
+                if item is _DONE:
+                    active.remove(reader)
+                    self.file_counts[reader.path] = reader.count
+                    if files:
+                        start_next()
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    total += len(item)
+                    yield from item
+        finally:
+            stop.set()
+            for reader in active:
+                reader.join()
+
+        logger.info(f"Loaded {total} items from {len(self.file_counts)} files")
@@ -0,0 +1,240 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+from .base import T
+from .file import FileSource, FileSink
+from .traits import FromDictType, ToDictType, to_dicts
+from .projection import Projection
+from chatbot_dataset_tools.types import Conversation
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.registry import register_source, register_sink
+from chatbot_dataset_tools.utils import get_logger, chunked
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖，仅 Parquet 读写需要
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+logger = get_logger(__name__)
+
+# 可投影的列；"messages" 等价于三个子字段全部读取，role 总是会被读取
+MESSAGE_FIELDS = ("role", "content", "metadata")
+COLUMNS = ("messages", *(f"messages.{f}" for f in MESSAGE_FIELDS), "metadata")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "Parquet support requires pyarrow. Install it with `pip install pyarrow`."
+        )
+    return pa, pq
+
+
+def parquet_schema():
+    """
+    对话的 Parquet 结构：
+    messages: list<struct<role, content, metadata>>，metadata: string
+    两级 metadata 都是任意字典，以 JSON 字符串存储 (空字典存为 null)。
+    """
+    pa, _ = _require_pyarrow()
+    message = pa.struct([(name, pa.string()) for name in MESSAGE_FIELDS])
+    return pa.schema([("messages", pa.list_(message)), ("metadata", pa.string())])
+
+
+def _resolve_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    """把投影列转换为 Parquet 叶子列路径"""
+    if columns is None:
+        columns = ("messages", "metadata")
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown parquet columns {unknown}. Available: {COLUMNS}")
+
+    fields = set()
+    for c in columns:
+        if c == "messages":
+            fields.update(MESSAGE_FIELDS)
+        elif c.startswith("messages."):
+            fields.update(("role", c.split(".", 1)[1]))
+
+    leaves = [f"messages.list.element.{f}" for f in MESSAGE_FIELDS if f in fields]
+    if "metadata" in columns:
+        leaves.append("metadata")
+    return leaves
+
+
+def _projection_columns(projection: Projection) -> List[str]:
+    """按 file.fields 推导需要读取的列；元数据中具体键的裁剪在构造对话前完成"""
+    columns = []
+    if projection.has_messages:
+        columns.append("messages.role")
+    if projection.has_content:
+        columns.append("messages.content")
+    if projection.has_message_meta:
+        columns.append("messages.metadata")
+    if projection.has_meta:
+        columns.append("metadata")
+    return columns
+
+
+@register_source()
+class ParquetSource(FileSource[T]):
+    """
+    读取 Parquet 文件 (需要 pyarrow)：按 row group 流式读取，
+    每次读取解压 file.row_group_size 行，再按 proc.batch_size 分批构造对话。
+
+    file.columns 指定只读取的列，例如 ("messages",) 跳过对话元数据，
+    ("messages.role", "messages.content") 连消息元数据一起跳过；未读取的部分为空。
+    未指定 columns 时按 file.fields 投影推导。
+    """
+
+    def __init__(
+        self,
+        file_cfg: Optional[FileConfig] = None,
+        conv_type: Type[FromDictType[T]] = Conversation,
+        **overrides,
+    ) -> None:
+        overrides.setdefault("format", "parquet")
+        super().__init__(file_cfg, conv_type, **overrides)
+        self.row_group_size = self.file_cfg.row_group_size
+        columns = self.file_cfg.columns
+        if columns is None and self.projection is not None:
+            columns = _projection_columns(self.projection)
+        self.columns = _resolve_columns(columns)
+
+    def _load_parquet(self) -> Iterator[T]:
+        _, pq = _require_pyarrow()
+        pf = pq.ParquetFile(self.path)
+        logger.debug(
+            f"Parquet {self.path}: {pf.metadata.num_rows} rows in "
+            f"{pf.num_row_groups} row groups, columns={self.columns}"
+        )
+        step = max(1, self.batch_size)
+        for batch in pf.iter_batches(
+            batch_size=self.row_group_size, columns=self.columns
+        ):
+            # 整批读取与解压，但按 proc.batch_size 分小片转换为 Python 对象：
+            # 一次性生成数万条对话会让存活对象激增，循环垃圾回收的开销随之陡增
+            for start in range(0, batch.num_rows, step):
+                records = self._batch_records(batch.slice(start, step))
+                yield from self._build_many(records)
+
+    def known_count(self) -> int:
+        """行数记录在文件尾部的元数据中，无需读取数据"""
+        _, pq = _require_pyarrow()
+        return pq.ParquetFile(self.path).metadata.num_rows
+
+    def _batch_records(self, batch) -> List[Dict[str, Any]]:
+        """把一个 RecordBatch 按列整体转换为 Python 对象，再组装为对话字典"""
+        loads = self.codec.loads
+        names = batch.schema.names
+        n = batch.num_rows
+
+        conv_meta: List[Any] = [None] * n
+        if "metadata" in names:
+            conv_meta = [
+                loads(m) if m is not None else None
+                for m in batch.column("metadata").to_pylist()
+            ]
+
+        if "messages" not in names:
+            return [{"messages": (), "metadata": m} for m in conv_meta]
+
+        messages = batch.column("messages")
+        # 切片后的列表列：offsets 指向完整子数组，flatten() 只取本片范围，下标需平移
+        offsets = messages.offsets.to_pylist()
+        base = offsets[0]
+        offsets = [o - base for o in offsets]
+        values = messages.flatten()
+        present = {values.type.field(i).name for i in range(values.type.num_fields)}
+        roles = values.field("role").to_pylist()
+        if "content" in present:
+            contents = values.field("content").to_pylist()
+            msgs = [{"role": r, "content": c} for r, c in zip(roles, contents)]
+        else:
+            msgs = [{"role": r} for r in roles]
+        if "metadata" in present:
+            for m, meta in zip(msgs, values.field("metadata").to_pylist()):
+                if meta is not None:
+                    m["metadata"] = loads(meta)
+
+        records = [
+            {"messages": msgs[offsets[i] : offsets[i + 1]], "metadata": conv_meta[i]}
+            for i in range(n)
+        ]
+        return records
+
+
+@register_sink()
+class ParquetSink(FileSink[T]):
+    """
+    写入 Parquet 文件 (需要 pyarrow)：每 file.row_group_size 条对话
+    (与 Dataset.batch 的分块方式相同) 转换为一个 row group 写出，内存只与分块大小有关。
+    文件内压缩由 file.parquet_compression 指定 (zstd/snappy/gzip/none)。
+    """
+
+    def __init__(self, file_cfg: Optional[FileConfig] = None, **overrides) -> None:
+        overrides.setdefault("format", "parquet")
+        super().__init__(file_cfg, **overrides)
+        self.row_group_size = self.file_cfg.row_group_size
+        self.parquet_compression = self.file_cfg.parquet_compression
+
+    def _save_parquet(self, data: Iterable[ToDictType]) -> None:
+        _, pq = _require_pyarrow()
+        logger.info(f"Saving to Parquet file: {self.path}")
+        count = 0
+
+        try:
+            schema = parquet_schema()
+            with pq.ParquetWriter(
+                self.path, schema, compression=self.parquet_compression
+            ) as writer:
+                for chunk in chunked(data, self.row_group_size):
+                    writer.write_table(
+                        self._to_table(to_dicts(chunk), schema),
+                        row_group_size=self.row_group_size,
+                    )
+                    count += len(chunk)
+
+            logger.info(f"Saved {count} items to {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to save to {self.path}: {e}")
+            raise
+
+    def _to_table(self, records: List[Dict[str, Any]], schema):
+        """按列构造 Arrow 表：消息展平为一个结构体数组，再以偏移量组装为列表列"""
+        pa, _ = _require_pyarrow()
+        dumps = self.codec.dumps
+
+        offsets = [0]
+        roles: List[str] = []
+        contents: List[str] = []
+        msg_meta: List[Optional[bytes]] = []
+        conv_meta: List[Optional[bytes]] = []
+        for record in records:
+            for m in record["messages"]:
+                roles.append(m["role"])
+                contents.append(m.get("content", ""))
+                meta = m.get("metadata")
+                msg_meta.append(dumps(meta) if meta else None)
+            offsets.append(len(roles))
+            meta = record.get("metadata")
+            conv_meta.append(dumps(meta) if meta else None)
+
+        message_type = schema.field("messages").type.value_type
+        values = pa.StructArray.from_arrays(
+            [
+                pa.array(roles, pa.string()),
+                pa.array(contents, pa.string()),
+                pa.array(msg_meta, pa.binary()).cast(pa.string()),
+            ],
+            fields=list(message_type),
+        )
+        messages = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), values)
+        return pa.Table.from_arrays(
+            [
+                messages.cast(schema.field("messages").type),
+                pa.array(conv_meta, pa.binary()).cast(pa.string()),
+            ],
+            schema=schema,
+        )
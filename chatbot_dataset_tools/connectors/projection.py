@@ -0,0 +1,108 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+# 消息的可投影字段；读取任意消息字段时 role 总会被保留 (构造 Message 必需)
+MESSAGE_FIELDS = ("role", "content", "metadata")
+
+
+class Projection:
+    """
+    加载时的字段投影，例如 fields=["messages.role", "metadata.source"]。
+
+    支持的写法：
+    - messages                         消息的全部字段
+    - messages.role / messages.content 消息的单个字段
+    - messages.metadata[.<key>]        消息元数据 (或其中的部分键)
+    - metadata[.<key>]                 对话元数据 (或其中的部分键)
+
+    未选中的部分不会被构造：content 为空字符串，元数据为空；
+    没有选中任何消息字段时对话不含消息。
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields: Tuple[str, ...] = tuple(fields)
+        message_fields = set()
+        # None 表示全部键，空元组表示不读取
+        self.message_meta_keys: Optional[Tuple[str, ...]] = ()
+        self.meta_keys: Optional[Tuple[str, ...]] = ()
+
+        for field in self.fields:
+            head, _, rest = field.partition(".")
+            if head == "metadata":
+                self.meta_keys = _merge_keys(self.meta_keys, rest)
+            elif head == "messages" and not rest:
+                message_fields.update(MESSAGE_FIELDS)
+                self.message_meta_keys = None
+            elif head == "messages":
+                name, _, key = rest.partition(".")
+                if name not in MESSAGE_FIELDS or (key and name != "metadata"):
+                    raise ValueError(f"Unknown projection field '{field}'")
+                message_fields.update(("role", name))
+                if name == "metadata":
+                    self.message_meta_keys = _merge_keys(self.message_meta_keys, key)
+            else:
+                raise ValueError(
+                    f"Unknown projection field '{field}'. "
+                    f"Fields must start with 'messages' or 'metadata'"
+                )
+
+        self.message_fields: FrozenSet[str] = frozenset(message_fields)
+        self.has_messages = bool(self.message_fields)
+        self.has_content = "content" in self.message_fields
+        self.has_message_meta = "metadata" in self.message_fields
+        self.has_meta = self.meta_keys != ()
+
+    @classmethod
+    def parse(cls, fields: Optional[Iterable[str]]) -> Optional[Projection]:
+        """fields 为 None 时不做投影，返回 None"""
+        if fields is None:
+            return None
+        if isinstance(fields, str):
+            fields = [fields]
+        return cls(fields)
+
+    def apply(self, record: Any) -> Dict[str, Any]:
+        """从完整解码的对话字典中取出投影部分 (同样接受单纯的消息列表)"""
+        if isinstance(record, Mapping):
+            messages = record.get("messages", ())
+            metadata = record.get("metadata")
+        else:
+            messages, metadata = record, None
+
+        return {
+            "messages": (
+                [self._message(m) for m in messages] if self.has_messages else ()
+            ),
+            "metadata": _pick(metadata, self.meta_keys) if self.has_meta else None,
+        }
+
+    def apply_many(self, records: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [self.apply(r) for r in records]
+
+    def _message(self, m: Mapping[str, Any]) -> Dict[str, Any]:
+        out = {"role": m["role"]}
+        if self.has_content:
+            out["content"] = m.get("content", "")
+        if self.has_message_meta:
+            meta = _pick(m.get("metadata"), self.message_meta_keys)
+            if meta:
+                out["metadata"] = meta
+        return out
+
+    def __repr__(self) -> str:
+        return f"Projection({list(self.fields)!r})"
+
+
+def _merge_keys(
+    current: Optional[Tuple[str, ...]], key: str
+) -> Optional[Tuple[str, ...]]:
+    """合并元数据键：空 key 表示整个元数据，None 一旦出现即覆盖所有单独的键"""
+    if current is None or not key:
+        return None
+    return current if key in current else current + (key,)
+
+
+def _pick(metadata: Any, keys: Optional[Tuple[str, ...]]) -> Any:
+    if keys is None or not isinstance(metadata, Mapping):
+        return metadata
+    return {k: metadata[k] for k in keys if k in metadata}
@@ -0,0 +1,204 @@
+from __future__ import annotations
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from .base import T
+from .file import FileSink
+from .traits import ToDictType, to_dicts
+from .compression import EXTENSIONS, open_write
+from .buffered_writer import BackgroundWriter
+from chatbot_dataset_tools.config import FileConfig, config
+from chatbot_dataset_tools.registry import register_sink
+from chatbot_dataset_tools.utils import get_logger, chunked
+
+logger = get_logger(__name__)
+
+
+class _ShardWriter:
+    """单个分片的写入器：压缩与写盘都在自己的后台线程中进行"""
+
+    def __init__(self, sink: ShardedFileSink, path: Path):
+        self.path = path
+        self._f = open_write(path, sink.compression, sink.file_cfg.compression_level)
+        self._out = BackgroundWriter(self._f, sink.file_cfg.write_buffer_size)
+        self._write = sink._writer(self._out)
+        self.records = 0
+        self.raw_bytes = 0
+
+    def write(self, line: bytes) -> None:
+        self._write(line)
+        self.records += 1
+        self.raw_bytes += len(line)
+
+    def close(self) -> Tuple[int, int]:
+        try:
+            self._out.close()
+        finally:
+            self._f.close()
+        return self.records, self.raw_bytes
+
+
+@register_sink()
+class ShardedFileSink(FileSink[T]):
+    """
+    滚动分片输出：每个分片写满 shard_max_records 条记录或 shard_max_bytes
+    字节 (编码后、压缩前) 后切换到下一个分片，0 表示不限制。
+
+    path="out/data.jsonl.gz" 时输出：
+    - out/data-00000-of-00012.jsonl.gz ... 分片总数在写完后才确定，先写入临时文件再重命名
+    - out/data.manifest.json               每个分片的记录数与字节数
+
+    记录的编码 (to_dict + JSON) 在调用线程中按顺序进行：编码器持有 GIL，
+    放到线程中不会更快，放到进程中则需要先 pickle 同样大小的字典。
+    并行的是编码之后的部分：每个分片有独立的后台线程负责压缩与写盘，
+    切换分片时旧分片的收尾 (刷新缓冲、结束压缩流) 交给线程池完成，
+    最多 proc.max_workers 个分片同时在收尾。
+
+    同一路径下之前写出的分片 (包括分片总数不同的) 在新分片就位后删除，
+    清单最后通过临时文件原子替换写出。
+    """
+
+    def __init__(self, file_cfg: Optional[FileConfig] = None, **overrides) -> None:
+        super().__init__(file_cfg, **overrides)
+        self.max_records = self.file_cfg.shard_max_records
+        self.max_bytes = self.file_cfg.shard_max_bytes
+        self.max_workers = max(1, config.current.settings.proc.max_workers)
+
+    def _split_path(self) -> Tuple[Path, str, str]:
+        """返回 (目录, 文件名主干, 扩展名)，压缩扩展名与格式扩展名一起保留"""
+        path = Path(self.path)
+        n_suffixes = 2 if path.suffix.lower() in EXTENSIONS else 1
+        ext = "".join(path.suffixes[-n_suffixes:])
+        stem = path.name[: len(path.name) - len(ext)] if ext else path.name
+        return path.parent, stem, ext
+
+    def _shard_name(self, stem: str, ext: str, i: int, total: int) -> str:
+        return f"{stem}-{i:05d}-of-{total:05d}{ext}"
+
+    def _is_shard_name(self, name: str, stem: str, ext: str) -> bool:
+        pattern = rf"{re.escape(stem)}-\d{{5,}}-of-\d{{5,}}{re.escape(ext)}"
+        return re.fullmatch(pattern, name) is not None
+
+    def manifest_path(self) -> Path:
+        directory, stem, _ = self._split_path()
+        return directory / f"{stem}.manifest.json"
+
+    def save(self, data: Iterable[ToDictType]) -> None:
+        if self.format != "jsonl":
+            raise NotImplementedError(
+                f"ShardedFileSink only supports jsonl, not '{self.format}'"
+            )
+
+        directory, stem, ext = self._split_path()
+        directory.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Saving sharded JSONL to {directory / stem}-*{ext}")
+
+        dumps = self.codec.dumps
+        tmp_paths: List[Path] = []
+        stats: List[Tuple[int, int]] = []
+        closing: Deque[Future] = deque()
+        current: Optional[_ShardWriter] = None
+
+        def roll() -> _ShardWriter:
+            tmp = directory / f".{stem}-{len(tmp_paths):05d}{ext}.tmp"
+            tmp_paths.append(tmp)
+            return _ShardWriter(self, tmp)
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="shard-close"
+        )
+        try:
+            for chunk in chunked(data, self.batch_size):
+                for record in to_dicts(chunk):
+                    line = dumps(record) + b"\n"
+                    if current is not None and self._is_full(current, len(line)):
+                        closing.append(executor.submit(current.close))
+                        current = None
+                        # 限制同时收尾的分片数，避免缓冲区无限堆积
+                        while len(closing) >= self.max_workers:
+                            stats.append(closing.popleft().result())
+                    if current is None:
+                        current = roll()
+                    current.write(line)
+
+            if current is not None:
+                closing.append(executor.submit(current.close))
+                current = None
+            while closing:
+                stats.append(closing.popleft().result())
+        except BaseException:
+            # 收尾所有已打开的分片后删除临时文件
+            if current is not None:
+                closing.append(executor.submit(current.close))
+            for fut in closing:
+                fut.exception()
+            for tmp in tmp_paths:
+                tmp.unlink(missing_ok=True)
+            logger.error(f"Failed to save shards to {directory}")
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+        self._finalize(directory, stem, ext, tmp_paths, stats)
+
+    def _is_full(self, shard: _ShardWriter, next_size: int) -> bool:
+        if self.max_records and shard.records >= self.max_records:
+            return True
+        # 单条记录超过上限时也至少写入一条，避免产生空分片
+        if self.max_bytes and shard.records:
+            return shard.raw_bytes + next_size > self.max_bytes
+        return False
+
+    def _finalize(
+        self,
+        directory: Path,
+        stem: str,
+        ext: str,
+        tmp_paths: List[Path],
+        stats: List[Tuple[int, int]],
+    ) -> None:
+        total = len(tmp_paths)
+        shards: List[Dict[str, Any]] = []
+        for i, (tmp, (records, raw_bytes)) in enumerate(zip(tmp_paths, stats)):
+            final = directory / self._shard_name(stem, ext, i, total)
+            os.replace(tmp, final)
+            shards.append(
+                {
+                    "path": final.name,
+                    "records": records,
+                    "bytes": final.stat().st_size,
+                    "raw_bytes": raw_bytes,
+                }
+            )
+
+        # 删除之前运行留下的分片 (例如 -of-00003 被 -of-00002 取代)
+        current = {s["path"] for s in shards}
+        for old in directory.iterdir():
+            if old.name not in current and self._is_shard_name(old.name, stem, ext):
+                logger.debug(f"Removing stale shard {old}")
+                old.unlink(missing_ok=True)
+
+        manifest = {
+            "format": self.format,
+            "compression": self.compression,
+            "num_shards": total,
+            "total_records": sum(s["records"] for s in shards),
+            "shards": shards,
+        }
+        # 先写临时文件再替换，读取方不会看到写了一半的清单
+        manifest_path = self.manifest_path()
+        tmp = manifest_path.with_name(f".{manifest_path.name}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(self.codec.dumps(manifest, indent=2))
+            os.replace(tmp, manifest_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        logger.info(
+            f"Saved {manifest['total_records']} items in {total} shards "
+            f"to {directory} (manifest: {manifest_path.name})"
+        )
@@ -1,4 +1,22 @@
-from .dictable import FromDictType, ToDictType
+from .dictable import FromDictType, ToDictType, from_dicts, to_dicts
+from .random_access import (
+    RandomAccessType,
+    RangeView,
+    known_length,
+    supports_random_access,
+)
+from .cacheable import CacheableType, fingerprint_of
 
 __version__ = "0.6.0"
-__all__ = ["FromDictType", "ToDictType"]
+__all__ = [
+    "FromDictType",
+    "ToDictType",
+    "from_dicts",
+    "to_dicts",
+    "RandomAccessType",
+    "RangeView",
+    "supports_random_access",
+    "known_length",
+    "CacheableType",
+    "fingerprint_of",
+]
@@ -0,0 +1,15 @@
+from typing import Any, Optional, Protocol
+
+
+class CacheableType(Protocol):
+    """
+    能给出内容指纹的数据源/加载器：内容不变时指纹不变，内容 (可能) 变化时指纹随之改变。
+    返回 None 表示无法确定，此时不能用于持久化缓存的键。
+    """
+
+    def fingerprint(self) -> Optional[str]: ...
+
+
+def fingerprint_of(obj: Any) -> Optional[str]:
+    fingerprint = getattr(obj, "fingerprint", None)
+    return fingerprint() if callable(fingerprint) else None
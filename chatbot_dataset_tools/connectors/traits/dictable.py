@@ -1,4 +1,4 @@
-from typing import Mapping, Any, TypeVar, Protocol
+from typing import Mapping, Any, List, Sequence, Type, TypeVar, Protocol
 
 T_dictable = TypeVar("T_dictable", covariant=True)
 
@@ -10,3 +10,23 @@ class FromDictType(Protocol[T_dictable]):
 
 class ToDictType(Protocol):
     def to_dict(self) -> dict[str, Any]: ...
+
+
+def from_dicts(
+    conv_type: Type[FromDictType[T_dictable]], records: Sequence[Mapping[str, Any]]
+) -> List[T_dictable]:
+    """批量反序列化：conv_type 提供 from_dicts 时走快速路径，否则逐条 from_dict"""
+    bulk = getattr(conv_type, "from_dicts", None)
+    if bulk is not None:
+        return bulk(records)
+    return [conv_type.from_dict(r) for r in records]
+
+
+def to_dicts(items: Sequence[ToDictType]) -> List[dict[str, Any]]:
+    """批量序列化：首个元素的类型提供 to_dicts 时走快速路径，否则逐条 to_dict"""
+    if not items:
+        return []
+    bulk = getattr(type(items[0]), "to_dicts", None)
+    if bulk is not None:
+        return bulk(items)
+    return [item.to_dict() for item in items]
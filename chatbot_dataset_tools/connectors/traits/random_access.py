@@ -0,0 +1,73 @@
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Protocol, Sequence, TypeVar
+from .cacheable import fingerprint_of
+
+T_item = TypeVar("T_item", covariant=True)
+
+
+class RandomAccessType(Protocol[T_item]):
+    """
+    支持随机访问的数据源/加载器 (例如带偏移索引的 JSONL 文件)。
+    random_access 为 False 时其余方法不保证可用。
+    """
+
+    @property
+    def random_access(self) -> bool: ...
+
+    def count(self) -> int: ...
+
+    def get_many(self, indices: Sequence[int]) -> List[T_item]: ...
+
+    def load_from(self, start: int) -> Iterator[T_item]: ...
+
+
+def supports_random_access(obj: Any) -> bool:
+    return bool(getattr(obj, "random_access", False))
+
+
+def known_length(obj: Any) -> Optional[int]:
+    """
+    不迭代即可得知的长度：随机访问对象返回 count()，提供 known_count() 的对象
+    (例如已读过一遍的多文件数据源) 返回其结果，否则返回 None
+    """
+    if supports_random_access(obj):
+        return obj.count()
+    known_count = getattr(obj, "known_count", None)
+    return known_count() if known_count is not None else None
+
+
+class RangeView:
+    """随机访问对象上 [lo, hi) 区间的视图，本身同样支持随机访问"""
+
+    random_access = True
+
+    def __init__(self, base: RandomAccessType, lo: int, hi: int):
+        self.base = base
+        self.lo = lo
+        self.hi = hi
+
+    def count(self) -> int:
+        return self.hi - self.lo
+
+    def _absolute(self, i: int) -> int:
+        n = self.count()
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("index out of range")
+        return self.lo + i
+
+    def get_many(self, indices: Sequence[int]) -> List[Any]:
+        return self.base.get_many([self._absolute(i) for i in indices])
+
+    def load_from(self, start: int) -> Iterator[Any]:
+        start = max(0, start)
+        remaining = max(0, self.count() - start)
+        return islice(self.base.load_from(self.lo + start), remaining)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.load_from(0)
+
+    def fingerprint(self) -> Optional[str]:
+        base_fp = fingerprint_of(self.base)
+        return None if base_fp is None else f"{base_fp}[{self.lo}:{self.hi}]"
@@ -0,0 +1,386 @@
+from __future__ import annotations
+import functools
+import glob
+import hashlib
+import importlib
+import json
+import marshal
+import os
+import tempfile
+import types
+import uuid
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from chatbot_dataset_tools.types import Conversation
+from chatbot_dataset_tools.connectors import FileSource
+from chatbot_dataset_tools.connectors.cdtrec import CdtrecWriter
+from chatbot_dataset_tools.connectors.buffered_writer import BackgroundWriter
+from chatbot_dataset_tools.connectors.traits import fingerprint_of
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.utils import get_logger
+
+if TYPE_CHECKING:
+    from .dataset import Dataset
+
+logger = get_logger(__name__)
+
+# 缓存格式版本：库的写出逻辑或键的计算方式改变时递增，使旧缓存全部失效
+CACHE_VERSION = 3
+
+
+class _Unstable(Exception):
+    """值没有跨进程稳定的表示 (例如 repr 中带内存地址)"""
+
+
+# 库自身的函数只按名称与字节码计入指纹：它们读取的全局状态 (config 等) 要么属于库的
+# 内部实现，要么已经由缓存键中的 ds 配置覆盖
+_LIBRARY_PREFIX = __name__.split(".")[0] + "."
+
+
+def _value_key(value: Any, seen: Set[int]) -> str:
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        inner = ",".join(_value_key(v, seen) for v in value)
+        return f"{type(value).__name__}({inner})"
+    if isinstance(value, (set, frozenset)):
+        inner = ",".join(sorted(_value_key(v, seen) for v in value))
+        return f"{type(value).__name__}({inner})"
+    if isinstance(value, dict):
+        items = ",".join(
+            f"{_value_key(k, seen)}:{_value_key(v, seen)}" for k, v in value.items()
+        )
+        return f"dict({items})"
+    if isinstance(value, types.ModuleType):
+        return f"module({value.__name__})"
+    if isinstance(value, type):
+        return f"type({value.__module__}.{value.__qualname__})"
+    if callable(value):
+        return _callable_key(value, seen)
+    text = repr(value)
+    if " at 0x" in text:
+        raise _Unstable(text)
+    return text
+
+
+def _code_names(code: types.CodeType) -> Set[str]:
+    """代码 (含嵌套函数、推导式) 中引用的所有全局/属性名"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _globals_key(func: types.FunctionType, seen: Set[int]) -> str:
+    """函数读取的模块级全局变量 (包括其引用的其它函数，递归计算)"""
+    if (func.__module__ or "").startswith(_LIBRARY_PREFIX):
+        return ""
+    namespace = func.__globals__
+    # co_names 也包含属性名，只取确实存在于模块全局命名空间中的名字
+    names = sorted(n for n in _code_names(func.__code__) if n in namespace)
+    return ",".join(f"{n}={_value_key(namespace[n], seen)}" for n in names)
+
+
+def _callable_key(func: Callable, seen: Set[int]) -> str:
+    if id(func) in seen:
+        # 递归/互相引用的函数：第二次遇到时只记录名称
+        return f"ref({getattr(func, '__qualname__', type(func).__qualname__)})"
+    seen.add(id(func))
+
+    if isinstance(func, functools.partial):
+        return (
+            f"partial({_callable_key(func.func, seen)},"
+            f"{_value_key(func.args, seen)},{_value_key(func.keywords, seen)})"
+        )
+    if isinstance(func, types.MethodType):
+        return (
+            f"method({_callable_key(func.__func__, seen)},"
+            f"{_value_key(func.__self__, seen)})"
+        )
+    if isinstance(func, types.FunctionType):
+        # 代码 (含常量与嵌套函数) + 默认参数 + 闭包捕获的值 + 读取的全局变量
+        # 注册的算子工厂 (例如 min_turns(2)) 的参数就保存在闭包中
+        code = hashlib.blake2b(marshal.dumps(func.__code__), digest_size=8)
+        cells = [c.cell_contents for c in func.__closure__ or ()]
+        return (
+            f"{func.__module__}.{func.__qualname__}#{code.hexdigest()}"
+            f"({_value_key(func.__defaults__, seen)},"
+            f"{_value_key(func.__kwdefaults__, seen)},"
+            f"{_value_key(cells, seen)};{_globals_key(func, seen)})"
+        )
+    if isinstance(func, types.BuiltinFunctionType):
+        return f"builtin({getattr(func, '__module__', None)}.{func.__qualname__})"
+    # 其它可调用对象 (类实例等) 只能依赖其 repr
+    text = repr(func)
+    if " at 0x" in text:
+        raise _Unstable(text)
+    return f"{type(func).__module__}.{type(func).__qualname__}:{text}"
+
+
+def callable_fingerprint(func: Callable) -> Optional[str]:
+    """
+    算子函数的指纹：函数名、字节码、闭包捕获的参数以及读取的模块级全局变量
+    (引用的其它函数递归计算)。依赖没有稳定表示的对象时返回 None。
+    """
+    try:
+        return _callable_key(func, set())
+    except (_Unstable, RecursionError):
+        return None
+
+
+def _cache_dir() -> Path:
+    configured = config.settings.ds.cache_dir
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / "chatbot_dataset_tools"
+
+
+class CacheLoader:
+    """
+    Dataset.cache() 的加载器：第一次迭代时把上游结果写入 cdtrec 文件，
+    之后的迭代 (包括其它进程) 直接从文件读取，并支持随机访问 (len/split/sample)。
+
+    缓存键在每次迭代时重新计算 (上游文件被修改后键随之改变)；
+    键与条目类型保存在 <path>.key 侧车文件中，键不一致即视为过期并重建；
+    读取缓存时按记录的类型 (例如自定义的 Conversation 子类) 构造条目。
+
+    未指定 path 时缓存文件为 cache_dir/<name>.<key>.cdtrec。name 默认由数据源的
+    指纹与各算子的名称 (不含代码与参数) 计算，建立新缓存时删除同名的旧缓存，
+    修改算子后旧结果不会在 cache_dir 中堆积；需要同时保留只有参数不同的
+    多条流水线的缓存时，为它们指定不同的 name。
+    """
+
+    def __init__(
+        self,
+        upstream: Dataset,
+        path: Optional[str | Path] = None,
+        name: Optional[str] = None,
+    ):
+        self.upstream = upstream
+        self._path = Path(path) if path is not None else None
+        self._name = name
+        # 无法计算指纹时每个 CacheLoader 使用随机键，只在本对象内复用
+        self._fallback_key = f"unfingerprinted-{uuid.uuid4().hex}"
+        self._warned = False
+        self._source: Optional[FileSource] = None
+        # 本对象建立缓存时记录的条目类型 (局部定义的类无法按名称导入)
+        self._item_type: Optional[type] = None
+
+    def key(self) -> str:
+        fp = self.upstream.fingerprint()
+        if fp is None:
+            if not self._warned:
+                logger.warning(
+                    "Cannot fingerprint dataset (unknown source or op capturing "
+                    "objects without a stable repr); cache will not be reused "
+                    "across runs"
+                )
+                self._warned = True
+            return self._fallback_key
+        raw = repr((CACHE_VERSION, fp, repr(config.settings.ds)))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def name(self) -> Optional[str]:
+        """缓存文件名的前缀；无法确定数据源时返回 None (不清理旧缓存)"""
+        if self._name:
+            return self._name
+        source = fingerprint_of(getattr(self.upstream, "_loader", None))
+        if source is None:
+            return None
+        labels = [getattr(op, "label", None) for op in getattr(self.upstream, "_ops", ())]
+        raw = repr((CACHE_VERSION, source, labels))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+    def path(self, key: Optional[str] = None) -> Path:
+        if self._path is not None:
+            return self._path
+        key = key or self.key()
+        name = self.name()
+        return _cache_dir() / (f"{name}.{key}.cdtrec" if name else f"{key}.cdtrec")
+
+    def _remove_stale(self, path: Path) -> None:
+        """删除 cache_dir 中同名流水线以旧键写出的缓存文件"""
+        name = self._path is None and self.name()
+        if not name:
+            return
+        keep = {path.name, self._key_path(path).name}
+        for old in path.parent.glob(f"{glob.escape(name)}.*"):
+            if old.name not in keep:
+                logger.debug(f"Removing stale cache file {old}")
+                old.unlink(missing_ok=True)
+
+    @staticmethod
+    def _key_path(path: Path) -> Path:
+        return path.with_name(path.name + ".key")
+
+    def _resolve_type(self, name: str) -> Optional[type]:
+        """按 "模块:限定名" 找回条目类型；本对象建立的缓存直接复用记录的类型"""
+        if self._item_type is not None and _type_name(self._item_type) == name:
+            return self._item_type
+        module, _, qualname = name.partition(":")
+        if "<locals>" in qualname:
+            return None
+        try:
+            obj: Any = importlib.import_module(module)
+            for attr in qualname.split("."):
+                obj = getattr(obj, attr)
+        except (ImportError, AttributeError):
+            return None
+        return obj if isinstance(obj, type) else None
+
+    def _valid(self) -> Optional[Tuple[Path, type]]:
+        """缓存有效时返回 (数据文件路径, 条目类型)"""
+        key = self.key()
+        path = self.path(key)
+        try:
+            meta = json.loads(self._key_path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(meta, dict) or meta.get("key") != key or not path.exists():
+            return None
+        item_type = self._resolve_type(meta.get("type", ""))
+        if item_type is None:
+            logger.warning(f"Cannot resolve cached item type {meta.get('type')!r}")
+            return None
+        return path, item_type
+
+    def _cached_source(self, path: Path, item_type: type) -> FileSource:
+        source = self._source
+        if (
+            source is None
+            or Path(source.path) != path
+            or source.conv_type is not item_type
+        ):
+            self._source = FileSource(
+                conv_type=item_type,
+                path=str(path),
+                format="cdtrec",
+                compression="none",
+                fields=None,
+            )
+        return self._source
+
+    @property
+    def random_access(self) -> bool:
+        return self._valid() is not None
+
+    def _require_cache(self) -> FileSource:
+        valid = self._valid()
+        if valid is None:
+            raise RuntimeError("Cache has not been built yet; iterate it once first")
+        return self._cached_source(*valid)
+
+    def count(self) -> int:
+        return self._require_cache().count()
+
+    def get_many(self, indices: Sequence[int]) -> List[Any]:
+        return self._require_cache().get_many(indices)
+
+    def load_from(self, start: int) -> Iterator[Any]:
+        return self._require_cache().load_from(start)
+
+    def fingerprint(self) -> Optional[str]:
+        # 缓存不改变内容，下游 (例如再次 cache) 可沿用上游的指纹
+        return self.upstream.fingerprint()
+
+    def __iter__(self) -> Iterator[Any]:
+        valid = self._valid()
+        if valid is not None:
+            logger.debug(f"Reading cached dataset from {valid[0]}")
+            return self._cached_source(*valid).load()
+        return self._build()
+
+    def _build(self) -> Iterator[Any]:
+        """
+        迭代上游并同时写出缓存；只有完整迭代后缓存才生效。
+        条目不是同一种可往返 (to_dict/from_dict) 的类型时放弃缓存，照常产出剩余条目。
+        """
+        key = self.key()
+        path = self.path(key)
+        key_path = self._key_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        key_path.unlink(missing_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp")
+        logger.info(f"Building dataset cache at {path}")
+
+        f = open(tmp, "wb")
+        out = BackgroundWriter(f, config.settings.file.write_buffer_size)
+        writer: Optional[CdtrecWriter] = CdtrecWriter(out)
+        # 空数据集没有条目可供判断类型，按默认的 Conversation 记录
+        item_type: Optional[type] = None
+        done = False
+        # 放弃缓存时的 (当前条目, 原因)；先删除临时文件，再照常产出剩余条目
+        skipped: Optional[Tuple[Any, str]] = None
+        try:
+            it = iter(self.upstream)
+            for item in it:
+                if item_type is None:
+                    item_type = type(item)
+                    if not _round_trips(item_type):
+                        writer = None
+                elif type(item) is not item_type:
+                    writer = None
+                if writer is None:
+                    reason = (
+                        f"items must all be the same Conversation-like type "
+                        f"(got {type(item).__name__})"
+                    )
+                    skipped = (item, reason)
+                    break
+                try:
+                    # 先序列化再交出，下游原地修改对象不会影响缓存内容
+                    writer.write(item.to_dict())
+                except (ValueError, TypeError) as e:
+                    # 例如 map 在 metadata 中写入的 datetime 无法用 marshal 编码
+                    skipped = (item, f"cannot encode item ({e})")
+                    break
+                yield item
+            else:
+                writer.close()
+                out.close()
+                f.close()
+                os.replace(tmp, path)
+                meta = {"key": key, "type": _type_name(item_type or Conversation)}
+                key_path.write_text(json.dumps(meta), encoding="utf-8")
+                self._remove_stale(path)
+                self._item_type = item_type or Conversation
+                done = True
+                logger.info(f"Cached {len(writer)} items to {path}")
+        finally:
+            if not done:
+                try:
+                    out.close()
+                except Exception:
+                    pass
+                f.close()
+                tmp.unlink(missing_ok=True)
+                key_path.unlink(missing_ok=True)
+
+        if skipped is not None:
+            item, reason = skipped
+            logger.warning(f"Not caching dataset: {reason}")
+            yield item
+            yield from it
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _round_trips(cls: type) -> bool:
+    """条目类型能否写入缓存并还原：需要 to_dict 与 from_dicts/from_dict"""
+    return callable(getattr(cls, "to_dict", None)) and (
+        callable(getattr(cls, "from_dicts", None))
+        or callable(getattr(cls, "from_dict", None))
+    )
@@ -1,13 +1,19 @@
 from __future__ import annotations
 import time
 from pathlib import Path
-from typing import Optional, Iterator, Callable, TypeVar, Generic, TYPE_CHECKING
-from chatbot_dataset_tools.types import Conversation
+from typing import Any, Optional, Iterator, Callable, TypeVar, Generic, TYPE_CHECKING
+from chatbot_dataset_tools.types import Conversation, ConversationBatch
 from chatbot_dataset_tools.config import ConfigContext, GlobalSettings, config
-from chatbot_dataset_tools.connectors import DataSink, FileSink, HTTPSink
+from chatbot_dataset_tools.connectors import (
+    DataSink,
+    FileSink,
+    HTTPSink,
+    ParquetSink,
+    ShardedFileSink,
+)
 from chatbot_dataset_tools.tasks.processors import BaseProcessor
 from chatbot_dataset_tools.tasks import CheckpointManager
-from chatbot_dataset_tools.utils import get_logger
+from chatbot_dataset_tools.utils import get_logger, background_iter
 
 logger = get_logger(__name__)
 
@@ -58,6 +64,13 @@ class Dataset(Generic[T]):
         # 这里需要子类配合实现，或者简单的在子类中重写
         raise NotImplementedError
 
+    def fingerprint(self) -> Optional[str]:
+        """
+        数据集内容的指纹 (数据源 + 已堆叠的算子)，用作 cache() 的缓存键。
+        无法确定时返回 None。
+        """
+        return None
+
     def __iter__(self) -> Iterator[T]:
         raise NotImplementedError
 
@@ -213,6 +226,33 @@ class Dataset(Generic[T]):
             sink = FileSink(path=path, format="jsonl", **kwargs)
             self.save_to(sink)
 
+    def to_cdtrec(self, path: str | Path, **kwargs) -> None:
+        """
+        快捷方式：保存为 cdtrec 二进制记录格式 (适合写一次、读多次的中间结果)。
+        优先级同 to_jsonl。
+        """
+        with config.switch(self.ctx):
+            sink = FileSink(path=path, format="cdtrec", **kwargs)
+            self.save_to(sink)
+
+    def to_parquet(self, path: str | Path, **kwargs) -> None:
+        """
+        快捷方式：保存输出为 Parquet (需要 pyarrow)，每 row_group_size 条对话一个 row group。
+        优先级同 to_jsonl。
+        """
+        with config.switch(self.ctx):
+            sink = ParquetSink(path=path, **kwargs)
+            self.save_to(sink)
+
+    def to_shards(self, path: str | Path, **kwargs) -> None:
+        """
+        快捷方式：按 shard_max_records / shard_max_bytes 滚动保存为多个 JSONL 分片，
+        并在同一目录写出 manifest。优先级同 to_jsonl。
+        """
+        with config.switch(self.ctx):
+            sink = ShardedFileSink(path=path, format="jsonl", **kwargs)
+            self.save_to(sink)
+
     def to_http(self, url: str, **kwargs) -> None:
         """
         快捷方式：保存输出为到远程
@@ -242,6 +282,89 @@ class Dataset(Generic[T]):
         if batch:
             yield batch
 
+    def to_batches(self, batch_size: Optional[int] = None) -> Iterator[ConversationBatch]:
+        """
+        按块将数据集转换为列式 ConversationBatch (需要 numpy)。
+        所有批次共享同一张逐步扩展的角色词表，role id 在批次间保持一致。
+        """
+        size = batch_size or config.settings.proc.batch_size
+        roles: list[str] = []
+        for chunk in self.batch(size):
+            columnar = ConversationBatch.from_conversations(chunk, roles=roles)
+            roles = columnar.roles
+            yield columnar
+
+    def filter_batched(
+        self,
+        predicate: Callable[[ConversationBatch], Any],
+        batch_size: Optional[int] = None,
+    ) -> LazyDataset[T]:
+        """
+        向量化过滤：predicate 接收一个 ConversationBatch 并返回布尔掩码。
+        例如：ds.filter_batched(lambda b: b.turns_between(2, 16) & b.has_role("system"))
+        输出的仍是原始对话对象，不会经过列式结构重建。
+        """
+        from .lazy_dataset import LazyDataset
+
+        size = batch_size or config.settings.proc.batch_size
+        pred_name = getattr(predicate, "__name__", str(predicate))
+        logger.debug(f"Batched filter: {pred_name} (batch_size={size})")
+
+        def generator():
+            roles: list[str] = []
+            for chunk in self.batch(size):
+                columnar = ConversationBatch.from_conversations(chunk, roles=roles)
+                roles = columnar.roles
+                mask = predicate(columnar)
+                for item, keep in zip(chunk, mask):
+                    if keep:
+                        yield item
+
+        return LazyDataset(generator(), ctx=self.ctx)
+
+    def prefetch(self, n: Optional[int] = None) -> LazyDataset[T]:
+        """
+        后台预取：在独立线程中迭代当前数据集 (加载、解析及已堆叠的算子)，
+        最多预先缓冲 n 条 (默认 4 * proc.batch_size)，使上游 I/O 与下游处理重叠。
+        异常在迭代处重新抛出；提前停止迭代时后台线程随之退出。
+        """
+        from .lazy_dataset import LazyDataset
+
+        size = n or 4 * config.settings.proc.batch_size
+        chunk = config.settings.proc.batch_size
+        logger.debug(f"Prefetching up to {size} items in background")
+
+        upstream = self
+
+        class PrefetchLoader:
+            # 每次迭代都启动新的后台线程，数据集可重复迭代
+            def __iter__(self) -> Iterator[T]:
+                return background_iter(upstream, size, chunk_size=chunk)
+
+            def fingerprint(self) -> Optional[str]:
+                # 预取不改变内容
+                return upstream.fingerprint()
+
+        return LazyDataset(PrefetchLoader(), ctx=self.ctx)
+
+    def cache(
+        self, path: Optional[str | Path] = None, name: Optional[str] = None
+    ) -> LazyDataset[T]:
+        """
+        落盘缓存：第一次完整迭代时把结果写入 cdtrec 文件，之后的迭代 (包括新进程中
+        对同一流水线的调用) 直接从磁盘读取，并可随机访问 (len/split/sample 为 O(1))。
+
+        缓存键由 fingerprint() (数据源路径 + 大小 + 修改时间或 URL，加上各算子的
+        名称、代码与参数) 与 ds 配置计算；源文件或流水线改变后旧缓存自动失效并重建。
+        path 为 None 时缓存写入 ds.cache_dir 下的 <name>.<键>.cdtrec，建立新缓存时
+        删除同一 name 的旧缓存；name 默认由数据源与各算子的名称计算。
+        条目无法写入缓存 (例如 metadata 中有 datetime) 时放弃缓存，照常产出结果。
+        """
+        from .lazy_dataset import LazyDataset
+        from .cache import CacheLoader
+
+        return LazyDataset(CacheLoader(self, path, name), ctx=self.ctx)
+
     def limit(self, n: int, from_begin: bool = True) -> LazyDataset[T]:
         """只取前/后 n 条数据"""
         from .lazy_dataset import LazyDataset
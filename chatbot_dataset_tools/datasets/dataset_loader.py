@@ -1,24 +1,55 @@
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, List, Optional, Sequence
 from chatbot_dataset_tools.types import Conversation
 from .lazy_dataset import LazyDataset
 from .in_memory_dataset import InMemoryDataset
 from .dataset import T
 from chatbot_dataset_tools.config import config
-from chatbot_dataset_tools.connectors import DataSource, FileSource, HTTPSource
+from chatbot_dataset_tools.connectors import (
+    DataSource,
+    FileSource,
+    HTTPSource,
+    MultiFileSource,
+    ParquetSource,
+)
+from chatbot_dataset_tools.connectors.traits import known_length, supports_random_access
+
+
+class ReusableLoader:
+    """每次迭代都重新调用 source.load()；数据源支持随机访问时一并转发"""
+
+    def __init__(self, source: DataSource[T]):
+        self.source = source
+
+    def __iter__(self) -> Iterator[T]:
+        return self.source.load()
+
+    @property
+    def random_access(self) -> bool:
+        return supports_random_access(self.source)
+
+    def count(self) -> int:
+        return self.source.count()  # type: ignore[attr-defined]
+
+    def known_count(self) -> Optional[int]:
+        return known_length(self.source)
+
+    def fingerprint(self) -> Optional[str]:
+        return self.source.fingerprint()
+
+    def get_many(self, indices: Sequence[int]) -> List[T]:
+        return self.source.get_many(indices)  # type: ignore[attr-defined]
+
+    def load_from(self, start: int) -> Iterator[T]:
+        return self.source.load_from(start)  # type: ignore[attr-defined]
 
 
 class DatasetLoader:
     @staticmethod
     def from_source(source: DataSource[T]) -> LazyDataset[T]:
         """万能加载入口：支持 File, HTTP 等所有 DataSource"""
-
-        class ReusableLoader:
-            def __iter__(self):
-                return source.load()
-
         # 捕获加载那一刻的全局配置作为数据集的出生配置
-        return LazyDataset(ReusableLoader(), ctx=config.current)
+        return LazyDataset(ReusableLoader(source), ctx=config.current)
 
     @staticmethod
     def from_json(path: str | Path, **kwargs) -> LazyDataset[Conversation]:
@@ -32,6 +63,26 @@ class DatasetLoader:
         source = FileSource(path=path, format="jsonl", **kwargs)
         return DatasetLoader.from_source(source)
 
+    @staticmethod
+    def from_cdtrec(path: str | Path, **kwargs) -> LazyDataset[Conversation]:
+        # 自带索引的二进制格式，len/split/sample 无需解析全部记录
+        source = FileSource(path=path, format="cdtrec", **kwargs)
+        return DatasetLoader.from_source(source)
+
+    @staticmethod
+    def from_parquet(path: str | Path, **kwargs) -> LazyDataset[Conversation]:
+        # kwargs 可指定 columns, row_group_size 等 (需要 pyarrow)
+        source = ParquetSource(path=path, **kwargs)
+        return DatasetLoader.from_source(source)
+
+    @staticmethod
+    def from_files(
+        path: str | Path, format: str = "jsonl", **kwargs
+    ) -> LazyDataset[Conversation]:
+        # path 为 glob 模式或目录，kwargs 可指定 prefetch, ordered 等
+        source = MultiFileSource(path=path, format=format, **kwargs)
+        return DatasetLoader.from_source(source)
+
     @staticmethod
     def from_http(url: str, **kwargs) -> LazyDataset[Conversation]:
         # kwargs 允许覆盖 encoding, format 等
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional, Iterable, Callable, Iterator
 from .dataset import Dataset, T
+from chatbot_dataset_tools.types import ConversationBatch
 from chatbot_dataset_tools.config import ConfigContext, config
 from chatbot_dataset_tools.utils import get_logger
 
@@ -26,6 +27,16 @@ class InMemoryDataset(Dataset[T]):
         super().__init__(ctx)
         self._data = list(items)
 
+    @classmethod
+    def from_batches(
+        cls, batches: Iterable[ConversationBatch], ctx: Optional[ConfigContext] = None
+    ) -> InMemoryDataset:
+        """从列式批次构造内存数据集"""
+        return cls(
+            (conv for columnar in batches for conv in columnar.to_conversations()),
+            ctx=ctx,
+        )
+
     def __iter__(self) -> Iterator[T]:
         with config.switch(self.ctx):
             yield from iter(self._data)
@@ -1,11 +1,23 @@
 from __future__ import annotations
-from typing import Optional, Iterable, Callable, Iterator
+import random
+from typing import Optional, Iterable, Callable, Iterator, TYPE_CHECKING
 from .dataset import Dataset, T
+from .cache import callable_fingerprint
+from chatbot_dataset_tools.types import ConversationBatch
+from chatbot_dataset_tools.connectors.traits import (
+    RangeView,
+    fingerprint_of,
+    known_length,
+    supports_random_access,
+)
 from chatbot_dataset_tools.config import ConfigContext, config
 from chatbot_dataset_tools.utils import get_logger
 
 logger = get_logger(__name__)
 
+if TYPE_CHECKING:
+    from .in_memory_dataset import InMemoryDataset
+
 
 class LazyDataset(Dataset[T]):
     """
@@ -31,6 +43,19 @@ class LazyDataset(Dataset[T]):
         # ops 是一个函数列表，每个函数接收一个迭代器并返回一个迭代器
         self._ops: list[Callable[[Iterable[T]], Iterable[T]]] = ops
 
+    @classmethod
+    def from_batches(
+        cls, batches: Iterable[ConversationBatch], ctx: Optional[ConfigContext] = None
+    ) -> LazyDataset:
+        """从列式批次构造惰性数据集，迭代时逐批还原为 Conversation"""
+
+        class BatchLoader:
+            def __iter__(self):
+                for columnar in batches:
+                    yield from columnar
+
+        return cls(BatchLoader(), ctx=ctx)
+
     def __iter__(self) -> Iterator[T]:
         # 迭代时，才真正触发计算
         with config.switch(self.ctx):
@@ -42,7 +67,24 @@ class LazyDataset(Dataset[T]):
     def with_config(self, **changes) -> LazyDataset[T]:
         return LazyDataset(self._loader, self._ops, ctx=self.ctx.clone(**changes))
 
+    def fingerprint(self) -> Optional[str]:
+        """加载器的指纹 + 各个算子的指纹；任何一部分无法确定时返回 None"""
+        parts = [fingerprint_of(self._loader)]
+        parts += [getattr(op, "fingerprint", None) for op in self._ops]
+        if None in parts:
+            return None
+        return repr(parts)
+
+    @property
+    def _random_access(self) -> bool:
+        """没有堆叠算子且加载器支持随机访问 (例如带索引的 JSONL) 时可跳过全量解析"""
+        return not self._ops and supports_random_access(self._loader)
+
     def __len__(self) -> int:
+        if not self._ops:
+            n = known_length(self._loader)
+            if n is not None:
+                return n
         # 惰性数据集无法预知长度
         raise TypeError(
             "LazyDataset has unknown length; convert to list first (e.g. ds.to_list())"
@@ -53,6 +95,11 @@ class LazyDataset(Dataset[T]):
         logger.debug(f"[Lazy] Stacking MAP op: {func_name}")
 
         new_op = lambda it, f=func: (f(x) for x in it)
+        fp = callable_fingerprint(func)
+        new_op.fingerprint = fp and f"map:{fp}"  # type: ignore[attr-defined]
+        # 只含名称的标签：同一流水线修改算子后据此找到并清理旧缓存
+        label = getattr(func, "__qualname__", func_name)
+        new_op.label = f"map:{label}"  # type: ignore[attr-defined]
         return LazyDataset(self._loader, self._ops + [new_op], ctx=self.ctx)
 
     def filter(self, func: Callable[[T], bool]) -> LazyDataset[T]:
@@ -60,4 +107,36 @@ class LazyDataset(Dataset[T]):
         logger.debug(f"[Lazy] Stacking FILTER op: {func_name}")
 
         new_op = lambda it, f=func: (x for x in it if f(x))
+        fp = callable_fingerprint(func)
+        new_op.fingerprint = fp and f"filter:{fp}"  # type: ignore[attr-defined]
+        label = getattr(func, "__qualname__", func_name)
+        new_op.label = f"filter:{label}"  # type: ignore[attr-defined]
         return LazyDataset(self._loader, self._ops + [new_op], ctx=self.ctx)
+
+    def split(self, ratio: float) -> tuple[Dataset[T], Dataset[T]]:
+        if not self._random_access:
+            return super().split(ratio)
+
+        # 按索引切分为两个惰性区间视图，不解析任何记录
+        n = len(self)
+        split_idx = int(n * ratio)
+        logger.info(f"✂️ Splitting indexed dataset with ratio {ratio}")
+        return (
+            LazyDataset(RangeView(self._loader, 0, split_idx), ctx=self.ctx),
+            LazyDataset(RangeView(self._loader, split_idx, n), ctx=self.ctx),
+        )
+
+    def sample(self, n: int, seed: int = 42) -> InMemoryDataset[T]:
+        if not self._random_access:
+            return super().sample(n, seed)
+
+        from .in_memory_dataset import InMemoryDataset
+
+        # 只读取被抽中的记录
+        actual_seed = seed if seed is not None else config.settings.proc.seed
+        total = len(self)
+        random.seed(actual_seed)
+        indices = random.sample(range(total), min(n, total))
+        with config.switch(self.ctx):
+            items = self._loader.get_many(indices)  # type: ignore[attr-defined]
+        return InMemoryDataset(items, ctx=self.ctx)
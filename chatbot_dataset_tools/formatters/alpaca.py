@@ -1,6 +1,6 @@
 from typing import Any, Dict, Optional, Mapping
 from .base import BaseFormatter
-from chatbot_dataset_tools.types import Message, Conversation
+from chatbot_dataset_tools.types import Conversation
 from chatbot_dataset_tools.registry import register_formatter
 from chatbot_dataset_tools.utils import get_logger
 
@@ -53,13 +53,13 @@ class AlpacaFormatter(BaseFormatter):
             logger.warning(f"[Alpaca] Parsed empty conversation entry: {snippet}...")
 
         if inst and inp:
-            msgs.append(Message("system", inst))
-            msgs.append(Message("user", inp))
+            msgs.append(self._make_message("system", inst))
+            msgs.append(self._make_message("user", inp))
         elif inst:
-            msgs.append(Message("user", inst))
+            msgs.append(self._make_message("user", inst))
 
         if out:
-            msgs.append(Message("assistant", out))
+            msgs.append(self._make_message("assistant", out))
         else:
             # TODO: 有些数据集可能只有 input 没有 output（用于推理），这里可以记录 debug
             pass
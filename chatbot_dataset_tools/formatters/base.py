@@ -1,7 +1,7 @@
 import re
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, Protocol, runtime_checkable
-from chatbot_dataset_tools.types import Conversation
+from chatbot_dataset_tools.types import Conversation, Message, get_intern_pool
 from chatbot_dataset_tools.utils import get_logger
 
 logger = get_logger(__name__)
@@ -68,6 +68,14 @@ class BaseFormatter(ABC):
     def _get_reverse_role_map(self) -> Dict[str, str]:
         return {v: k for k, v in self.role_map.items()}
 
+    def _make_message(self, role: str, content: str) -> Message:
+        """构造消息；开启 ds.intern_strings 时会驻留角色与重复内容"""
+        pool = get_intern_pool()
+        if pool is not None:
+            role = pool.role(role)
+            content = pool.content(content)
+        return Message(role, content)
+
     @abstractmethod
     def format(self, conv: Conversation) -> Any:
         """强制子类实现"""
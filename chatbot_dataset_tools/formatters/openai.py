@@ -1,6 +1,6 @@
 from typing import Any, Dict, Optional, Mapping
 from .base import BaseFormatter
-from chatbot_dataset_tools.types import Message, Conversation
+from chatbot_dataset_tools.types import Conversation
 from chatbot_dataset_tools.registry import register_formatter
 from chatbot_dataset_tools.utils import get_logger
 
@@ -39,6 +39,6 @@ class OpenAIFormatter(BaseFormatter):
             external_role: str = m.get("role", "")
             # 将外部名转回内部名
             internal_role: str = rev_map.get(external_role, external_role)
-            messages.append(Message(role=internal_role, content=m.get("content", "")))
+            messages.append(self._make_message(internal_role, m.get("content", "")))
 
         return Conversation(messages)
@@ -1,6 +1,6 @@
 from typing import Any, Dict, Optional, Mapping
 from .base import BaseFormatter
-from chatbot_dataset_tools.types import Message, Conversation
+from chatbot_dataset_tools.types import Conversation
 from chatbot_dataset_tools.registry import register_formatter
 from chatbot_dataset_tools.utils import get_logger
 
@@ -42,7 +42,7 @@ class ShareGPTFormatter(BaseFormatter):
         for m in raw_msgs:
             role: str = m.get("from", "user")
             content = m.get("value", "")
-            messages.append(Message(role=rev_map.get(role, role), content=content))
+            messages.append(self._make_message(rev_map.get(role, role), content))
 
         metadata = data.get("metadata", {})
         return Conversation(messages, metadata)
@@ -1,5 +1,5 @@
-from typing import Callable, Iterable
-from chatbot_dataset_tools.types import Conversation
+from typing import Callable, Iterable, Optional
+from chatbot_dataset_tools.types import Conversation, count_tokens
 from chatbot_dataset_tools.config import config
 from chatbot_dataset_tools.registry import register_filter
 
@@ -22,6 +22,35 @@ def has_turns_in(min: int, max: int) -> Callable[[Conversation], bool]:
     return lambda conv: min_turns(min)(conv) and max_turns(max)(conv)
 
 
+@register_filter()
+def min_tokens(
+    n: int, tokenizer: Optional[str] = None
+) -> Callable[[Conversation], bool]:
+    """所有消息的 token 总数至少为 n (复用消息上缓存的计数)"""
+    return lambda conv: sum(count_tokens(list(conv.messages), tokenizer)) >= n
+
+
+@register_filter()
+def max_tokens(
+    n: int, tokenizer: Optional[str] = None
+) -> Callable[[Conversation], bool]:
+    """所有消息的 token 总数至多为 n"""
+    return lambda conv: sum(count_tokens(list(conv.messages), tokenizer)) <= n
+
+
+@register_filter()
+def has_tokens_in(
+    min: int, max: int, tokenizer: Optional[str] = None
+) -> Callable[[Conversation], bool]:
+    """token 总数在 [min, max] 内"""
+
+    def _filter(conv: Conversation) -> bool:
+        total = sum(count_tokens(list(conv.messages), tokenizer))
+        return min <= total <= max
+
+    return _filter
+
+
 @register_filter()
 def has_role(role: str) -> Callable[[Conversation], bool]:
     """对话中必须包含某个角色"""
@@ -1,5 +1,5 @@
 from typing import Callable, Mapping, Optional
-from chatbot_dataset_tools.types import Conversation
+from chatbot_dataset_tools.types import Conversation, MessageList, count_tokens
 from chatbot_dataset_tools.config import config
 from chatbot_dataset_tools.registry import register_transform
 
@@ -16,6 +16,8 @@ def rename_roles(
         for m in conv.messages:
             if m.role in actual_map:
                 m.role = actual_map[m.role]
+        # 原地修改了消息，通知 MessageList 使缓存的 UID 失效
+        conv.messages.touch()
         return conv
 
     return _transform
@@ -28,6 +30,7 @@ def strip_content() -> Callable[[Conversation], Conversation]:
     def _transform(conv: Conversation) -> Conversation:
         for m in conv.messages:
             m.content = m.content.strip()
+        conv.messages.touch()
         return conv
 
     return _transform
@@ -73,7 +76,36 @@ def limit_context(max_messages: int) -> Callable[[Conversation], Conversation]:
         )
 
         if len(conv.messages) > actual_max:
-            conv.data = conv.data.last(actual_max)
+            # 截断后复制出独立的列表，被丢弃的消息可以立即释放
+            conv.data = MessageList(list(conv.data.last(actual_max)))
+        return conv
+
+    return _transform
+
+
+@register_transform()
+def limit_context_tokens(
+    max_tokens: int, tokenizer: Optional[str] = None
+) -> Callable[[Conversation], Conversation]:
+    """
+    按 token 预算限制对话历史：从末尾向前保留消息，直到总数超过 max_tokens。
+    至少保留最后一条消息，即使它本身已超出预算。
+    """
+
+    def _transform(conv: Conversation) -> Conversation:
+        counts = count_tokens(list(conv.messages), tokenizer)
+
+        total = 0
+        keep = 0
+        for n in reversed(counts):
+            if keep and total + n > max_tokens:
+                break
+            total += n
+            keep += 1
+
+        if keep < len(counts):
+            # 截断后复制出独立的列表，被丢弃的消息可以立即释放
+            conv.data = MessageList(list(conv.data.last(keep)))
         return conv
 
     return _transform
@@ -1,8 +1,9 @@
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
-import json
 import os
 import re
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.connectors import get_codec
 from chatbot_dataset_tools.utils import get_logger
 
 logger = get_logger(__name__)
@@ -31,12 +32,12 @@ class PipelineConfig:
     def from_file(cls, path: str) -> "PipelineConfig":
         logger.info(f"Loading Pipeline config from: {path}")
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                raw_data = json.load(f)
+            with open(path, "rb") as f:
+                raw_data = get_codec(config.settings.file.codec).loads(f.read())
         except FileNotFoundError:
             logger.critical(f"Pipeline config file not found: {path}")
             raise
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             logger.critical(f"Invalid JSON in pipeline config: {e}")
             raise
 
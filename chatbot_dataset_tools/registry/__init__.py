@@ -1,5 +1,15 @@
 from .core import Registry
-from .types import transforms, filters, processors, formatters, sources, sinks
+from .types import (
+    transforms,
+    filters,
+    processors,
+    formatters,
+    sources,
+    sinks,
+    codecs,
+    fingerprints,
+    tokenizers,
+)
 from .types import (
     register_transform,
     register_filter,
@@ -7,6 +17,9 @@ from .types import (
     register_formatter,
     register_source,
     register_sink,
+    register_codec,
+    register_fingerprint,
+    register_tokenizer,
 )
 
 version = "0.8.5"
@@ -19,10 +32,16 @@ __all__ = [
     "formatters",
     "sources",
     "sinks",
+    "codecs",
+    "fingerprints",
+    "tokenizers",
     "register_transform",
     "register_filter",
     "register_processor",
     "register_formatter",
     "register_source",
     "register_sink",
+    "register_codec",
+    "register_fingerprint",
+    "register_tokenizer",
 ]
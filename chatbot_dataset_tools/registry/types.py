@@ -40,3 +40,23 @@ register_source = sources.register
 # JSON 示例: { "sink_type": "http", ... }
 sinks = Registry[Type]("sinks", suffix_hint="Sink")
 register_sink = sinks.register
+
+# JSON 编解码器 (Classes: BaseCodec)
+# JSON 示例: { "settings": { "file": { "codec": "orjson" } } }
+codecs = Registry[Type]("codecs", suffix_hint="Codec")
+register_codec = codecs.register
+
+
+# =============================================================================
+# 数据标识 (Identity)
+# =============================================================================
+
+# 对话内容指纹算法 (Classes: BaseFingerprint)
+# JSON 示例: { "settings": { "ds": { "fingerprint": "blake2b-64" } } }
+fingerprints = Registry[Type]("fingerprints", suffix_hint="Fingerprint")
+register_fingerprint = fingerprints.register
+
+# Token 计数器 (Classes: BaseTokenizer)
+# JSON 示例: { "settings": { "ds": { "tokenizer": "bytes" } } }
+tokenizers = Registry[Type]("tokenizers", suffix_hint="Tokenizer")
+register_tokenizer = tokenizers.register
@@ -1,8 +1,13 @@
 import os
-from typing import Set, List
+from typing import Hashable, Set, List
 
 
 class CheckpointManager:
+    """
+    断点续传进度记录。
+    UID 可能是字符串或整数 (取决于 ds.fingerprint 算法)，统一以字符串形式存储在文件中。
+    """
+
     def __init__(self, path: str, interval: int = 10):
         self.path = path
         self.interval = interval
@@ -19,11 +24,12 @@ class CheckpointManager:
             # 去除每行首尾空格及换行符
             return {line.strip() for line in f if line.strip()}
 
-    def is_processed(self, uid: str) -> bool:
-        return uid in self.processed_ids
+    def is_processed(self, uid: Hashable) -> bool:
+        return str(uid) in self.processed_ids
 
-    def save(self, uid: str):
+    def save(self, uid: Hashable):
         """记录进度（带缓冲的追加写入）"""
+        uid = str(uid)
         if uid in self.processed_ids:
             return
 
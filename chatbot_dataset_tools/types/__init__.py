@@ -2,6 +2,25 @@ from .message import Message
 from .message_list import MessageList
 from .lazy_message_view import LazyMessageView
 from .conversation import Conversation
+from .conversation_batch import ConversationBatch
+from .fingerprint import BaseFingerprint, get_fingerprint, compute_uids
+from .intern import InternPool, get_intern_pool, intern_stats
+from .tokenizer import BaseTokenizer, get_tokenizer, count_tokens
 
 __version__ = "0.8.5"
-__all__ = ["Message", "MessageList", "LazyMessageView", "Conversation"]
+__all__ = [
+    "Message",
+    "MessageList",
+    "LazyMessageView",
+    "Conversation",
+    "ConversationBatch",
+    "BaseFingerprint",
+    "get_fingerprint",
+    "compute_uids",
+    "InternPool",
+    "get_intern_pool",
+    "intern_stats",
+    "BaseTokenizer",
+    "get_tokenizer",
+    "count_tokens",
+]
@@ -1,6 +1,9 @@
 from __future__ import annotations
-import hashlib
+import copy
 from typing import (
+    Hashable,
+    List,
+    Sequence,
     Union,
     Iterable,
     Mapping,
@@ -10,68 +13,105 @@ from typing import (
     overload,
     TYPE_CHECKING,
 )
-from dataclasses import dataclass, asdict, field
 from .message import Message
 from .message_list import MessageList
+from .fingerprint import get_fingerprint
+from .tokenizer import count_tokens
 from chatbot_dataset_tools.utils import get_logger
 
 logger = get_logger(__name__)
 
+# 消息字典允许的键 (与 Message.__init__ 的参数一致)
+_MESSAGE_KEYS = frozenset(("role", "content", "metadata"))
+
 if TYPE_CHECKING:
     from .lazy_message_view import LazyMessageView
 
 
-@dataclass
 class Conversation:
-    data: MessageList
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """
+    对话对象。
+
+    使用 __slots__ 存储；metadata 字典在首次访问时才创建。
+    """
 
-    # 内部缓存 UID，避免重复计算
-    _cached_uid: Optional[str] = field(default=None, init=False, repr=False)
+    # _cached_uid: 内部缓存 UID，避免重复计算
+    # _uid_version: 计算缓存时 MessageList 的 version，不一致即视为失效
+    # _uid_algo: 计算缓存时使用的指纹算法名
+    __slots__ = ("_data", "_metadata", "_cached_uid", "_uid_version", "_uid_algo")
 
-    def __init__(self, data: Iterable[Message] = [], meta: dict = {}):
+    def __init__(self, data: Iterable[Message] = (), meta: Optional[dict] = None):
         self.data = MessageList(data)
-        self.metadata = meta
+        self._metadata = meta
+
+    @property
+    def data(self) -> MessageList:
+        return self._data
+
+    @data.setter
+    def data(self, value: MessageList) -> None:
+        self._data = value
         self._cached_uid = None
+        self._uid_version = -1
+        self._uid_algo = ""
 
     @property
     def messages(self) -> MessageList:
-        return self.data
+        return self._data
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Optional[Dict[str, Any]]) -> None:
+        self._metadata = value
+
+    def token_count(self, tokenizer: Optional[str] = None) -> int:
+        """所有消息的 token 总数，逐消息结果会被缓存"""
+        return sum(count_tokens(list(self._data), tokenizer))
 
     @property
-    def uid(self) -> str:
+    def uid(self) -> Hashable:
         return self.get_uid()
 
-    def get_uid(self, force_recompute: bool = False) -> str:
+    def get_uid(
+        self, force_recompute: bool = False, algorithm: Optional[str] = None
+    ) -> Hashable:
         """
         获取对话的唯一标识符。
 
         逻辑：
         1. 返回 metadata['id'] 或 metadata['uid'] (如果存在)。
-        2. 否则，根据消息内容生成 SHA-256 哈希。
-        """
-        if self._cached_uid and not force_recompute:
-            return self._cached_uid
+        2. 否则，根据消息内容生成指纹。算法由 algorithm 参数或 ds.fingerprint 配置决定，
+           默认 sha256 (十六进制字符串)；int64 算法返回整数。
 
-        # 1. 尝试从元数据获取显式 ID
-        explicit_id = self.metadata.get("id") or self.metadata.get("uid")
-        if explicit_id:
-            self._cached_uid = str(explicit_id)
+        内容哈希会被缓存，并在 MessageList.version 变化 (即消息被修改) 或算法切换后自动失效。
+        """
+        # 1. 尝试从元数据获取显式 ID (查找代价很低，不缓存以便及时反映修改)
+        meta = self._metadata
+        if meta:
+            explicit_id = meta.get("id") or meta.get("uid")
+            if explicit_id:
+                return str(explicit_id)
 
-            logger.debug(f"Using explicit metadata ID: {self._cached_uid}")
+        algo = get_fingerprint(algorithm)
+        data = self._data
+        if (
+            self._cached_uid is not None
+            and self._uid_version == data._version
+            and self._uid_algo == algo.name
+            and not force_recompute
+        ):
             return self._cached_uid
 
         # 2. 根据内容生成确定性哈希
         # 只哈希角色和内容，确保格式变动（如 metadata 其他字段变化）不影响身份识别
-        content_buffer = []
-        for msg in self.data:
-            content_buffer.append(f"{msg.role}:{msg.content}")
-
-        # 使用特定分隔符拼接，防止 ['a','bc'] 和 ['ab','c'] 碰撞
-        fingerprint = "|".join(content_buffer).encode("utf-8")
-        sha256_hash = hashlib.sha256(fingerprint).hexdigest()
-
-        self._cached_uid = sha256_hash
+        self._cached_uid = algo.digest(data)
+        self._uid_version = data._version
+        self._uid_algo = algo.name
         logger.debug(f"Generated Content Hash UID: {self._cached_uid}")
 
         return self._cached_uid
@@ -108,7 +148,98 @@ class Conversation:
         return cls(messages, metadata)
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"messages": [asdict(m) for m in self.data], "metadata": self.metadata}
+        return {
+            "messages": [m.to_dict() for m in self.data],
+            "metadata": self._metadata if self._metadata is not None else {},
+        }
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Any]) -> List[Conversation]:
+        """
+        批量构造对话的快速路径。
+
+        直接填充 slots，跳过 Message(**m) 的关键字参数解包与逐层 __init__；
+        消息字典含有其它键时与 Message(**m) 一样抛出 TypeError。
+        重写了 __init__ 或 from_dict 的子类会退回到逐条 from_dict。
+        """
+        if (
+            cls.__init__ is not Conversation.__init__
+            or cls.from_dict.__func__ is not _BASE_FROM_DICT
+        ):
+            return [cls.from_dict(r) for r in records]
+
+        allowed = _MESSAGE_KEYS.issuperset
+
+        new_msg = Message.__new__
+        new_conv = cls.__new__
+        wrap = MessageList._wrap
+
+        result: List[Conversation] = []
+        for record in records:
+            # 与 from_dict 一致：也接受单纯的消息字典列表
+            # (先比较 dict 类型，typing.Mapping 的 isinstance 检查相对较慢)
+            if type(record) is dict or isinstance(record, Mapping):
+                messages_data = record.get("messages", ())
+                metadata = record.get("metadata")
+            else:
+                messages_data, metadata = record, None
+
+            msgs: List[Message] = []
+            for m in messages_data:
+                if not allowed(m):
+                    Message(**m)  # 抛出与逐条构造相同的 TypeError
+                msg = new_msg(Message)
+                msg.role = m["role"]
+                msg._content = m.get("content", "")
+                msg._metadata = m.get("metadata")
+                msg._tokens = None
+                msgs.append(msg)
+
+            conv = new_conv(cls)
+            conv._data = wrap(msgs)
+            conv._metadata = metadata
+            conv._cached_uid = None
+            conv._uid_version = -1
+            conv._uid_algo = ""
+            result.append(conv)
+        return result
+
+    @staticmethod
+    def to_dicts(convs: Sequence[Conversation]) -> List[Dict[str, Any]]:
+        """
+        批量序列化的快速路径，输出与逐条 to_dict() 完全一致。
+        重写了 to_dict 的对象 (子类) 仍调用其自身实现。
+        """
+        deepcopy = copy.deepcopy
+        base_to_dict = Conversation.to_dict
+
+        result: List[Dict[str, Any]] = []
+        for conv in convs:
+            if type(conv).to_dict is not base_to_dict:
+                result.append(conv.to_dict())
+                continue
+
+            meta = conv._metadata
+            result.append(
+                {
+                    "messages": [
+                        {
+                            "role": m.role,
+                            "content": m.content,
+                            "metadata": deepcopy(m._metadata) if m._metadata else {},
+                        }
+                        for m in conv._data
+                    ],
+                    "metadata": meta if meta is not None else {},
+                }
+            )
+        return result
+
+    def __repr__(self) -> str:
+        return (
+            f"Conversation(data={self.data!r}, "
+            f"metadata={self._metadata if self._metadata is not None else {}!r})"
+        )
 
     def __str__(self) -> str:
         return f"<Conversation({len(self.data)} messages)>"
@@ -132,3 +263,7 @@ class Conversation:
         if isinstance(result, MessageList):
             return Conversation(result)
         return result
+
+
+# 基类 from_dict 的原始函数：重写了它的子类不走 from_dicts 快速路径
+_BASE_FROM_DICT = Conversation.from_dict.__func__  # type: ignore[attr-defined]
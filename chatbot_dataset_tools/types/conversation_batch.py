@@ -0,0 +1,279 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from .message import Message
+from .conversation import Conversation
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，仅列式批处理需要
+    np = None  # type: ignore[assignment]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "ConversationBatch requires numpy. Install it with `pip install numpy`."
+        )
+    return np
+
+
+class ConversationBatch:
+    """
+    列式存储的一批对话，用于向量化的过滤与统计。
+
+    存储布局：
+    - roles:            角色词表，role_ids 中的整数即该表下标
+    - role_ids:         int32 数组，每条消息一个角色 id
+    - content_buffer:   所有消息内容按 UTF-8 拼接成的连续字节串
+    - content_offsets:  int64 数组 (长度 = 消息数 + 1)，第 i 条消息位于
+                        content_buffer[content_offsets[i]:content_offsets[i+1]]
+    - content_lengths:  int64 数组，每条消息的字符数 (与 len(str) 一致)
+    - conv_offsets:     int64 数组 (长度 = 对话数 + 1)，第 j 个对话的消息下标区间
+    - metadata:         每个对话的 metadata (None 表示为空)
+    - message_metadata: 每条消息的 metadata；全部为空时为 None
+    """
+
+    __slots__ = (
+        "roles",
+        "role_ids",
+        "content_buffer",
+        "content_offsets",
+        "content_lengths",
+        "conv_offsets",
+        "metadata",
+        "message_metadata",
+    )
+
+    def __init__(
+        self,
+        roles: List[str],
+        role_ids,
+        content_buffer: bytes,
+        content_offsets,
+        content_lengths,
+        conv_offsets,
+        metadata: List[Optional[Dict[str, Any]]],
+        message_metadata: Optional[List[Optional[dict]]] = None,
+    ):
+        self.roles = roles
+        self.role_ids = role_ids
+        self.content_buffer = content_buffer
+        self.content_offsets = content_offsets
+        self.content_lengths = content_lengths
+        self.conv_offsets = conv_offsets
+        self.metadata = metadata
+        self.message_metadata = message_metadata
+
+    # --- 构造与还原 ---
+
+    @classmethod
+    def from_conversations(
+        cls, convs: Iterable[Conversation], roles: Optional[Sequence[str]] = None
+    ) -> ConversationBatch:
+        """
+        将一组对话打包为列式批次。
+        roles 可预先指定角色词表，以便多个批次之间的 role id 保持一致。
+        """
+        np = _require_numpy()
+
+        role_table: List[str] = list(roles) if roles else []
+        role_index = {r: i for i, r in enumerate(role_table)}
+
+        role_ids: List[int] = []
+        chunks: List[bytes] = []
+        byte_lens: List[int] = []
+        char_lens: List[int] = []
+        conv_offsets = [0]
+        metadata: List[Optional[dict]] = []
+        msg_meta: List[Optional[dict]] = []
+        has_msg_meta = False
+
+        for conv in convs:
+            for m in conv.messages:
+                rid = role_index.get(m.role)
+                if rid is None:
+                    rid = role_index[m.role] = len(role_table)
+                    role_table.append(m.role)
+                role_ids.append(rid)
+
+                encoded = m.content.encode("utf-8")
+                chunks.append(encoded)
+                byte_lens.append(len(encoded))
+                char_lens.append(len(m.content))
+
+                meta = m._metadata or None
+                has_msg_meta = has_msg_meta or meta is not None
+                msg_meta.append(meta)
+
+            conv_offsets.append(len(role_ids))
+            metadata.append(conv._metadata or None)
+
+        content_offsets = np.zeros(len(byte_lens) + 1, dtype=np.int64)
+        np.cumsum(byte_lens, out=content_offsets[1:])
+
+        return cls(
+            roles=role_table,
+            role_ids=np.asarray(role_ids, dtype=np.int32),
+            content_buffer=b"".join(chunks),
+            content_offsets=content_offsets,
+            content_lengths=np.asarray(char_lens, dtype=np.int64),
+            conv_offsets=np.asarray(conv_offsets, dtype=np.int64),
+            metadata=metadata,
+            message_metadata=msg_meta if has_msg_meta else None,
+        )
+
+    def _build(self, j: int) -> Conversation:
+        start, end = int(self.conv_offsets[j]), int(self.conv_offsets[j + 1])
+        roles = self.roles
+        role_ids = self.role_ids[start:end].tolist()
+        offsets = self.content_offsets[start : end + 1].tolist()
+        buf = self.content_buffer
+        msg_meta = self.message_metadata
+
+        messages = [
+            Message(
+                roles[rid],
+                buf[offsets[k] : offsets[k + 1]].decode("utf-8"),
+                msg_meta[start + k] if msg_meta else None,
+            )
+            for k, rid in enumerate(role_ids)
+        ]
+        return Conversation(messages, self.metadata[j])
+
+    def to_conversations(self) -> List[Conversation]:
+        return [self._build(j) for j in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.conv_offsets) - 1
+
+    def __iter__(self) -> Iterator[Conversation]:
+        for j in range(len(self)):
+            yield self._build(j)
+
+    def __getitem__(self, idx: int) -> Conversation:
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("ConversationBatch index out of range")
+        return self._build(idx)
+
+    @property
+    def num_messages(self) -> int:
+        return len(self.role_ids)
+
+    # --- 向量化统计 ---
+
+    def role_id(self, role: str) -> int:
+        """返回角色在词表中的 id，不存在时返回 -1"""
+        try:
+            return self.roles.index(role)
+        except ValueError:
+            return -1
+
+    def _segment_sum(self, values):
+        """将逐消息数组按对话分段求和 (空对话结果为 0)"""
+        np = _require_numpy()
+        csum = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(values, out=csum[1:])
+        return csum[self.conv_offsets[1:]] - csum[self.conv_offsets[:-1]]
+
+    def turn_counts(self):
+        """每个对话的消息数"""
+        return self.conv_offsets[1:] - self.conv_offsets[:-1]
+
+    def char_counts(self):
+        """每个对话所有消息内容的字符总数"""
+        return self._segment_sum(self.content_lengths)
+
+    def role_counts(self, role: str):
+        """每个对话中指定角色的消息数"""
+        np = _require_numpy()
+        rid = self.role_id(role)
+        if rid < 0:
+            return np.zeros(len(self), dtype=np.int64)
+        return self._segment_sum(self.role_ids == rid)
+
+    # --- 向量化谓词 (返回布尔数组) ---
+
+    def turns_between(self, min: int = 0, max: Optional[int] = None):
+        counts = self.turn_counts()
+        mask = counts >= min
+        if max is not None:
+            mask &= counts <= max
+        return mask
+
+    def chars_between(self, min: int = 0, max: Optional[int] = None):
+        counts = self.char_counts()
+        mask = counts >= min
+        if max is not None:
+            mask &= counts <= max
+        return mask
+
+    def has_role(self, role: str):
+        return self.role_counts(role) > 0
+
+    def has_roles(self, roles: Iterable[str]):
+        np = _require_numpy()
+        mask = np.ones(len(self), dtype=bool)
+        for role in roles:
+            mask &= self.has_role(role)
+        return mask
+
+    # --- 选择 ---
+
+    def select(self, mask_or_indices: Union[Sequence[int], Any]) -> ConversationBatch:
+        """按布尔掩码或下标数组选出子批次，角色词表保持不变"""
+        np = _require_numpy()
+        sel = np.asarray(mask_or_indices)
+        if sel.dtype == bool:
+            sel = np.flatnonzero(sel)
+        else:
+            sel = sel.astype(np.int64, copy=False)
+
+        starts = self.conv_offsets[sel]
+        ends = self.conv_offsets[sel + 1]
+        counts = ends - starts
+
+        conv_offsets = np.zeros(len(sel) + 1, dtype=np.int64)
+        np.cumsum(counts, out=conv_offsets[1:])
+
+        # 被选中消息的全局下标
+        msg_idx = (
+            np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            if len(sel)
+            else np.zeros(0, dtype=np.int64)
+        )
+
+        byte_starts = self.content_offsets[msg_idx]
+        byte_ends = self.content_offsets[msg_idx + 1]
+        content_offsets = np.zeros(len(msg_idx) + 1, dtype=np.int64)
+        np.cumsum(byte_ends - byte_starts, out=content_offsets[1:])
+
+        buf = self.content_buffer
+        content_buffer = b"".join(
+            buf[s:e] for s, e in zip(byte_starts.tolist(), byte_ends.tolist())
+        )
+
+        msg_meta = None
+        if self.message_metadata is not None:
+            msg_meta = [self.message_metadata[i] for i in msg_idx.tolist()]
+
+        return ConversationBatch(
+            roles=list(self.roles),
+            role_ids=self.role_ids[msg_idx],
+            content_buffer=content_buffer,
+            content_offsets=content_offsets,
+            content_lengths=self.content_lengths[msg_idx],
+            conv_offsets=conv_offsets,
+            metadata=[self.metadata[j] for j in sel.tolist()],
+            message_metadata=msg_meta,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"<ConversationBatch({len(self)} conversations, "
+            f"{self.num_messages} messages)>"
+        )
+
+    __repr__ = __str__
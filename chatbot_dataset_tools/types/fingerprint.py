@@ -0,0 +1,165 @@
+from __future__ import annotations
+import hashlib
+import struct
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional, TYPE_CHECKING
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.registry import register_fingerprint, fingerprints
+from chatbot_dataset_tools.utils import get_logger, chunked
+
+logger = get_logger(__name__)
+
+if TYPE_CHECKING:
+    from .conversation import Conversation
+    from .message import Message
+
+# UID 哈希的长度前缀帧头：role 字节长度 + content 字节长度
+_FRAME_HEADER = struct.Struct("<QQ")
+
+
+class BaseFingerprint(ABC):
+    """
+    对话内容指纹算法。
+    digest() 把每条消息以长度前缀分帧的方式流式写入 new() 返回的哈希器，
+    最后调用 finalize() 得到 UID。
+    """
+
+    name: str = ""
+
+    def digest(self, messages: Iterable[Message]) -> Hashable:
+        """计算一组消息的 UID (只哈希角色和内容)"""
+        # 长度前缀分帧防止 ['a','bc'] 和 ['ab','c'] 碰撞，
+        # 也避免为整段对话拼接出额外的字符串副本
+        hasher = self.new()
+        for msg in messages:
+            role = msg.role.encode("utf-8")
+            content = msg.content.encode("utf-8")
+            hasher.update(_FRAME_HEADER.pack(len(role), len(content)))
+            hasher.update(role)
+            hasher.update(content)
+        return self.finalize(hasher)
+
+    @abstractmethod
+    def new(self) -> Any:
+        """返回一个支持 update(bytes) 的哈希器 (hashlib 接口)"""
+        ...
+
+    @abstractmethod
+    def finalize(self, hasher: Any) -> Hashable:
+        """将哈希器的结果转换为 UID"""
+        ...
+
+
+@register_fingerprint("sha256")
+class SHA256Fingerprint(BaseFingerprint):
+    """
+    SHA-256 十六进制字符串 (64 字符)。
+    格式与旧版 UID 相同，但输入改为长度前缀分帧，同一对话的值与旧版不同；
+    需要与旧版 UID (例如已有的断点文件) 对齐时使用 sha256-legacy。
+    """
+
+    name = "sha256"
+
+    def new(self) -> Any:
+        return hashlib.sha256()
+
+    def finalize(self, hasher: Any) -> str:
+        return hasher.hexdigest()
+
+
+@register_fingerprint("sha256-legacy")
+class LegacySHA256Fingerprint(SHA256Fingerprint):
+    """
+    与旧版 UID 完全一致：SHA-256("role:content" 以 "|" 连接)。
+    该拼接方式存在歧义 (内容中含 "|" 时可能碰撞)，仅用于兼容已有数据。
+    """
+
+    name = "sha256-legacy"
+
+    def digest(self, messages: Iterable[Message]) -> str:
+        hasher = self.new()
+        sep = b""
+        for msg in messages:
+            hasher.update(sep)
+            hasher.update(f"{msg.role}:{msg.content}".encode("utf-8"))
+            sep = b"|"
+        return self.finalize(hasher)
+
+
+@register_fingerprint("blake2b-64")
+class Blake2b64Fingerprint(BaseFingerprint):
+    """BLAKE2b 8 字节摘要的十六进制字符串 (16 字符)，比 SHA-256 更快、更省内存"""
+
+    name = "blake2b-64"
+
+    def new(self) -> Any:
+        return hashlib.blake2b(digest_size=8)
+
+    def finalize(self, hasher: Any) -> str:
+        return hasher.hexdigest()
+
+
+@register_fingerprint("int64")
+class Int64Fingerprint(BaseFingerprint):
+    """
+    BLAKE2b 8 字节摘要直接转为 64 位无符号整数 (仅依赖标准库)。
+    整数 UID 的 hash/比较开销最小，适合大规模 set/dict 去重。
+    """
+
+    name = "int64"
+
+    def new(self) -> Any:
+        return hashlib.blake2b(digest_size=8)
+
+    def finalize(self, hasher: Any) -> int:
+        return int.from_bytes(hasher.digest(), "little")
+
+
+_INSTANCES: Dict[str, BaseFingerprint] = {}
+
+
+def get_fingerprint(name: Optional[str] = None) -> BaseFingerprint:
+    """
+    获取指纹算法实例。
+    优先级：参数 > 当前全局配置 (ds.fingerprint)
+    """
+    if name is None:
+        name = config.settings.ds.fingerprint
+
+    algo = _INSTANCES.get(name)
+    if algo is None:
+        algo = _INSTANCES[name] = fingerprints.get(name)()
+    return algo
+
+
+def compute_uids(
+    convs: Iterable[Conversation],
+    algorithm: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[Hashable]:
+    """
+    批量计算 UID，按输入顺序返回。
+
+    以批为单位分发到线程池；hashlib 在处理较大的缓冲区 (>2KB) 时会释放 GIL，
+    长对话的哈希因此可以真正并行。计算结果同时缓存在各个 Conversation 上。
+    """
+    # 线程池中的线程不会继承当前 contextvars，需在调用线程中解析好配置
+    algo_name = get_fingerprint(algorithm).name
+    workers = max_workers or config.settings.proc.max_workers
+    size = batch_size or config.settings.proc.batch_size
+
+    def _hash_batch(batch: List[Conversation]) -> List[Hashable]:
+        return [conv.get_uid(algorithm=algo_name) for conv in batch]
+
+    if workers <= 1:
+        return [uid for batch in chunked(convs, size) for uid in _hash_batch(batch)]
+
+    uids: List[Hashable] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(_hash_batch, chunked(convs, size)):
+            uids.extend(result)
+
+    logger.debug(f"Computed {len(uids)} UIDs ({algo_name}, {workers} workers)")
+    return uids
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class InternPool:
+    """
+    字符串驻留池：让重复出现的角色名与消息内容共享同一个 str 对象。
+
+    - 角色：数量极少，总是通过 sys.intern 驻留。
+    - 内容：同一内容出现次数达到 threshold 后才进入池中，此后的重复内容都复用池内对象；
+      池按 LRU 淘汰，最多保留 max_size 条，用于计数的候选表同样有上限。
+
+    该类不加锁：并发使用时统计数字可能略有偏差，但返回的字符串始终正确。
+    """
+
+    def __init__(self, threshold: int = 2, max_size: int = 65536):
+        self.threshold = max(1, threshold)
+        self.max_size = max_size
+
+        self._pool: OrderedDict[str, str] = OrderedDict()
+        self._seen: Dict[str, int] = {}
+
+        self._roles = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_saved = 0
+
+    def role(self, value: str) -> str:
+        canonical = sys.intern(value)
+        if canonical is not value:
+            self._bytes_saved += sys.getsizeof(value)
+        self._roles += 1
+        return canonical
+
+    def content(self, value: str) -> str:
+        pooled = self._pool.get(value)
+        if pooled is not None:
+            self._pool.move_to_end(value)
+            if pooled is not value:
+                self._bytes_saved += sys.getsizeof(value)
+            self._hits += 1
+            return pooled
+
+        self._misses += 1
+        count = self._seen.get(value, 0) + 1
+        if count < self.threshold:
+            if len(self._seen) >= self.max_size:
+                # 候选表满了直接清空，避免长尾的唯一内容无限占用内存
+                self._seen.clear()
+            self._seen[value] = count
+            return value
+
+        self._seen.pop(value, None)
+        self._pool[value] = value
+        if len(self._pool) > self.max_size:
+            self._pool.popitem(last=False)
+            self._evictions += 1
+        return value
+
+    def intern_message(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """原地驻留消息字典中的 role / content 字段"""
+        role = msg.get("role")
+        if isinstance(role, str):
+            msg["role"] = self.role(role)
+        content = msg.get("content")
+        if isinstance(content, str):
+            msg["content"] = self.content(content)
+        return msg
+
+    def intern_record(self, data: Any) -> Any:
+        """
+        原地驻留一条原始记录 ({"messages": [...]} 或消息字典列表)，
+        可在任意 conv_type.from_dict 之前调用。
+        """
+        messages = data.get("messages") if isinstance(data, dict) else data
+        if isinstance(messages, list):
+            for m in messages:
+                if isinstance(m, dict):
+                    self.intern_message(m)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        """返回驻留统计；bytes_saved 为被共享对象替换掉的重复字符串的估算字节数"""
+        return {
+            "roles": self._roles,
+            "content_hits": self._hits,
+            "content_misses": self._misses,
+            "pooled": len(self._pool),
+            "evictions": self._evictions,
+            "bytes_saved": self._bytes_saved,
+        }
+
+    def clear(self) -> None:
+        self._pool.clear()
+        self._seen.clear()
+
+    def __repr__(self) -> str:
+        return (
+            f"<InternPool pooled={len(self._pool)} "
+            f"saved={self._bytes_saved / 2**20:.1f}MiB>"
+        )
+
+
+_POOLS: Dict[Tuple[int, int], InternPool] = {}
+
+
+def get_intern_pool() -> Optional[InternPool]:
+    """
+    根据当前配置返回共享的驻留池；未开启 ds.intern_strings 时返回 None。
+    相同 (threshold, pool_size) 的配置共享同一个池。
+    """
+    ds_cfg = config.settings.ds
+    if not ds_cfg.intern_strings:
+        return None
+
+    key = (ds_cfg.intern_threshold, ds_cfg.intern_pool_size)
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = _POOLS[key] = InternPool(*key)
+        logger.debug(f"Created intern pool (threshold={key[0]}, max_size={key[1]})")
+    return pool
+
+
+def intern_stats() -> Dict[str, int]:
+    """汇总所有共享驻留池的统计信息"""
+    total = dict.fromkeys(InternPool().stats(), 0)
+    for pool in _POOLS.values():
+        for k, v in pool.stats().items():
+            total[k] += v
+    return total
@@ -1,5 +1,16 @@
 from __future__ import annotations
-from typing import Callable, List, Union, TypeAlias, overload, TYPE_CHECKING
+from itertools import islice
+from typing import (
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    TypeAlias,
+    overload,
+    TYPE_CHECKING,
+)
 from .message import Message, MessageIt
 from .message_list import MessageList
 
@@ -9,37 +20,95 @@ if TYPE_CHECKING:
 MessageOp: TypeAlias = Callable[[MessageIt], MessageIt]
 MessageOpList: TypeAlias = List[MessageOp]
 
+# 算子链中的步骤类型
+_MAP = 0
+_FILTER = 1
+_ITER = 2  # 通用的 迭代器 -> 迭代器 算子，无法融合
+
+Step: TypeAlias = Tuple[int, Callable]
+
 
 class LazyMessageView:
+    """
+    消息列表上的惰性视图。
+
+    - map/filter 只记录步骤，迭代时在单个循环内逐条消息融合执行，不会层层嵌套生成器。
+    - 物化结果 (to_list/len/repr 等) 会被缓存；视图不可变，map/filter 会返回新视图，
+      源 MessageList 被修改 (version 变化) 时缓存自动失效。
+    - view[i] / view[a:b] 在未物化时只迭代到所需位置为止。
+    """
+
     def __init__(
         self,
         source: MessageList,
         ops: MessageOpList = [],
+        _steps: Tuple[Step, ...] = (),
     ):
         self._source: MessageList = source
-        self._ops: MessageOpList = ops
+        # 兼容旧接口：外部传入的 ops 作为不可融合的迭代器算子
+        self._steps: Tuple[Step, ...] = _steps + tuple((_ITER, op) for op in ops)
+
+        self._cache: Optional[List[Message]] = None
+        self._cache_version: int = -1
+
+    def _source_version(self) -> int:
+        return getattr(self._source, "_version", 0)
+
+    def _cached(self) -> Optional[List[Message]]:
+        if self._cache is not None and self._cache_version == self._source_version():
+            return self._cache
+        return None
+
+    @staticmethod
+    def _fused(msgs: MessageIt, steps: Tuple[Step, ...]) -> Iterator[Message]:
+        """在单个循环内依次执行一段连续的 map/filter 步骤"""
+        for m in msgs:
+            for kind, func in steps:
+                if kind == _MAP:
+                    m = func(m)
+                elif not func(m):
+                    break
+            else:
+                yield m
 
     def _iter(self) -> MessageIt:
+        cached = self._cached()
+        if cached is not None:
+            return iter(cached)
+
         msgs: MessageIt = iter(self._source)
-        for op in self._ops:
-            msgs = op(msgs)
+        segment: List[Step] = []
+        for step in self._steps:
+            if step[0] == _ITER:
+                if segment:
+                    msgs = self._fused(msgs, tuple(segment))
+                    segment = []
+                msgs = step[1](msgs)
+            else:
+                segment.append(step)
+        if segment:
+            msgs = self._fused(msgs, tuple(segment))
         return msgs
 
+    def _materialize(self) -> List[Message]:
+        cached = self._cached()
+        if cached is None:
+            version = self._source_version()
+            cached = self._cache = list(self._iter())
+            self._cache_version = version
+        return cached
+
     def map(self, func: Callable[[Message], Message]) -> LazyMessageView:
-        return LazyMessageView(
-            self._source, self._ops + [lambda msgs: (func(m) for m in msgs)]
-        )
+        return LazyMessageView(self._source, _steps=self._steps + ((_MAP, func),))
 
     def filter(self, func: Callable[["Message"], bool]) -> LazyMessageView:
-        return LazyMessageView(
-            self._source, self._ops + [lambda msgs: (m for m in msgs if func(m))]
-        )
+        return LazyMessageView(self._source, _steps=self._steps + ((_FILTER, func),))
 
     def to_list(self) -> List[Message]:
-        return list(self._iter())
+        return list(self._materialize())
 
     def to_message_list(self) -> MessageList:
-        return MessageList(list(self._iter()))
+        return MessageList(self._materialize())
 
     def to_conversation(self) -> Conversation:
         from .conversation import Conversation
@@ -50,8 +119,8 @@ class LazyMessageView:
         return self._iter()
 
     def __len__(self) -> int:
-        # 注意：惰性视图需要遍历来计算长度
-        return sum(1 for _ in self._iter())
+        # 注意：惰性视图需要遍历来计算长度，结果会被缓存
+        return len(self._materialize())
 
     @overload
     def __getitem__(self, idx: int) -> Message: ...
@@ -60,14 +129,33 @@ class LazyMessageView:
     def __getitem__(self, idx: slice) -> LazyMessageView: ...
 
     def __getitem__(self, idx: int | slice) -> Union[Message, LazyMessageView]:
-        msgs = self.to_list()
-        result = msgs[idx]
-        if isinstance(result, List):
+        cached = self._cached()
+
+        if isinstance(idx, slice):
+            if cached is None and self._is_forward_slice(idx):
+                result = list(islice(self._iter(), idx.start, idx.stop, idx.step))
+            else:
+                result = self._materialize()[idx]
             return LazyMessageView(MessageList(result))
-        return result
+
+        if cached is None and idx >= 0:
+            # 只迭代到第 idx 条存活消息为止
+            for m in islice(self._iter(), idx, None):
+                return m
+            raise IndexError("LazyMessageView index out of range")
+
+        return self._materialize()[idx]
+
+    @staticmethod
+    def _is_forward_slice(idx: slice) -> bool:
+        return (
+            (idx.start is None or idx.start >= 0)
+            and (idx.stop is None or idx.stop >= 0)
+            and (idx.step is None or idx.step > 0)
+        )
 
     def __repr__(self) -> str:
-        return f"LazyMessageView({self.to_list()!r})"
+        return f"LazyMessageView({self._materialize()!r})"
 
     def __str__(self) -> str:
         return f"<LazyMessageView({len(self)} messages)>"
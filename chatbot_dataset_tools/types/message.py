@@ -1,22 +1,91 @@
-from dataclasses import dataclass, field
-from typing import Iterable, TypeAlias
+import copy
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, TypeAlias
+from .tokenizer import count_tokens
 
 
-@dataclass
 class Message:
-    role: str
-    content: str = ""
-    metadata: dict = field(default_factory=dict)
+    """
+    单条消息。
+
+    使用 __slots__ 存储，不携带 __dict__；
+    metadata 字典在首次访问时才创建，未使用元数据的消息不会额外分配空字典。
+
+    _tokens 缓存最近一次的 token 计数 (tokenizer_id, count)；
+    给 content 赋值时清空缓存，缓存不持有旧内容，被替换的文本可以立即释放。
+    """
+
+    __slots__ = ("role", "_content", "_metadata", "_tokens")
+
+    def __init__(
+        self, role: str, content: str = "", metadata: Optional[dict] = None
+    ) -> None:
+        self.role = role
+        self._content = content
+        # 传入的字典 (包括空字典) 与消息共享，与原 dataclass 一致；None 时延迟创建
+        self._metadata = metadata
+        self._tokens: Optional[Tuple[str, int]] = None
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+        self._tokens = None
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Optional[dict]) -> None:
+        self._metadata = value
 
     def __str__(self) -> str:
         return f"[{self.role}] {self.content}"
 
+    def __repr__(self) -> str:
+        return (
+            f"Message(role={self.role!r}, content={self.content!r}, "
+            f"metadata={self._metadata or {}!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (
+            self.role == other.role
+            and self.content == other.content
+            and (self._metadata or {}) == (other._metadata or {})
+        )
+
+    # 与原 dataclass 行为保持一致：可变对象不可哈希
+    __hash__ = None  # type: ignore[assignment]
+
     def copy(self) -> "Message":
         """创建消息副本，不绑定原始容器"""
         return Message(
             role=self.role,
-            content=self.content,
+            content=self._content,
         )
 
+    def token_count(self, tokenizer: Optional[str] = None) -> int:
+        """返回消息内容的 token 数 (结果缓存在消息上)"""
+        return count_tokens((self,), tokenizer)[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "content": self.content,
+            "metadata": copy.deepcopy(self._metadata) if self._metadata else {},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Message":
+        return cls(**data)
+
 
 MessageIt: TypeAlias = Iterable[Message]
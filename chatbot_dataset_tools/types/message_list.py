@@ -1,28 +1,110 @@
 from __future__ import annotations
-from typing import List, Union, overload
-from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, List, Optional, Union, overload
 from .message import Message, MessageIt
 
 
-@dataclass
 class MessageList:
-    messages: List[Message]
+    """
+    消息列表容器，使用 __slots__ 存储以减少单对象开销。
+
+    version 是一个修改计数器：每次通过本类接口修改列表 (append/setitem/
+    替换 messages 等) 都会递增，Conversation 据此判断缓存的 UID 是否失效。
+    直接原地修改列表中的 Message 对象 (例如 m.content = ...) 无法被感知，
+    此时应调用 touch() 手动标记。
+
+    写时复制 (Copy-on-Write)：
+    切片、last()、MessageList(other) 不会复制底层列表，而是与原对象共享存储并记录区间
+    [_lo, _hi) (切片不足底层列表一半时直接复制，小视图不会拖住整个大列表)。被共享的底层列表永远不会被原地修改，任何一方第一次写入时
+    才复制出自己独占的列表，因此对外行为与每次都复制完全一致。
+    """
+
+    # _messages: 底层列表 (可能与其它 MessageList 共享)
+    # _lo/_hi:   本对象可见的区间，_hi 为 None 表示直到列表末尾
+    # _shared:   底层列表是否可能被其它 MessageList 引用
+    __slots__ = ("_messages", "_lo", "_hi", "_shared", "_version")
 
     def __init__(self, msgs: MessageIt = []):
-        self.messages = list(msgs)
+        if isinstance(msgs, MessageList):
+            # 与源对象共享存储，双方在写入前各自复制
+            msgs._shared = True
+            self._messages: List[Message] = msgs._messages
+            self._lo: int = msgs._lo
+            self._hi: Optional[int] = msgs._hi
+            self._shared = True
+        else:
+            self._messages = list(msgs)
+            self._lo = 0
+            self._hi = None
+            self._shared = False
+        self._version = 0
+
+    @classmethod
+    def _view(cls, messages: List[Message], lo: int, hi: int) -> MessageList:
+        view = cls.__new__(cls)
+        view._messages = messages
+        view._lo = lo
+        view._hi = hi
+        view._shared = True
+        view._version = 0
+        return view
+
+    @classmethod
+    def _wrap(cls, messages: List[Message]) -> MessageList:
+        """直接接管一个新建的列表，不做复制 (调用方保证不再持有并修改它)"""
+        wrapped = cls.__new__(cls)
+        wrapped._messages = messages
+        wrapped._lo = 0
+        wrapped._hi = None
+        wrapped._shared = False
+        wrapped._version = 0
+        return wrapped
+
+    def _own(self) -> List[Message]:
+        """确保本对象独占底层列表 (写入前调用)，返回该列表"""
+        if self._shared or self._lo or self._hi is not None:
+            self._messages = self._messages[self._lo : self._hi]
+            self._lo = 0
+            self._hi = None
+            self._shared = False
+        return self._messages
+
+    @property
+    def messages(self) -> List[Message]:
+        return self._own()
+
+    @messages.setter
+    def messages(self, value: List[Message]) -> None:
+        self._messages = value
+        self._lo = 0
+        self._hi = None
+        self._shared = False
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def touch(self) -> None:
+        """标记内容已被原地修改，使依赖 version 的缓存失效"""
+        self._version += 1
 
     def append(self, msg: Message) -> None:
-        self.messages.append(msg)
+        self._own().append(msg)
+        self._version += 1
 
     def extend(self, msgs: MessageIt) -> None:
         for msg in msgs:
             self.append(msg)
 
     def __len__(self) -> int:
-        return len(self.messages)
+        hi = len(self._messages) if self._hi is None else self._hi
+        return hi - self._lo
 
-    def __iter__(self):
-        return iter(self.messages)
+    def __iter__(self) -> Iterator[Message]:
+        if not self._lo and self._hi is None:
+            return iter(self._messages)
+        return islice(self._messages, self._lo, self._hi)
 
     @overload
     def __getitem__(self, idx: int) -> Message: ...
@@ -31,34 +113,65 @@ class MessageList:
     def __getitem__(self, idx: slice) -> MessageList: ...
 
     def __getitem__(self, idx: slice | int) -> Union[Message, MessageList]:
-        result = self.messages[idx]
-        if isinstance(result, Message):
-            return result
-        return MessageList(result)
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                return MessageList(list(self)[idx])
+            lo = self._lo + start
+            hi = max(lo, self._lo + stop)
+            # 视图不足底层列表的一半时直接复制：复制开销与视图等长，
+            # 同时避免小视图让整个 (可能很大的) 底层列表一直存活
+            if 2 * (hi - lo) < len(self._messages):
+                return MessageList._wrap(self._messages[lo:hi])
+            # 零拷贝视图：共享底层列表
+            self._shared = True
+            return MessageList._view(self._messages, lo, hi)
+
+        if not self._lo and self._hi is None:
+            return self._messages[idx]
+
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("list index out of range")
+        return self._messages[self._lo + idx]
 
     def __setitem__(self, idx: int, value: Message) -> None:
-        self.messages[idx] = value
+        self._own()[idx] = value
+        self._version += 1
 
     def __delitem__(self, idx: int) -> None:
-        del self.messages[idx]
+        del self._own()[idx]
+        self._version += 1
 
     def __add__(self, other: MessageIt) -> MessageList:
-        return MessageList(self.messages + list(other))
+        return MessageList._wrap([*self, *other])
 
     def __iadd__(self, other: MessageIt) -> MessageList:
         self.extend(other)
         return self
 
     def __mul__(self, n: int) -> MessageList:
-        return MessageList(self.messages * n)
+        return MessageList._wrap(list(self) * n)
 
     __rmul__ = __mul__
 
     def last(self, n: int = 1) -> MessageList:
-        return MessageList(self.messages[-n:])
+        return self[-n:]
 
     def copy(self) -> MessageList:
-        return MessageList([msg.copy() for msg in self.messages])
+        return MessageList([msg.copy() for msg in self])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MessageList):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"MessageList(messages={list(self)!r})"
 
     def __str__(self) -> str:
         return f"<MessageList({len(self)} messages)>"
@@ -0,0 +1,121 @@
+from __future__ import annotations
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, TYPE_CHECKING
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.registry import register_tokenizer, tokenizers
+
+if TYPE_CHECKING:
+    from .message import Message
+
+
+class BaseTokenizer(ABC):
+    """
+    Token 计数器。
+    只需要计数，不需要真正的 token 序列；接入真实分词器时实现 count_batch 即可批量编码。
+    """
+
+    name: str = ""
+
+    @property
+    def id(self) -> str:
+        """缓存键：参数不同的同名分词器必须返回不同的 id"""
+        return self.name
+
+    @abstractmethod
+    def count(self, text: str) -> int: ...
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        return [self.count(t) for t in texts]
+
+
+@register_tokenizer("whitespace")
+class WhitespaceTokenizer(BaseTokenizer):
+    """按空白切分计数的离线估算器，适合以空格分词的语言"""
+
+    name = "whitespace"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+@register_tokenizer("bytes")
+class ByteTokenizer(BaseTokenizer):
+    """
+    按 UTF-8 字节数估算：每 bytes_per_token 个字节计为一个 token (向上取整)。
+    对中文等不以空格分词的文本比 whitespace 更接近 BPE 分词器的结果。
+    """
+
+    name = "bytes"
+
+    def __init__(self, bytes_per_token: int = 4):
+        self.bytes_per_token = max(1, bytes_per_token)
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}:{self.bytes_per_token}"
+
+    def count(self, text: str) -> int:
+        n = len(text) if text.isascii() else len(text.encode("utf-8"))
+        return -(-n // self.bytes_per_token)
+
+
+@register_tokenizer("regex")
+class RegexTokenizer(BaseTokenizer):
+    """按单词与单个标点计数 (\\w+|[^\\w\\s])，比 whitespace 更接近子词分词器"""
+
+    name = "regex"
+    _pattern = re.compile(r"\w+|[^\w\s]")
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in self._pattern.finditer(text))
+
+
+_INSTANCES: Dict[str, BaseTokenizer] = {}
+
+
+def get_tokenizer(name: Optional[str | BaseTokenizer] = None) -> BaseTokenizer:
+    """
+    获取分词器实例。
+    优先级：参数 (名称或实例) > 当前全局配置 (ds.tokenizer)
+    """
+    if isinstance(name, BaseTokenizer):
+        return name
+    if name is None:
+        name = config.settings.ds.tokenizer
+
+    tok = _INSTANCES.get(name)
+    if tok is None:
+        tok = _INSTANCES[name] = tokenizers.get(name)()
+    return tok
+
+
+def count_tokens(
+    messages: Iterable[Message], tokenizer: Optional[str | BaseTokenizer] = None
+) -> List[int]:
+    """
+    批量计算消息的 token 数，按输入顺序返回。
+
+    命中缓存的消息直接返回；其余消息的内容一次性交给 count_batch，
+    结果写回各消息的缓存 (tokenizer 改变或 content 被重新赋值后失效)。
+    """
+    tok = get_tokenizer(tokenizer)
+    tok_id = tok.id
+
+    msgs = messages if isinstance(messages, list) else list(messages)
+    counts: List[int] = [0] * len(msgs)
+    pending: List[int] = []
+
+    for i, m in enumerate(msgs):
+        cached = m._tokens
+        if cached is not None and cached[0] == tok_id:
+            counts[i] = cached[1]
+        else:
+            pending.append(i)
+
+    if pending:
+        texts = [msgs[i].content for i in pending]
+        for i, text, n in zip(pending, texts, tok.count_batch(texts)):
+            msgs[i]._tokens = (tok_id, n)
+            counts[i] = n
+    return counts
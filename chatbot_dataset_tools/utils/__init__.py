@@ -4,6 +4,7 @@ from .imports import (
     autodiscover_internal_components,
 )
 from .logger import setup_logging, get_logger
+from .iterables import chunked, background_iter
 
 __version__ = "0.8.5"
 __all__ = [
@@ -12,4 +13,6 @@ __all__ = [
     "autodiscover_internal_components",
     "setup_logging",
     "get_logger",
+    "chunked",
+    "background_iter",
 ]
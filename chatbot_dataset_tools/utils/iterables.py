@@ -0,0 +1,91 @@
+import contextvars
+import queue
+import threading
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """将任意可迭代对象按 size 条切分为列表块，最后一块可能不足 size 条"""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def background_iter(
+    iterable: Iterable[T], size: int, chunk_size: int = 1
+) -> Iterator[T]:
+    """
+    在后台线程中迭代 iterable，最多预先缓冲约 size 个元素，调用方按原顺序取出。
+
+    - 元素按 chunk_size 个一组经队列传递，减少线程间交接的开销
+    - 上游抛出的异常会在调用方重新抛出
+    - 调用方提前停止 (break / close) 时通知后台线程退出，并由后台线程关闭上游迭代器
+    - 后台线程运行在调用方上下文 (包括当前配置) 的副本中
+    """
+    chunk_size = max(1, min(chunk_size, size))
+    q: queue.Queue = queue.Queue(maxsize=max(1, size // chunk_size))
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        # 先关闭上游再交出结果 (_DONE / _Failure)，关闭时的异常也能传给调用方；
+        # iter() 本身抛出的异常同样交给调用方，否则调用方会一直等待
+        it = None
+        result: Any = _DONE
+        try:
+            it = iter(iterable)
+            for chunk in chunked(it, chunk_size):
+                if not put(chunk):
+                    result = None  # 调用方已停止读取
+                    break
+        except BaseException as e:
+            result = _Failure(e)
+        try:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+        except BaseException as e:
+            # 已有异常或调用方已停止时以先发生的为准
+            if result is _DONE:
+                result = _Failure(e)
+        if result is not None:
+            put(result)
+
+    ctx = contextvars.copy_context()
+    thread = threading.Thread(
+        target=ctx.run, args=(produce,), name="prefetch", daemon=True
+    )
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield from item
+    finally:
+        stop.set()
+        thread.join()
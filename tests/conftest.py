@@ -0,0 +1,32 @@
+import pytest
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+def _make_convs(n, rich=False):
+    """
+    第 i 条对话为 [user "q{i}", assistant "a{i}"]。
+    rich=True 时依次包含 1~3 条消息 (带 metadata 的 system 开头)，
+    奇数条带对话级 metadata，用于覆盖格式的往返细节。
+    """
+    if not rich:
+        return [
+            Conversation([Message("user", f"q{i}"), Message("assistant", f"a{i}")])
+            for i in range(n)
+        ]
+    return [
+        Conversation(
+            [
+                Message("system", "你是助手", metadata={"pinned": True}),
+                Message("user", f"q{i}"),
+                Message("assistant", f"a{i}"),
+            ][: 1 + i % 3],
+            meta={"id": i, "tags": ["x", 1.5]} if i % 2 else None,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def make_convs():
+    """构造 n 条测试对话的工厂：make_convs(n) / make_convs(n, rich=True)"""
+    return _make_convs
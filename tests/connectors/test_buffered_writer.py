@@ -0,0 +1,56 @@
+import io
+import logging
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSink
+from chatbot_dataset_tools.connectors.buffered_writer import BackgroundWriter
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+class RecordingFile(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def write(self, b):
+        self.calls += 1
+        return super().write(b)
+
+
+class FailingFile(io.BytesIO):
+    def write(self, b):
+        raise OSError("disk full")
+
+
+def test_writes_in_order_and_coalesces():
+    f = RecordingFile()
+    with BackgroundWriter(f, buffer_size=64) as out:
+        for i in range(1000):
+            out.write(b"%d," % i)
+
+    assert f.getvalue() == b"".join(b"%d," % i for i in range(1000))
+    assert out.bytes_written == len(f.getvalue())
+    # 每次 write 不会直接落到底层文件
+    assert f.calls < 1000 / 10
+
+
+def test_background_error_is_raised():
+    out = BackgroundWriter(FailingFile(), buffer_size=1)
+    with pytest.raises(OSError, match="disk full"):
+        for _ in range(100):
+            out.write(b"x")
+        out.close()
+
+
+def test_sink_small_buffer_and_count(tmp_path, caplog):
+    convs = [Conversation([Message("user", f"m{i}")]) for i in range(50)]
+    path = tmp_path / "out.jsonl"
+    cfg = FileConfig(path=path, format="jsonl", write_buffer_size=16)
+    sink = FileSink(file_cfg=cfg)
+
+    with caplog.at_level(logging.INFO, logger="chatbot_dataset_tools.connectors.file"):
+        sink.save(convs)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 50
+    assert f"Saved 50 items to {path}" in caplog.text
@@ -0,0 +1,64 @@
+import pytest
+from chatbot_dataset_tools.connectors import FileSink, FileSource
+from chatbot_dataset_tools.connectors.cdtrec import CdtrecFile
+from chatbot_dataset_tools.datasets import DatasetLoader
+
+
+@pytest.fixture
+def cdtrec_file(tmp_path, make_convs):
+    path = tmp_path / "data.cdtrec"
+    FileSink(path=path, format="cdtrec").save(make_convs(50, rich=True))
+    return path
+
+
+def test_round_trip(cdtrec_file, make_convs):
+    loaded = list(FileSource(path=cdtrec_file, format="cdtrec").load())
+    expected = make_convs(50, rich=True)
+    assert [c.to_dict() for c in loaded] == [c.to_dict() for c in expected]
+
+
+def test_role_table_and_random_access(cdtrec_file):
+    with CdtrecFile(cdtrec_file) as rec:
+        assert len(rec) == 50
+        assert rec.roles == ["system", "user", "assistant"]
+        assert rec.record(-1)["messages"][1]["content"] == "q49"
+        with pytest.raises(IndexError):
+            rec.record(50)
+
+    src = FileSource(path=cdtrec_file, format="cdtrec")
+    assert src.random_access
+    assert src.count() == 50
+    assert [c.metadata["id"] for c in src.get_many([7, 3])] == [7, 3]
+    assert [c[0].content for c in src.load_from(48)] == ["你是助手", "你是助手"]
+
+
+def test_dataset_len_split_sample(tmp_path, make_convs):
+    path = tmp_path / "data.cdtrec"
+    DatasetLoader.from_list(make_convs(20, rich=True)).to_cdtrec(path)
+
+    ds = DatasetLoader.from_cdtrec(path)
+    assert len(ds) == 20
+    train, test = ds.split(0.75)
+    assert (len(train), len(test)) == (15, 5)
+    assert list(test)[0].metadata["id"] == 15
+    assert len(ds.sample(4)) == 4
+
+
+def test_empty_and_stale(tmp_path, make_convs):
+    path = tmp_path / "data.cdtrec"
+    FileSink(path=path, format="cdtrec").save([])
+    src = FileSource(path=path, format="cdtrec")
+    assert list(src.load()) == []
+
+    FileSink(path=path, format="cdtrec").save(make_convs(3, rich=True))
+    assert src.count() == 3
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / "data.cdtrec"
+    path.write_bytes(b"not a cdtrec file at all, just some bytes")
+    with pytest.raises(ValueError, match="Not a cdtrec file"):
+        list(FileSource(path=path, format="cdtrec").load())
+
+    with pytest.raises(ValueError, match="cannot be compressed"):
+        FileSink(path=tmp_path / "data.cdtrec.gz", format="cdtrec").save([])
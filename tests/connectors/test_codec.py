@@ -0,0 +1,86 @@
+import json
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSource, FileSink, get_codec
+from chatbot_dataset_tools.types import Conversation, Message
+
+CODECS = ["stdlib", "orjson", "msgspec", "ujson"]
+
+RECORD = {
+    "messages": [
+        {"role": "user", "content": "你好 😀", "metadata": {}},
+        {"role": "assistant", "content": 'say "hi"\n', "metadata": {"n": 1.5}},
+    ],
+    "metadata": {"id": 7, "tags": ["a", None, True]},
+}
+
+
+@pytest.fixture(params=CODECS)
+def codec_name(request):
+    if request.param != "stdlib":
+        pytest.importorskip(request.param)
+    return request.param
+
+
+def test_roundtrip(codec_name):
+    codec = get_codec(codec_name)
+    buf = codec.dumps(RECORD)
+    assert isinstance(buf, bytes)
+    # 输出为 UTF-8，且与标准库解析结果一致
+    assert "你好".encode("utf-8") in buf
+    assert json.loads(buf) == RECORD
+    assert codec.loads(buf) == RECORD
+    assert codec.loads(buf.decode("utf-8")) == RECORD
+
+
+def test_indent(codec_name):
+    buf = get_codec(codec_name).dumps({"a": [1]}, indent=4)
+    assert json.loads(buf) == {"a": [1]}
+    assert b"\n    " in buf
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_non_str_keys_match_stdlib(codec_name, indent):
+    # 元数据中的整数键与标准库一样转换为字符串，而不是报错
+    obj = {"metadata": {1: "a", 2.5: "b"}}
+    assert json.loads(get_codec(codec_name).dumps(obj, indent=indent)) == json.loads(
+        json.dumps(obj)
+    )
+
+
+def test_auto_codec_saves_non_str_metadata_keys(tmp_path):
+    path = tmp_path / "out.jsonl"
+    FileSink(path=path).save([Conversation([Message("user", "x")], meta={1: "a"})])
+    assert json.loads(path.read_bytes())["metadata"] == {"1": "a"}
+
+
+def test_decode_error_is_value_error(codec_name):
+    with pytest.raises(ValueError):
+        get_codec(codec_name).loads(b"{not json")
+
+
+def test_auto_codec():
+    assert get_codec("auto").name in CODECS
+    assert get_codec() is get_codec("auto")
+
+
+def test_file_roundtrip_with_codec(tmp_path, codec_name):
+    convs = [Conversation.from_dict(RECORD), Conversation([Message("user", "x")])]
+    for fmt in ("json", "jsonl"):
+        cfg = FileConfig(path=tmp_path / f"out.{fmt}", format=fmt, codec=codec_name)
+        FileSink(file_cfg=cfg).save(convs)
+        loaded = list(FileSource(file_cfg=cfg).load())
+        assert [c.to_dict() for c in loaded] == [c.to_dict() for c in convs]
+
+
+@pytest.mark.parametrize("encoding", ["gbk", "utf-16"])
+def test_non_utf8_encoding(tmp_path, encoding):
+    convs = [Conversation([Message("user", "中文内容")]), Conversation([Message("user", "b")])]
+    for fmt in ("json", "jsonl"):
+        cfg = FileConfig(path=tmp_path / f"out.{fmt}", format=fmt, encoding=encoding)
+        FileSink(file_cfg=cfg).save(convs)
+        # 整个文件是一段合法的目标编码文本 (BOM 只出现一次)
+        text = cfg.path.read_bytes().decode(encoding)
+        assert "中文内容" in text and "\ufeff" not in text
+        loaded = list(FileSource(file_cfg=cfg).load())
+        assert [c.messages[0].content for c in loaded] == ["中文内容", "b"]
@@ -0,0 +1,82 @@
+import gzip
+import json
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSource, FileSink
+from chatbot_dataset_tools.connectors.compression import (
+    detect_compression,
+    open_read,
+    open_write,
+)
+from chatbot_dataset_tools.types import Conversation, Message
+
+
+@pytest.fixture
+def conversations():
+    return [
+        Conversation([Message("user", f"问题 {i}"), Message("assistant", "好")])
+        for i in range(300)
+    ]
+
+
+def test_detect_compression():
+    assert detect_compression("a.jsonl.gz") == "gzip"
+    assert detect_compression("a.jsonl.BZ2") == "bz2"
+    assert detect_compression("a.jsonl.xz") == "xz"
+    assert detect_compression("a.jsonl") is None
+    assert detect_compression("a.jsonl.gz", "none") is None
+    assert detect_compression("a.data", "xz") == "xz"
+    with pytest.raises(ValueError):
+        detect_compression("a.jsonl", "zip")
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_threaded_read_roundtrip(tmp_path, compression):
+    payload = b"".join(b"line %d\n" % i for i in range(50000))
+    path = tmp_path / "data.bin"
+    with open_write(path, compression) as f:
+        f.write(payload)
+    with open_read(path, compression) as f:
+        assert f.read() == payload
+    with open_read(path, compression) as f:
+        assert next(iter(f)) == b"line 0\n"  # 提前关闭不会卡住后台线程
+
+
+@pytest.mark.parametrize("ext", [".gz", ".bz2", ".xz"])
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_file_roundtrip(tmp_path, conversations, ext, fmt):
+    cfg = FileConfig(path=tmp_path / f"out.{fmt}{ext}", format=fmt)
+    FileSink(file_cfg=cfg).save(conversations)
+
+    loaded = list(FileSource(file_cfg=cfg).load())
+    assert [c.to_dict() for c in loaded] == [c.to_dict() for c in conversations]
+
+
+def test_explicit_compression_and_level(tmp_path, conversations):
+    path = tmp_path / "out.jsonl"
+    cfg = FileConfig(
+        path=path, format="jsonl", compression="gzip", compression_level=1
+    )
+    FileSink(file_cfg=cfg).save(conversations)
+
+    lines = gzip.decompress(path.read_bytes()).splitlines()
+    assert json.loads(lines[0])["messages"][0]["content"] == "问题 0"
+    assert len(list(FileSource(file_cfg=cfg).load())) == 300
+
+
+def test_compressed_parallel_and_index_fallback(tmp_path, conversations):
+    cfg = FileConfig(path=tmp_path / "out.jsonl.gz", format="jsonl", index=True)
+    FileSink(file_cfg=cfg).save(conversations)
+
+    source = FileSource(file_cfg=cfg, parallel=True)
+    assert not source.random_access
+    assert len(list(source.load())) == 300
+    with pytest.raises(ValueError):
+        source.count()
+
+
+def test_corrupt_input_raises(tmp_path):
+    path = tmp_path / "bad.jsonl.gz"
+    path.write_bytes(gzip.compress(b'{"messages": []}\n')[:-6] + b"garbage")
+    with pytest.raises(Exception):
+        list(FileSource(file_cfg=FileConfig(path=path, format="jsonl")).load())
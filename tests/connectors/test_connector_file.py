@@ -1,4 +1,5 @@
 import json
+import logging
 import pytest
 from chatbot_dataset_tools.types import Conversation, Message
 from chatbot_dataset_tools.connectors import FileSource, FileSink
@@ -66,6 +67,78 @@ class TestFileSource:
         assert len(results) == 2
         assert results[0].messages[1].role == "assistant"
 
+    def test_load_jsonl_parallel(self, tmp_path):
+        path = tmp_path / "big.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(200):
+                conv = Conversation([Message("user", f"问题 {i}\u2028")], meta={"i": i})
+                f.write(json.dumps(conv.to_dict(), ensure_ascii=False) + "\n")
+                if i % 50 == 0:
+                    f.write("\n")  # 空行应被跳过
+
+        with config.switch(max_workers=3):
+            cfg = FileConfig(
+                path=path, format="jsonl", parallel=True, shard_size=512, codec="stdlib"
+            )
+            ordered = list(FileSource(file_cfg=cfg).load())
+            unordered = list(FileSource(file_cfg=cfg, ordered=False).load())
+
+        assert [c.metadata["i"] for c in ordered] == list(range(200))
+        assert ordered[7].messages[0].content == "问题 7\u2028"
+        assert sorted(c.metadata["i"] for c in unordered) == list(range(200))
+
+    def test_load_jsonl_parallel_skipped_for_fast_codecs(self, tmp_path, caplog):
+        path = tmp_path / "big.jsonl"
+        path.write_text('{"messages": []}\n' * 100, encoding="utf-8")
+        cfg = FileConfig(path=path, parallel=True, shard_size=64, codec="orjson")
+
+        with config.switch(max_workers=2), caplog.at_level(logging.WARNING):
+            assert len(list(FileSource(file_cfg=cfg).load())) == 100
+        assert "falling back to sequential JSONL loading" in caplog.text
+
+    def test_repeated_loads_reuse_offsets(self, tmp_path, monkeypatch):
+        from chatbot_dataset_tools.connectors import file as file_module
+        from chatbot_dataset_tools.datasets import DatasetLoader
+
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"messages": []}\n' * 50, encoding="utf-8")
+        calls = {"shards": 0, "index": 0}
+        shards, open_index = file_module._jsonl_shards, file_module.JsonlIndex.open
+
+        def count_shards(*args):
+            calls["shards"] += 1
+            return shards(*args)
+
+        def count_index(*args, **kwargs):
+            calls["index"] += 1
+            return open_index(*args, **kwargs)
+
+        monkeypatch.setattr(file_module, "_jsonl_shards", count_shards)
+        monkeypatch.setattr(file_module.JsonlIndex, "open", count_index)
+
+        with config.switch(max_workers=2):
+            ds = DatasetLoader.from_jsonl(
+                path, parallel=True, codec="stdlib", shard_size=256, index=True
+            )
+            assert len(list(ds)) == len(list(ds)) == 50
+            assert len(ds) == 50
+            train, test = ds.split(0.8)
+            assert len(list(test)) == 10
+        # 分片区间与偏移索引都缓存在数据源上
+        assert calls == {"shards": 1, "index": 1}
+
+        # 文件改变后重新计算
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"messages": []}\n')
+        with config.switch(max_workers=2):
+            assert len(list(ds)) == len(ds) == 51
+        assert calls == {"shards": 2, "index": 2}
+
+    def test_load_jsonl_parallel_small_file(self, temp_jsonl_file):
+        cfg = FileConfig(path=temp_jsonl_file, format="jsonl", parallel=True)
+        results = list(FileSource(file_cfg=cfg).load())
+        assert [c.metadata["id"] for c in results] == ["001", "002"]
+
     def test_unsupported_format(self, tmp_path):
         cfg = FileConfig(path=tmp_path / "test.txt", format="xml")
         source = FileSource(file_cfg=cfg)
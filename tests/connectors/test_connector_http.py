@@ -1,4 +1,5 @@
 import json
+import logging
 import pytest
 import respx
 from httpx import Response
@@ -151,3 +152,306 @@ def test_source_invalid_path():
         source = HTTPSource(HTTPConfig(url=url, data_path=["items"]))
         with pytest.raises(ValueError, match="invalid for current structure"):
             list(source.load())
+
+
+def make_records(lo, hi):
+    return [
+        {"messages": [{"role": "user", "content": f"q{i}"}], "metadata": {}}
+        for i in range(lo, hi)
+    ]
+
+
+class TestHTTPPagination:
+    @respx.mock
+    def test_offset_pagination_concurrent_in_order(self):
+        url = "http://api.test/page"
+        total = 23
+
+        def handler(request):
+            offset = int(request.url.params["offset"])
+            limit = int(request.url.params["limit"])
+            records = make_records(offset, min(offset + limit, total))
+            return Response(200, json={"data": records})
+
+        route = respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(
+            HTTPConfig(url=url, pagination="offset", page_size=5, page_concurrency=3)
+        )
+        results = [c[0].content for c in source.load()]
+        assert results == [f"q{i}" for i in range(total)]
+        # 第 5 页 (3 条) 之后从偏移 23 继续，遇到空页停止；
+        # 被丢弃的请求与结尾的空页各自不超过一个窗口
+        assert 6 <= route.call_count <= 5 + 2 * 3
+
+    @pytest.mark.parametrize("pagination", ["offset", "page"])
+    @respx.mock
+    def test_server_capping_limit_keeps_all_records(self, pagination, caplog):
+        url = "http://api.test/capped"
+        total, cap = 23, 4
+
+        def handler(request):
+            limit = min(int(request.url.params["limit"]), cap)
+            if pagination == "offset":
+                lo = int(request.url.params["offset"])
+            else:
+                lo = int(request.url.params["page"]) * limit
+            records = make_records(lo, min(lo + limit, total))
+            return Response(200, json={"data": records})
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(
+            HTTPConfig(
+                url=url,
+                pagination=pagination,
+                first_page=0,
+                page_size=10,
+                page_concurrency=3,
+            )
+        )
+        with caplog.at_level(logging.WARNING):
+            results = [c[0].content for c in source.load()]
+        assert results == [f"q{i}" for i in range(total)]
+        assert "probably caps the limit" in caplog.text
+
+    @respx.mock
+    def test_page_number_pagination_with_max_pages(self):
+        url = "http://api.test/numbered"
+
+        def handler(request):
+            page = int(request.url.params["p"])
+            return Response(200, json={"data": make_records(page * 2, page * 2 + 2)})
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(
+            HTTPConfig(
+                url=url,
+                pagination="page",
+                page_param="p",
+                first_page=0,
+                page_size=2,
+                max_pages=3,
+                params={"lang": "zh"},
+            )
+        )
+        assert [c[0].content for c in source.load()] == [f"q{i}" for i in range(6)]
+
+    @respx.mock
+    def test_cursor_pagination(self):
+        url = "http://api.test/cursor"
+        pages = {
+            None: (make_records(0, 2), "c1"),
+            "c1": (make_records(2, 4), "c2"),
+            "c2": (make_records(4, 5), None),
+        }
+
+        def handler(request):
+            records, nxt = pages[request.url.params.get("cursor")]
+            return Response(200, json={"items": records, "meta": {"next": nxt}})
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(
+            HTTPConfig(
+                url=url,
+                pagination="cursor",
+                data_path=["items"],
+                cursor_path=["meta", "next"],
+            )
+        )
+        assert [c[0].content for c in source.load()] == [f"q{i}" for i in range(5)]
+
+    @respx.mock
+    def test_link_header_pagination(self):
+        url = "http://api.test/linked"
+
+        def handler(request):
+            page = int(request.url.params.get("page", 0))
+            headers = {}
+            if page < 2:
+                headers["Link"] = f'</linked?page={page + 1}>; rel="next"'
+            return Response(200, json=make_records(page, page + 1), headers=headers)
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(HTTPConfig(url=url, pagination="link", data_path=[]))
+        assert [c[0].content for c in source.load()] == ["q0", "q1", "q2"]
+
+    @respx.mock
+    def test_page_error_propagates(self):
+        url = "http://api.test/broken"
+
+        def handler(request):
+            if request.url.params["offset"] == "4":
+                return Response(500)
+            return Response(200, json={"data": make_records(0, 2)})
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(HTTPConfig(url=url, pagination="offset", page_size=2))
+        with pytest.raises(Exception):
+            list(source.load())
+
+    def test_unknown_pagination(self):
+        with pytest.raises(ValueError, match="pagination"):
+            HTTPSource(HTTPConfig(url="http://x", pagination="scroll"))
+
+
+class TestHTTPStreaming:
+    @respx.mock
+    def test_stream_json_yields_before_body_completes(self):
+        url = "http://api.test/big"
+        sent = []
+
+        def body():
+            records = make_records(0, 3)
+            yield b'{"status": "ok", "data": ['
+            for i, record in enumerate(records):
+                sent.append(i)
+                yield (b"," if i else b"") + json.dumps(record).encode()
+            yield b"]}"
+
+        respx.get(url).mock(return_value=Response(200, content=body()))
+        with config.switch(batch_size=1):
+            source = HTTPSource(HTTPConfig(url=url, stream=True))
+        it = source.load()
+        assert next(it)[0].content == "q0"
+        assert len(sent) < 3  # 第一条记录在响应体结束前就已产出
+        assert [c[0].content for c in it] == ["q1", "q2"]
+
+    @respx.mock
+    def test_stream_ndjson_by_content_type(self):
+        url = "http://api.test/ndjson"
+        lines = b"\n".join(json.dumps(r).encode() for r in make_records(0, 4))
+        respx.get(url).mock(
+            return_value=Response(
+                200,
+                content=iter([lines[:30], lines[30:] + b"\n"]),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+        )
+        source = HTTPSource(HTTPConfig(url=url, stream=True))
+        assert [c[0].content for c in source.load()] == [f"q{i}" for i in range(4)]
+
+    @respx.mock
+    def test_ndjson_without_streaming(self):
+        url = "http://api.test/ndjson"
+        lines = b"\n".join(json.dumps(r).encode() for r in make_records(0, 2))
+        respx.get(url).mock(return_value=Response(200, content=lines))
+        source = HTTPSource(HTTPConfig(url=url, response_format="ndjson"))
+        assert [c[0].content for c in source.load()] == ["q0", "q1"]
+
+    @respx.mock
+    def test_stream_link_pagination(self):
+        url = "http://api.test/linked"
+
+        def handler(request):
+            page = int(request.url.params.get("page", 0))
+            headers = {}
+            if page < 1:
+                headers["Link"] = f'<{url}?page={page + 1}>; rel="next"'
+            body = json.dumps({"data": make_records(page, page + 1)}).encode()
+            return Response(200, content=iter([body]), headers=headers)
+
+        respx.get(url).mock(side_effect=handler)
+        source = HTTPSource(HTTPConfig(url=url, pagination="link", stream=True))
+        assert [c[0].content for c in source.load()] == ["q0", "q1"]
+
+    @respx.mock
+    def test_stream_http_error(self):
+        url = "http://api.test/gone"
+        respx.get(url).mock(return_value=Response(503))
+        with pytest.raises(Exception):
+            list(HTTPSource(HTTPConfig(url=url, stream=True)).load())
+
+
+class TestHTTPSinkChunked:
+    @respx.mock
+    def test_chunks_by_records_and_keeps_all_items(self, make_convs):
+        url = "http://api.test/upload"
+        route = respx.post(url).mock(return_value=Response(200))
+
+        sink = HTTPSink(
+            HTTPConfig(url=url, method="POST", upload_records=4, upload_concurrency=3)
+        )
+        sink.save(make_convs(10))
+
+        assert route.call_count == 3
+        bodies = [json.loads(call.request.content) for call in route.calls]
+        assert sorted(len(b["data"]) for b in bodies) == [2, 4, 4]
+        contents = sorted(
+            int(r["messages"][0]["content"][1:]) for b in bodies for r in b["data"]
+        )
+        assert contents == list(range(10))
+
+    @respx.mock
+    def test_chunks_by_bytes(self, make_convs):
+        url = "http://api.test/upload"
+        route = respx.post(url).mock(return_value=Response(200))
+
+        sink = HTTPSink(HTTPConfig(url=url, method="POST", upload_bytes=300))
+        sink.save(make_convs(20))
+
+        sizes = [len(call.request.content) for call in route.calls]
+        assert route.call_count > 1 and max(sizes) <= 300
+        total = sum(len(json.loads(c.request.content)["data"]) for c in route.calls)
+        assert total == 20
+
+    @respx.mock
+    def test_retries_failed_chunks(self, make_convs):
+        url = "http://api.test/flaky"
+        responses = iter([Response(503), Response(429), Response(200)])
+        route = respx.post(url).mock(side_effect=lambda request: next(responses))
+
+        sink = HTTPSink(
+            HTTPConfig(url=url, method="POST", upload_records=10, upload_backoff=0)
+        )
+        sink.save(make_convs(3))
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_gives_up_on_client_errors(self, make_convs):
+        url = "http://api.test/bad"
+        route = respx.post(url).mock(return_value=Response(400))
+
+        sink = HTTPSink(
+            HTTPConfig(url=url, method="POST", upload_records=10, upload_backoff=0)
+        )
+        with pytest.raises(Exception):
+            sink.save(make_convs(3))
+        assert route.call_count == 1
+
+    @respx.mock
+    def test_chunked_payload_with_index_path(self, make_convs):
+        url = "http://api.test/nested"
+        route = respx.post(url).mock(return_value=Response(200))
+
+        sink = HTTPSink(
+            HTTPConfig(url=url, method="POST", data_path=["a", 1], upload_records=5)
+        )
+        sink.save(make_convs(2))
+        body = json.loads(route.calls.last.request.content)
+        assert body["a"][0] is None
+        assert [r["messages"][0]["content"] for r in body["a"][1]] == ["q0", "q1"]
+
+    @pytest.mark.parametrize(
+        "data_path", [["a", -2], ["a", 1, "b", -3], [-2, "[]", -1], [0]]
+    )
+    @respx.mock
+    def test_chunked_payload_matches_wrap_data(self, data_path, make_convs):
+        url = "http://api.test/nested"
+        route = respx.post(url).mock(return_value=Response(200))
+
+        sink = HTTPSink(
+            HTTPConfig(url=url, method="POST", data_path=data_path, upload_records=2)
+        )
+        convs = make_convs(3)
+        sink.save(convs)
+        # 每个分块都与整体包装的结构一致 (占位的 null 位于记录列表前后)
+        bodies = [json.loads(c.request.content) for c in route.calls]
+        assert bodies == [
+            sink._wrap_data([c.to_dict() for c in convs[:2]]),
+            sink._wrap_data([convs[2].to_dict()]),
+        ]
+
+    def test_wrap_data_with_indices(self):
+        sink = HTTPSink(HTTPConfig(data_path=["v1", 2, "items"]))
+        assert sink._wrap_data([1]) == {"v1": [None, None, {"items": [1]}]}
+        sink = HTTPSink(HTTPConfig(data_path=[-1]))
+        assert sink._wrap_data([1]) == [[1]]
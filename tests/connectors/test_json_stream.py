@@ -0,0 +1,136 @@
+import json
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSource
+from chatbot_dataset_tools.connectors.json_stream import (
+    iter_byte_lines,
+    iter_json_array,
+    iter_json_path,
+    iter_text_chunks,
+)
+
+DATA = [
+    {
+        "messages": [{"role": "user", "content": "你好, [\"]}{,"}],
+        "metadata": {"deep": [[{"a": {"b": [1, 2.5e3, None]}}]], "s": "\\u005d"},
+    },
+    {"messages": [], "metadata": {}},
+    123,
+    "tail",
+]
+
+
+def split(text: str, size: int):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_iter_json_array_any_chunking(size):
+    text = json.dumps(DATA, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(split(text, size))) == DATA
+
+
+def test_empty_array():
+    assert list(iter_json_array([" [ ", " ] \n"])) == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"a": 1}', "", "[1, 2", "[1 2]", "[1,]", "[1] x", "[{]"],
+)
+def test_invalid_input(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(split(text, 2)))
+
+
+@pytest.mark.parametrize("bad", ['{"a": 1 "b"}', '{"a": tru}', '{"a": "x\ny"}'])
+def test_malformed_element_fails_without_reading_tail(bad):
+    # 损坏的元素之后还有大量数据：应立即报错，而不是读完整个文件
+    read = []
+
+    def chunks():
+        yield "[" + bad + ", " + " " * 64
+        for _ in range(10_000):
+            read.append(1)
+            yield '{"messages": []}, '
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunks()))
+    assert len(read) < 10
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5])
+def test_numbers_split_across_chunks(size):
+    text = "[1.5e3, -0.25, 1e-7, 10, 2]"
+    assert list(iter_json_array(split(text, size))) == [1.5e3, -0.25, 1e-7, 10, 2]
+
+
+def test_not_a_list_message():
+    with pytest.raises(ValueError, match="Json Data Must be a list"):
+        list(iter_json_array(['{"not": "a list"}']))
+
+
+def test_multibyte_split_across_chunks():
+    raw = json.dumps(["中文"], ensure_ascii=False).encode("utf-8")
+    byte_chunks = [raw[i : i + 1] for i in range(len(raw))]
+    assert list(iter_json_array(iter_text_chunks(byte_chunks, "utf-8"))) == ["中文"]
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "gbk", "utf-16"])
+def test_file_source_streaming(tmp_path, encoding):
+    records = [
+        {"messages": [{"role": "user", "content": f"第{i}条"}], "metadata": {"i": i}}
+        for i in range(50)
+    ]
+    path = tmp_path / "data.json"
+    path.write_bytes(json.dumps(records, ensure_ascii=False).encode(encoding))
+
+    cfg = FileConfig(
+        path=path, format="json", encoding=encoding, json_stream_threshold=0
+    )
+    loaded = list(FileSource(file_cfg=cfg).load())
+    assert [c.metadata["i"] for c in loaded] == list(range(50))
+    assert loaded[3].messages[0].content == "第3条"
+
+
+def test_file_source_streaming_not_a_list(tmp_path):
+    path = tmp_path / "wrong.json"
+    path.write_text(json.dumps({"not": "a list"}))
+    cfg = FileConfig(path=path, format="json", json_stream_threshold=0)
+    with pytest.raises(ValueError, match="Json Data Must be a list"):
+        list(FileSource(file_cfg=cfg).load())
+
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_iter_json_path_walks_nested_keys_and_indices(size):
+    body = {
+        "status": "ok",
+        "skip": {"items": [1, 2], "x": "}{"},
+        "results": [{"other": 1}, {"meta": None, "items": DATA}],
+    }
+    text = json.dumps(body, ensure_ascii=False)
+    assert list(iter_json_path(split(text, size), ["results", 1, "items"])) == DATA
+    assert list(iter_json_path(split(json.dumps(DATA), size), [])) == DATA
+
+
+def test_iter_json_path_errors():
+    with pytest.raises(ValueError, match="not found"):
+        list(iter_json_path(['{"a": []}'], ["b"]))
+    with pytest.raises(ValueError, match="invalid"):
+        list(iter_json_path(['{"a": []}'], [0]))
+    with pytest.raises(ValueError, match="list"):
+        list(iter_json_path(['{"a": {}}'], ["a"]))
+
+
+def test_iter_json_path_stops_after_array():
+    # 数组之后的内容不会被读取
+    def chunks():
+        yield '{"data": [1, 2]'
+        raise AssertionError("read past the array")
+
+    assert list(iter_json_path(chunks(), ["data"])) == [1, 2]
+
+
+def test_iter_byte_lines():
+    chunks = [b"a", b"b\nc", b"\n", b"\n\nd\ne", b"f"]
+    assert list(iter_byte_lines(chunks)) == [b"ab", b"c", b"", b"", b"d", b"ef"]
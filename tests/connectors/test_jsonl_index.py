@@ -0,0 +1,105 @@
+import json
+import os
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSource
+from chatbot_dataset_tools.connectors.jsonl_index import JsonlIndex
+from chatbot_dataset_tools.datasets import DatasetLoader
+
+
+def write_jsonl(path, n, blank_every=0):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            record = {"messages": [{"role": "user", "content": f"消息 {i}"}]}
+            record["metadata"] = {"i": i}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if blank_every and i % blank_every == 0:
+                f.write("\n")
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write_jsonl(path, 100, blank_every=7)
+    return path
+
+
+def test_index_build_and_reuse(data_path):
+    index = JsonlIndex.open(data_path)
+    assert len(index) == 100
+    assert json.loads(index.record(42))["metadata"]["i"] == 42
+    assert json.loads(index.record(-1))["metadata"]["i"] == 99
+    with pytest.raises(IndexError):
+        index.span(100)
+    index.close()
+
+    # 第二次直接从 .idx 加载 (mmap)
+    assert JsonlIndex.sidecar_path(data_path).exists()
+    loaded = JsonlIndex._load(data_path)
+    assert loaded is not None and len(loaded) == 100
+    assert json.loads(loaded.record(7))["metadata"]["i"] == 7
+    loaded.close()
+
+
+def test_index_invalidated_on_change(data_path):
+    JsonlIndex.open(data_path).close()
+    write_jsonl(data_path, 5)
+    os.utime(data_path, ns=(1, 1))  # 确保 mtime 也变化
+
+    assert JsonlIndex._load(data_path) is None
+    index = JsonlIndex.open(data_path)
+    assert len(index) == 5
+    index.close()
+
+
+def test_file_source_random_access(data_path):
+    source = FileSource(file_cfg=FileConfig(path=data_path, format="jsonl", index=True))
+    assert source.random_access
+    assert source.count() == 100
+    assert source.get(-2).metadata["i"] == 98
+    assert [c.metadata["i"] for c in source.get_many([3, 1, 60])] == [3, 1, 60]
+    assert [c.metadata["i"] for c in source.load_from(95)] == [95, 96, 97, 98, 99]
+    assert source.get(10).messages[0].content == "消息 10"
+
+    # 数据文件被修改后自动重建
+    write_jsonl(data_path, 3)
+    os.utime(data_path, ns=(1, 1))
+    assert source.count() == 3
+
+
+def test_index_requires_jsonl(tmp_path):
+    source = FileSource(file_cfg=FileConfig(path=tmp_path / "a.json", format="json"))
+    assert not source.random_access
+    with pytest.raises(NotImplementedError):
+        source.count()
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_bytes(b"")
+    source = FileSource(file_cfg=FileConfig(path=path, format="jsonl", index=True))
+    assert source.count() == 0
+    assert list(source.load_from(0)) == []
+
+
+def test_indexed_dataset_len_sample_split(data_path):
+    ds = DatasetLoader.from_jsonl(data_path, index=True)
+    assert len(ds) == 100
+
+    sample = ds.sample(5, seed=1)
+    assert len(sample) == 5
+    assert len({c.metadata["i"] for c in sample}) == 5
+
+    train, valid = ds.split(0.9)
+    assert len(train) == 90 and len(valid) == 10
+    assert [c.metadata["i"] for c in valid] == list(range(90, 100))
+    assert all(c.metadata["i"] < 90 for c in train.sample(20, seed=2))
+
+    # 堆叠算子后无法直接得知长度
+    with pytest.raises(TypeError):
+        len(ds.filter(lambda c: True))
+
+
+def test_unindexed_dataset_len_raises(data_path):
+    with pytest.raises(TypeError):
+        len(DatasetLoader.from_jsonl(data_path))
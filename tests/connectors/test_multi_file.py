@@ -0,0 +1,100 @@
+import gzip
+import json
+import pytest
+from chatbot_dataset_tools.config import FileConfig, config
+from chatbot_dataset_tools.connectors import MultiFileSource
+from chatbot_dataset_tools.datasets import DatasetLoader
+from chatbot_dataset_tools.registry import sources
+
+
+def write_parts(directory, sizes, ext=".jsonl"):
+    directory.mkdir(exist_ok=True)
+    for part, n in enumerate(sizes):
+        lines = [
+            json.dumps({"messages": [{"role": "user", "content": f"{part}-{i}"}]})
+            for i in range(n)
+        ]
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        path = directory / f"part-{part:03d}{ext}"
+        path.write_bytes(gzip.compress(data) if ext.endswith(".gz") else data)
+
+
+def contents(ds):
+    return [c[0].content for c in ds]
+
+
+def test_ordered_glob(tmp_path):
+    write_parts(tmp_path / "data", [3, 0, 5, 2])
+    src = MultiFileSource(path=tmp_path / "data" / "part-*.jsonl", prefetch=3)
+
+    expected = [f"{p}-{i}" for p, n in enumerate([3, 0, 5, 2]) for i in range(n)]
+    with config.switch(batch_size=2):
+        assert contents(src.load()) == expected
+    assert sorted(src.file_counts.values()) == [0, 2, 3, 5]
+
+
+def test_directory_matches_format_and_compression(tmp_path):
+    data = tmp_path / "data"
+    write_parts(data, [2, 2])
+    write_parts(data, [1], ext=".jsonl.gz")  # 覆盖 part-000：不同扩展名，互不冲突
+    (data / "notes.txt").write_text("ignored")
+
+    src = MultiFileSource(path=data)
+    assert [p.rsplit("/", 1)[-1] for p in src.paths()] == [
+        "part-000.jsonl",
+        "part-000.jsonl.gz",
+        "part-001.jsonl",
+    ]
+    assert len(contents(src.load())) == 5
+
+
+def test_interleaved_yields_everything(tmp_path):
+    write_parts(tmp_path / "data", [7, 1, 4])
+    src = MultiFileSource(path=tmp_path / "data", ordered=False, prefetch=2)
+    with config.switch(batch_size=2):
+        items = contents(src.load())
+    expected = [f"{p}-{i}" for p, n in enumerate([7, 1, 4]) for i in range(n)]
+    assert sorted(items) == sorted(expected)
+    # 同一文件内部保持顺序
+    assert [x for x in items if x.startswith("0-")] == [f"0-{i}" for i in range(7)]
+
+
+def test_len_known_after_first_pass(tmp_path):
+    write_parts(tmp_path / "data", [3, 4])
+    ds = DatasetLoader.from_files(tmp_path / "data")
+
+    with pytest.raises(TypeError):
+        len(ds)
+    assert len(list(ds)) == 7
+    assert len(ds) == 7
+    # 堆叠算子后长度仍然未知
+    with pytest.raises(TypeError):
+        len(ds.filter(lambda c: True))
+
+
+def test_len_from_index(tmp_path):
+    write_parts(tmp_path / "data", [3, 4])
+    ds = DatasetLoader.from_files(tmp_path / "data", index=True)
+    assert len(ds) == 7
+
+
+def test_error_propagates_and_stops_readers(tmp_path):
+    write_parts(tmp_path / "data", [50, 3])
+    (tmp_path / "data" / "part-001.jsonl").write_text("{broken\n")
+    src = MultiFileSource(path=tmp_path / "data", ordered=False)
+    with pytest.raises(ValueError):
+        list(src.load())
+
+
+def test_no_match_and_registry(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(MultiFileSource(path=tmp_path / "*.jsonl").load())
+    assert sources.get("multi_file") is MultiFileSource
+
+
+def test_uses_file_config(tmp_path):
+    write_parts(tmp_path / "data", [2])
+    cfg = FileConfig(path=tmp_path / "data" / "*.jsonl", prefetch=0)
+    src = MultiFileSource(file_cfg=cfg)
+    assert src.prefetch == 1
+    assert len(contents(src.load())) == 2
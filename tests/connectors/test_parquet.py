@@ -0,0 +1,71 @@
+import pytest
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.connectors import ParquetSink, ParquetSource
+from chatbot_dataset_tools.datasets import DatasetLoader
+from chatbot_dataset_tools.registry import sinks, sources
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_round_trip_and_row_groups(tmp_path, make_convs):
+    path = tmp_path / "data.parquet"
+    convs = make_convs(25, rich=True)
+    ParquetSink(path=path, row_group_size=10).save(convs)
+
+    assert pq.ParquetFile(path).num_row_groups == 3
+    loaded = list(ParquetSource(path=path, row_group_size=4).load())
+    assert [c.to_dict() for c in loaded] == [c.to_dict() for c in convs]
+
+
+def test_column_projection(tmp_path, make_convs):
+    path = tmp_path / "data.parquet"
+    ParquetSink(path=path).save(make_convs(4, rich=True))
+
+    no_meta = list(ParquetSource(path=path, columns=("messages",)).load())
+    assert no_meta[1].metadata == {}
+    assert no_meta[3][0].metadata == {"pinned": True}
+
+    roles_only = list(ParquetSource(path=path, columns=["messages.role"]).load())
+    assert [m.role for m in roles_only[2]] == ["system", "user", "assistant"]
+    assert roles_only[2][1].content == ""
+    assert roles_only[0][0].metadata == {}
+
+    meta_only = list(ParquetSource(path=path, columns=("metadata",)).load())
+    assert [len(c.data) for c in meta_only] == [0, 0, 0, 0]
+    assert meta_only[1].metadata == {"id": 1, "tags": ["x", 1.5]}
+
+    with pytest.raises(ValueError, match="Unknown parquet columns"):
+        ParquetSource(path=path, columns=("messages.tokens",))
+
+
+def test_dataset_shortcuts_and_len(tmp_path, make_convs):
+    path = tmp_path / "data.parquet"
+    convs = make_convs(7, rich=True)
+    DatasetLoader.from_list(convs).to_parquet(path, parquet_compression="none")
+
+    ds = DatasetLoader.from_parquet(path)
+    assert len(ds) == 7
+    assert ds.to_list()[5][1].content == "q5"
+
+
+def test_sink_uses_context_config(tmp_path, make_convs):
+    path = tmp_path / "data.parquet"
+    with config.switch(row_group_size=3):
+        ParquetSink(path=path).save(make_convs(7, rich=True))
+    assert pq.ParquetFile(path).num_row_groups == 3
+
+
+def test_registry():
+    assert sources.get("parquet") is ParquetSource
+    assert sinks.get("parquet") is ParquetSink
+
+
+def test_fields_select_columns(tmp_path, make_convs):
+    path = tmp_path / "data.parquet"
+    ParquetSink(path=path).save(make_convs(4, rich=True))
+
+    src = ParquetSource(path=path, fields=["messages.role", "metadata.id"])
+    assert src.columns == ["messages.list.element.role", "metadata"]
+    convs = list(src.load())
+    assert convs[1].metadata == {"id": 1}
+    assert convs[2][1].content == ""
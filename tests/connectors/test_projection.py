@@ -0,0 +1,163 @@
+import json
+import pytest
+import respx
+from httpx import Response
+from chatbot_dataset_tools.config import FileConfig, config
+from chatbot_dataset_tools.connectors import FileSink, FileSource, HTTPSource
+from chatbot_dataset_tools.connectors.codec import get_codec
+from chatbot_dataset_tools.connectors.projection import Projection
+from chatbot_dataset_tools.datasets import DatasetLoader
+from chatbot_dataset_tools.types import Conversation
+
+RECORD = {
+    "messages": [
+        {"role": "user", "content": "hello", "metadata": {"lang": "en", "x": 1}},
+        {"role": "assistant", "content": "hi"},
+    ],
+    "metadata": {"source": "web", "id": 7, "two words": True},
+}
+
+CASES = [
+    (
+        ["messages.role"],
+        {"messages": [{"role": "user"}, {"role": "assistant"}], "metadata": None},
+    ),
+    (
+        ["metadata.source", "metadata.two words"],
+        {"messages": (), "metadata": {"source": "web", "two words": True}},
+    ),
+    (
+        ["messages.content", "messages.metadata.lang"],
+        {
+            "messages": [
+                {"role": "user", "content": "hello", "metadata": {"lang": "en"}},
+                {"role": "assistant", "content": "hi"},
+            ],
+            "metadata": None,
+        },
+    ),
+    (["messages", "metadata"], RECORD),
+]
+
+
+@pytest.mark.parametrize("fields, expected", CASES)
+def test_apply(fields, expected):
+    assert Projection(fields).apply(RECORD) == expected
+
+
+@pytest.mark.parametrize("fields, expected", CASES)
+@pytest.mark.parametrize("codec", ["stdlib", "orjson", "msgspec"])
+def test_codec_record_loader(codec, fields, expected):
+    loads = get_codec(codec).record_loader(Projection(fields))
+    record = loads(json.dumps(RECORD).encode("utf-8"))
+    # msgspec 省略未选中的键，两种结果构造出的对话相同
+    assert record.get("messages", ()) == expected["messages"]
+    assert record.get("metadata") == expected["metadata"]
+
+
+ODD_RECORDS = [
+    {"messages": [{"role": "user", "content": "x"}], "metadata": "free text"},
+    {"messages": [{"role": "user", "metadata": ["a"]}], "metadata": [1, 2]},
+    {"messages": [{"role": "user", "content": 3, "metadata": "m"}]},
+    {"metadata": {"source": 1}},
+    [{"role": "user", "content": "bare list"}],
+]
+
+
+@pytest.mark.parametrize("fields", [case[0] for case in CASES])
+@pytest.mark.parametrize("record", ODD_RECORDS)
+def test_codec_parity_on_unexpected_shapes(fields, record):
+    # 按类型解码的 msgspec 不能拒绝通用路径 (先解码再裁剪) 能处理的记录
+    projection = Projection(fields)
+    data = json.dumps(record).encode("utf-8")
+    # 各实现的中间表示可能不同 (例如省略默认值)，比较构造出的对话
+    build = lambda codec: Conversation.from_dict(
+        get_codec(codec).record_loader(projection)(data)
+    ).to_dict()
+    expected = build("stdlib")
+    assert build("orjson") == expected
+    assert build("msgspec") == expected
+
+
+def test_metadata_all_overrides_keys():
+    p = Projection(["metadata.source", "metadata"])
+    assert p.meta_keys is None
+    assert Projection.parse("metadata.source").fields == ("metadata.source",)
+    assert Projection.parse(None) is None
+
+
+@pytest.mark.parametrize(
+    "field", ["content", "messages.tokens", "messages.role.x", "meta.source"]
+)
+def test_invalid_fields(field):
+    with pytest.raises(ValueError, match="Unknown projection field"):
+        Projection([field])
+
+
+def test_msgspec_decode_error_is_value_error():
+    loads = get_codec("msgspec").record_loader(Projection(["messages.role"]))
+    with pytest.raises(ValueError):
+        loads(b'{"messages": [{"content": "no role"}]}')
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(json.dumps(RECORD) for _ in range(5)), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"codec": "stdlib"},
+        {"parallel": True, "shard_size": 64},
+        {"index": True},
+    ],
+)
+def test_file_source_jsonl(jsonl_file, overrides):
+    cfg = FileConfig(path=jsonl_file, fields=("messages.role", "metadata.source"))
+    with config.switch(max_workers=2):
+        convs = list(FileSource(file_cfg=cfg, **overrides).load())
+
+    assert len(convs) == 5
+    assert [m.role for m in convs[0]] == ["user", "assistant"]
+    assert [m.content for m in convs[0]] == ["", ""]
+    assert convs[0][0].metadata == {}
+    assert convs[0].metadata == {"source": "web"}
+
+
+def test_file_source_get_many(jsonl_file):
+    src = FileSource(path=jsonl_file, index=True, fields=["metadata.id"])
+    assert [c.metadata for c in src.get_many([4, 0])] == [{"id": 7}, {"id": 7}]
+
+
+def test_json_and_cdtrec_formats(tmp_path, jsonl_file):
+    convs = list(FileSource(path=jsonl_file).load())
+    for fmt in ("json", "cdtrec"):
+        path = tmp_path / f"data.{fmt}"
+        FileSink(path=path, format=fmt).save(convs)
+        src = FileSource(path=path, format=fmt, fields=["messages.content"])
+        loaded = list(src.load())
+        assert loaded[0][0].content == "hello"
+        assert loaded[0].metadata == {}
+        assert loaded[0][0].metadata == {}
+
+
+def test_dataset_loader(jsonl_file):
+    ds = DatasetLoader.from_jsonl(jsonl_file, fields=["metadata"])
+    conv = ds.to_list()[0]
+    assert len(conv.data) == 0
+    assert conv.metadata["two words"] is True
+
+
+@respx.mock
+def test_http_source():
+    url = "https://api.test/data"
+    respx.get(url).mock(return_value=Response(200, json={"data": [RECORD] * 3}))
+
+    convs = list(HTTPSource(url=url, fields=["messages.role"]).load())
+    assert len(convs) == 3
+    assert [m.content for m in convs[0]] == ["", ""]
+    assert convs[0].metadata == {}
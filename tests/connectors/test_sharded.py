@@ -0,0 +1,105 @@
+import gzip
+import json
+import pytest
+from chatbot_dataset_tools.config import FileConfig
+from chatbot_dataset_tools.connectors import FileSource, ShardedFileSink
+from chatbot_dataset_tools.registry import sinks
+
+
+def read_manifest(tmp_path, stem="out"):
+    return json.loads((tmp_path / f"{stem}.manifest.json").read_text("utf-8"))
+
+
+def test_roll_by_records(tmp_path, make_convs):
+    cfg = FileConfig(path=tmp_path / "out.jsonl", shard_max_records=4)
+    ShardedFileSink(file_cfg=cfg).save(make_convs(10))
+
+    names = sorted(p.name for p in tmp_path.glob("out-*.jsonl"))
+    assert names == [
+        "out-00000-of-00003.jsonl",
+        "out-00001-of-00003.jsonl",
+        "out-00002-of-00003.jsonl",
+    ]
+    manifest = read_manifest(tmp_path)
+    assert manifest["num_shards"] == 3
+    assert manifest["total_records"] == 10
+    assert [s["records"] for s in manifest["shards"]] == [4, 4, 2]
+    for s in manifest["shards"]:
+        assert s["bytes"] == (tmp_path / s["path"]).stat().st_size
+    # 不留下临时文件
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_roll_by_bytes_and_round_trip(tmp_path, make_convs):
+    convs = make_convs(20)
+    line_size = len(json.dumps(convs[0].to_dict(), ensure_ascii=False)) + 1
+    cfg = FileConfig(path=tmp_path / "out.jsonl", shard_max_bytes=line_size * 3)
+    ShardedFileSink(file_cfg=cfg).save(convs)
+
+    manifest = read_manifest(tmp_path)
+    assert all(s["raw_bytes"] <= line_size * 3 for s in manifest["shards"])
+    assert manifest["total_records"] == 20
+
+    loaded = []
+    for s in manifest["shards"]:
+        src = FileSource(file_cfg=FileConfig(path=tmp_path / s["path"]))
+        loaded.extend(c[0].content for c in src.load())
+    assert loaded == [f"q{i}" for i in range(20)]
+
+
+def test_oversized_record_gets_own_shard(tmp_path, make_convs):
+    cfg = FileConfig(path=tmp_path / "out.jsonl", shard_max_bytes=1)
+    ShardedFileSink(file_cfg=cfg).save(make_convs(3))
+    assert [s["records"] for s in read_manifest(tmp_path)["shards"]] == [1, 1, 1]
+
+
+def test_gzip_extension_kept(tmp_path, make_convs):
+    cfg = FileConfig(path=tmp_path / "out.jsonl.gz", shard_max_records=5)
+    ShardedFileSink(file_cfg=cfg).save(make_convs(7))
+
+    manifest = read_manifest(tmp_path)
+    assert manifest["compression"] == "gzip"
+    assert [s["path"] for s in manifest["shards"]] == [
+        "out-00000-of-00002.jsonl.gz",
+        "out-00001-of-00002.jsonl.gz",
+    ]
+    with gzip.open(tmp_path / manifest["shards"][1]["path"], "rt") as f:
+        assert len(f.read().splitlines()) == 2
+
+
+def test_unlimited_writes_single_shard(tmp_path, make_convs):
+    ShardedFileSink(path=tmp_path / "out.jsonl").save(make_convs(5))
+    assert read_manifest(tmp_path)["shards"][0]["path"] == "out-00000-of-00001.jsonl"
+
+
+def test_error_cleans_up_tmp_files(tmp_path, make_convs):
+    def broken():
+        yield from make_convs(5)
+        raise RuntimeError("boom")
+
+    cfg = FileConfig(path=tmp_path / "out.jsonl", shard_max_records=2)
+    with pytest.raises(RuntimeError, match="boom"):
+        ShardedFileSink(file_cfg=cfg).save(broken())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rerun_removes_stale_shards(tmp_path, make_convs):
+    (tmp_path / "other-00000-of-00001.jsonl").write_text("keep")
+    cfg = FileConfig(path=tmp_path / "out.jsonl", shard_max_records=2)
+    ShardedFileSink(file_cfg=cfg).save(make_convs(6))
+    ShardedFileSink(file_cfg=cfg).save(make_convs(3))
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == [
+        "other-00000-of-00001.jsonl",
+        "out-00000-of-00002.jsonl",
+        "out-00001-of-00002.jsonl",
+        "out.manifest.json",
+    ]
+    assert read_manifest(tmp_path)["total_records"] == 3
+
+
+def test_registry_and_format_check(tmp_path):
+    assert sinks.get("sharded_file") is ShardedFileSink
+    with pytest.raises(NotImplementedError):
+        ShardedFileSink(path=tmp_path / "out.json", format="json").save([])
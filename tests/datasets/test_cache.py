@@ -0,0 +1,228 @@
+import datetime
+import os
+import pytest
+from chatbot_dataset_tools.types import Message, Conversation
+from chatbot_dataset_tools.datasets import DatasetLoader, LazyDataset
+from chatbot_dataset_tools.datasets.cache import callable_fingerprint
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.ops.filters import min_turns
+from chatbot_dataset_tools.ops.transforms import rename_roles
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "data.jsonl"
+    DatasetLoader.from_list(
+        [
+            Conversation(
+                [Message("user", f"q{i}"), Message("assistant", f"a{i}")][: 1 + i % 2]
+            )
+            for i in range(10)
+        ]
+    ).to_jsonl(path)
+    return path
+
+
+def counting(calls):
+    def upper(c):
+        calls.append(1)
+        for m in c.messages:
+            m.content = m.content.upper()
+        return c
+
+    return upper
+
+
+class Calls:
+    # 算子读取的全局变量会进入指纹，计数放在类属性上 (类只按名称计入)
+    upper = 0
+
+
+def upper(c):
+    Calls.upper += 1
+    for m in c.messages:
+        m.content = m.content.upper()
+    return c
+
+
+def test_cache_serves_later_iterations_from_disk(jsonl, tmp_path):
+    calls = []
+    ds = (
+        DatasetLoader.from_jsonl(jsonl)
+        .filter(min_turns(2))
+        .map(counting(calls))
+        .cache(tmp_path / "cache.cdtrec")
+    )
+    with pytest.raises(TypeError):
+        len(ds)  # 缓存建立前长度未知
+
+    first = [c.to_dict() for c in ds]
+    assert len(first) == 5 and len(calls) == 5
+    assert (tmp_path / "cache.cdtrec").exists()
+
+    # 之后的迭代不再执行算子，且支持随机访问
+    assert [c.to_dict() for c in ds] == first
+    assert len(calls) == 5
+    assert len(ds) == 5
+    train, test = ds.split(0.6)
+    assert [c[0].content for c in test] == ["Q7", "Q9"]
+
+
+def test_cache_is_shared_between_equivalent_pipelines(jsonl, tmp_path):
+    Calls.upper = 0
+    with config.switch(cache_dir=str(tmp_path / "cache")):
+        build = lambda n: (
+            DatasetLoader.from_jsonl(jsonl).filter(min_turns(n)).map(upper)
+        )
+        list(build(2).cache())
+        assert Calls.upper == 5
+        assert len(os.listdir(tmp_path / "cache")) == 2  # 数据 + 键
+
+        # 新构造的相同流水线命中缓存
+        assert len(list(build(2).cache())) == 5
+        assert Calls.upper == 5
+
+        # 参数不同的流水线使用另一份缓存
+        assert len(list(build(1).cache())) == 10
+        assert Calls.upper == 15
+
+
+def test_cache_invalidated_when_source_changes(jsonl, tmp_path):
+    cache_path = tmp_path / "cache.cdtrec"
+    ds = DatasetLoader.from_jsonl(jsonl).cache(cache_path)
+    assert len(list(ds)) == 10
+
+    with open(jsonl, "a", encoding="utf-8") as f:
+        f.write('{"messages": [{"role": "user", "content": "new"}]}\n')
+    assert not ds._loader.random_access
+    assert len(list(ds)) == 11
+    assert len(ds) == 11
+
+
+def test_partial_iteration_does_not_leave_cache(jsonl, tmp_path):
+    cache_path = tmp_path / "cache.cdtrec"
+    ds = DatasetLoader.from_jsonl(jsonl).cache(cache_path)
+    it = iter(ds)
+    next(it)
+    it.close()
+    assert os.listdir(tmp_path) == ["data.jsonl"]
+    assert len(list(ds)) == 10
+
+
+def test_unfingerprintable_dataset_is_cached_per_object(tmp_path):
+    calls = []
+    ds = LazyDataset([Conversation([Message("user", "x")])]).map(counting(calls))
+    assert ds.fingerprint() is None
+
+    cached = ds.cache(tmp_path / "cache.cdtrec")
+    list(cached)
+    list(cached)
+    assert len(calls) == 1
+
+
+def test_callable_fingerprint_tracks_params():
+    assert callable_fingerprint(min_turns(2)) == callable_fingerprint(min_turns(2))
+    assert callable_fingerprint(min_turns(2)) != callable_fingerprint(min_turns(3))
+    assert callable_fingerprint(rename_roles({"user": "a"})) != callable_fingerprint(
+        rename_roles({"user": "b"})
+    )
+    assert callable_fingerprint(lambda c, o=object(): c) is None
+
+
+MIN_LEN = 5
+
+
+def long_enough(c):
+    return len(c[0].content) >= MIN_LEN
+
+
+def uses_helper(c):
+    return long_enough(c)
+
+
+def test_cache_invalidated_when_global_changes(tmp_path, monkeypatch):
+    path = tmp_path / "data.jsonl"
+    DatasetLoader.from_list(
+        [Conversation([Message("user", text)]) for text in ("hello world", "hi")]
+    ).to_jsonl(path)
+    cache_path = tmp_path / "cache.cdtrec"
+
+    def run():
+        ds = DatasetLoader.from_jsonl(path).filter(uses_helper).cache(cache_path)
+        return [c[0].content for c in ds]
+
+    assert run() == ["hello world"]
+    # 间接引用的函数读取的全局变量改变后缓存失效
+    monkeypatch.setitem(globals(), "MIN_LEN", 1)
+    assert run() == ["hello world", "hi"]
+
+
+def test_ops_reading_unstable_globals_are_unfingerprintable():
+    assert callable_fingerprint(lambda c: c is SENTINEL) is None
+
+
+SENTINEL = object()
+
+
+class MyConv(Conversation):
+    pass
+
+
+def test_cache_keeps_source_conversation_type(jsonl, tmp_path):
+    from chatbot_dataset_tools.connectors import FileSource
+
+    def build():
+        source = FileSource(path=str(jsonl), conv_type=MyConv)
+        return DatasetLoader.from_source(source).cache(tmp_path / "cache.cdtrec")
+
+    ds = build()
+    assert {type(c) for c in ds} == {MyConv}
+    assert {type(c) for c in ds} == {MyConv}
+    assert {type(c) for c in ds.sample(3)} == {MyConv}
+    # 新的流水线对象按名称找回类型
+    assert {type(c) for c in build().split(0.5)[1]} == {MyConv}
+
+
+def test_non_conversation_items_are_not_cached(jsonl, tmp_path):
+    cache_path = tmp_path / "cache.cdtrec"
+    ds = DatasetLoader.from_jsonl(jsonl).map(lambda c: len(c.data)).cache(cache_path)
+    assert list(ds) == [1, 2] * 5
+    assert list(ds) == [1, 2] * 5
+    assert not cache_path.exists()
+
+
+def stamp(c):
+    c.metadata["seen_at"] = datetime.datetime(2024, 1, 1)
+    return c
+
+
+def test_unencodable_metadata_falls_back_to_uncached(jsonl, tmp_path):
+    cache_path = tmp_path / "cache.cdtrec"
+    ds = DatasetLoader.from_jsonl(jsonl).map(stamp).cache(cache_path)
+
+    for _ in range(2):
+        out = list(ds)
+        assert len(out) == 10
+        assert out[-1].metadata["seen_at"] == datetime.datetime(2024, 1, 1)
+    # 不留下部分写出的缓存文件与键
+    assert sorted(os.listdir(tmp_path)) == ["data.jsonl"]
+
+
+def test_stale_cache_files_are_removed(jsonl, tmp_path):
+    cache_dir = tmp_path / "cache"
+    with config.switch(cache_dir=str(cache_dir)):
+        build = lambda n, **kw: (
+            DatasetLoader.from_jsonl(jsonl).filter(min_turns(n)).cache(**kw)
+        )
+        list(build(2))
+        first = sorted(os.listdir(cache_dir))
+        assert len(first) == 2
+
+        # 修改算子参数后，旧键的缓存被新缓存取代
+        list(build(1))
+        second = sorted(os.listdir(cache_dir))
+        assert len(second) == 2 and not set(first) & set(second)
+
+        # 指定不同的 name 可同时保留
+        list(build(2, name="two"))
+        assert len(os.listdir(cache_dir)) == 4
@@ -1,3 +1,4 @@
+import pytest
 from chatbot_dataset_tools.types import Message, Conversation
 from chatbot_dataset_tools.datasets import InMemoryDataset
 from chatbot_dataset_tools.config import config
@@ -57,3 +58,27 @@ def test_in_memory_filter_context():
     # is_valid_alternating 内部会查找系统消息并过滤它
     # 如果它读不到 "instruction" 是系统角色，校验就会失败
     assert len(ds.filter(is_valid_alternating())) == 1
+
+
+def test_in_memory_dataset_batches():
+    pytest.importorskip("numpy")
+
+    convs = [
+        Conversation([Message("user", "Hello"), Message("assistant", "Hi")]),
+        Conversation([Message("user", "Solo")]),
+        Conversation([Message("system", "s"), Message("user", "q")]),
+    ]
+    mem_ds = InMemoryDataset(convs)
+
+    batches = list(mem_ds.to_batches(batch_size=2))
+    assert [len(b) for b in batches] == [2, 1]
+    # 批次间角色 id 保持一致
+    assert batches[1].role_id("user") == batches[0].role_id("user")
+
+    restored = InMemoryDataset.from_batches(batches)
+    assert [c.to_dict() for c in restored] == [c.to_dict() for c in convs]
+
+    kept = mem_ds.filter_batched(lambda b: b.turns_between(min=2), batch_size=2)
+    result = kept.to_list()
+    assert result == [convs[0], convs[2]]
+    assert result[0] is convs[0]
@@ -1,7 +1,9 @@
+import pytest
 from chatbot_dataset_tools.types import Message, Conversation
 from chatbot_dataset_tools.datasets import LazyDataset
 from chatbot_dataset_tools.config import config
 from chatbot_dataset_tools.ops.transforms import rename_roles
+from chatbot_dataset_tools.utils import background_iter
 
 
 def test_lazy_dataset():
@@ -61,3 +63,107 @@ def test_lazy_dataset_chain_inheritance():
     # 验证上下文 ID 一致
     assert ds2.ctx.uid == ctx.uid
     assert ds2.ctx.name == "my-app-ctx"
+
+
+def test_lazy_dataset_from_batches():
+    pytest.importorskip("numpy")
+    from chatbot_dataset_tools.types import ConversationBatch
+
+    convs = [Conversation([Message("user", str(i))]) for i in range(5)]
+    batches = [
+        ConversationBatch.from_conversations(convs[:3]),
+        ConversationBatch.from_conversations(convs[3:]),
+    ]
+    lazy_ds = LazyDataset.from_batches(batches)
+
+    # 可重复迭代
+    assert [c.messages[0].content for c in lazy_ds] == ["0", "1", "2", "3", "4"]
+    assert len(lazy_ds.to_list()) == 5
+
+
+def test_prefetch_preserves_order_and_is_reusable(make_convs):
+    ds = LazyDataset(make_convs(100)).map(lambda c: c).prefetch(8)
+    for _ in range(2):
+        assert [c[0].content for c in ds] == [f"q{i}" for i in range(100)]
+
+
+def test_prefetch_runs_upstream_in_background(make_convs):
+    import threading
+
+    seen = []
+
+    def record_thread(c):
+        seen.append(threading.current_thread().name)
+        return c
+
+    ds = LazyDataset(make_convs(3)).map(record_thread).prefetch(2)
+    list(ds)
+    assert set(seen) == {"prefetch"}
+
+
+def test_prefetch_propagates_errors(make_convs):
+    def explode(c):
+        if c[0].content == "q5":
+            raise RuntimeError("boom")
+        return c
+
+    ds = LazyDataset(make_convs(10)).map(explode).prefetch(4)
+    with pytest.raises(RuntimeError, match="boom"):
+        list(ds)
+
+
+def test_prefetch_propagates_iter_and_close_errors(make_convs):
+    class BrokenSource:
+        def __iter__(self):
+            raise RuntimeError("no iterator")
+
+    # iter() 失败时调用方不会一直等待
+    with pytest.raises(RuntimeError, match="no iterator"):
+        list(background_iter(BrokenSource(), 4))
+    with pytest.raises(RuntimeError, match="no iterator"):
+        list(LazyDataset(BrokenSource()).prefetch(4))
+
+    class BadClose:
+        def __init__(self):
+            self.items = iter(make_convs(3))
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            return next(self.items)
+
+        def close(self):
+            raise RuntimeError("close failed")
+
+    # 上游迭代器的 close() 失败同样在调用方抛出
+    with pytest.raises(RuntimeError, match="close failed"):
+        list(background_iter(BadClose(), 4))
+
+
+def test_prefetch_stops_upstream_on_early_exit():
+    import threading
+
+    closed = threading.Event()
+
+    class Source:
+        def __iter__(self):
+            try:
+                for i in range(10_000):
+                    yield Conversation([Message("user", str(i))])
+            finally:
+                closed.set()
+
+    it = iter(LazyDataset(Source()).prefetch(4))
+    assert next(it)[0].content == "0"
+    it.close()
+    assert closed.is_set()
+
+
+def test_prefetch_keeps_context(make_convs):
+    # 预取线程运行在迭代时上下文的副本中，结果与不预取时一致
+    ds = LazyDataset(make_convs(2)).map(rename_roles())
+    with config.switch(role_map={"user": "client"}):
+        expected = [c[0].role for c in ds]
+        out = [c[0].role for c in ds.prefetch()]
+    assert out == expected
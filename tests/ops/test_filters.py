@@ -48,3 +48,12 @@ def test_is_valid_alternating():
     )
     assert filters.is_valid_alternating()(valid) is True
     assert filters.is_valid_alternating()(invalid) is False
+
+
+def test_token_filters(sample_conv):
+    # "You are a bot" + "Hello" + "Hi there!" = 4 + 1 + 2
+    assert filters.min_tokens(7)(sample_conv) is True
+    assert filters.min_tokens(8)(sample_conv) is False
+    assert filters.max_tokens(7)(sample_conv) is True
+    assert filters.has_tokens_in(1, 6)(sample_conv) is False
+    assert filters.max_tokens(4, tokenizer="bytes")(sample_conv) is False
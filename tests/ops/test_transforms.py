@@ -55,6 +55,25 @@ def test_limit_context():
     assert len(new_conv.messages) == 2
     assert new_conv.messages[0].content == "3"
     assert new_conv.messages[1].content == "4"
+    # 截断结果不再引用被丢弃的消息
+    assert len(new_conv.data._messages) == 2
+
+
+def test_limit_context_tokens():
+    conv = Conversation(
+        [
+            Message("user", "one two three"),
+            Message("assistant", "four five"),
+            Message("user", "six"),
+        ]
+    )
+    new_conv = transforms.limit_context_tokens(max_tokens=3)(conv)
+    assert [m.content for m in new_conv.messages] == ["four five", "six"]
+    assert len(new_conv.data._messages) == 2
+
+    # 最后一条消息即使超出预算也会保留
+    long_conv = Conversation([Message("user", "a b c d e")])
+    assert len(transforms.limit_context_tokens(2)(long_conv).messages) == 1
 
 
 def test_remove_system_message():
@@ -1,3 +1,4 @@
+import pytest
 from chatbot_dataset_tools.types import (
     Message,
     MessageList,
@@ -65,3 +66,107 @@ def test_conversation_set_usage():
 
     s = {c1, c2, c3}
     assert len(s) == 2  # c1 和 c2 应该被视为同一个
+
+
+def test_conversation_metadata_not_shared():
+    """默认 metadata 在首次访问时按实例创建，不会在对象间共享"""
+    c1 = Conversation([Message("user", "a")])
+    c2 = Conversation([Message("user", "b")])
+    c1.metadata["source"] = "web"
+    assert c2.metadata == {}
+
+
+def test_conversation_dict_roundtrip():
+    import pickle
+
+    data = {
+        "messages": [
+            {"role": "user", "content": "hi", "metadata": {}},
+            {"role": "assistant", "content": "hello", "metadata": {"score": 1}},
+        ],
+        "metadata": {"source": "web"},
+    }
+    conv = Conversation.from_dict(data)
+    assert conv.to_dict() == data
+
+    restored = pickle.loads(pickle.dumps(conv))
+    assert restored.to_dict() == data
+
+
+def test_conversation_uid_framing():
+    """长度前缀分帧：内容拼接相同但切分不同的对话不应碰撞"""
+    c1 = Conversation([Message("user", "a|user:b")])
+    c2 = Conversation([Message("user", "a"), Message("user", "b")])
+    assert c1.get_uid() != c2.get_uid()
+
+
+def test_conversation_uid_invalidated_on_mutation():
+    """通过 MessageList 修改消息后，缓存的 UID 自动失效"""
+    from chatbot_dataset_tools.ops import transforms
+
+    conv = Conversation([Message("user", "  hello  ")])
+    uid_before = conv.get_uid()
+
+    conv.messages.append(Message("assistant", "hi"))
+    uid_appended = conv.get_uid()
+    assert uid_appended != uid_before
+    assert uid_appended == Conversation(
+        [Message("user", "  hello  "), Message("assistant", "hi")]
+    ).get_uid()
+
+    # 原地修改消息的算子会调用 touch()
+    transforms.strip_content()(conv)
+    assert conv.get_uid() != uid_appended
+    assert conv.get_uid() == conv.get_uid(force_recompute=True)
+
+    # 整体替换 data 同样会失效
+    conv.data = conv.data.last(1)
+    assert conv.get_uid() == Conversation([Message("assistant", "hi")]).get_uid()
+
+
+def test_conversation_bulk_dicts():
+    records = [
+        {
+            "messages": [
+                {"role": "user", "content": "hi"},
+                {"role": "assistant", "content": "hello", "metadata": {"s": [1]}},
+            ],
+            "metadata": {"id": "1"},
+        },
+        {"messages": [{"role": "user"}]},
+        [{"role": "user", "content": "bare list"}],
+    ]
+
+    convs = Conversation.from_dicts(records)
+    assert [c.to_dict() for c in convs] == [
+        Conversation.from_dict(r).to_dict() for r in records
+    ]
+    assert Conversation.to_dicts(convs) == [c.to_dict() for c in convs]
+
+    # 与 to_dict 一致：消息 metadata 为深拷贝
+    dumped = Conversation.to_dicts(convs)
+    dumped[0]["messages"][1]["metadata"]["s"].append(2)
+    assert convs[0].messages[1].metadata == {"s": [1]}
+
+    # 新构造的对象可以正常修改与计算 UID
+    convs[1].messages.append(Message("assistant", "ok"))
+    assert convs[1].uid == Conversation(
+        [Message("user", ""), Message("assistant", "ok")]
+    ).uid
+
+
+def test_bulk_dicts_respects_from_dict_override():
+    class Tagged(Conversation):
+        @classmethod
+        def from_dict(cls, data):
+            conv = super().from_dict(data)
+            conv.metadata["tagged"] = True
+            return conv
+
+    convs = Tagged.from_dicts([{"messages": [{"role": "user"}]}])
+    assert type(convs[0]) is Tagged and convs[0].metadata == {"tagged": True}
+
+
+def test_bulk_dicts_rejects_unknown_message_keys():
+    with pytest.raises(TypeError):
+        Conversation.from_dicts([{"messages": [{"role": "user", "tokens": 3}]}])
@@ -0,0 +1,69 @@
+import pytest
+from chatbot_dataset_tools.types import Message, Conversation, ConversationBatch
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def sample_convs():
+    return [
+        Conversation(
+            [Message("system", "sys"), Message("user", "你好"), Message("assistant", "hi")],
+            meta={"id": "a"},
+        ),
+        Conversation([Message("user", "hello")]),
+        Conversation([]),
+        Conversation(
+            [Message("user", "q", {"score": 1}), Message("assistant", "answer")]
+        ),
+    ]
+
+
+def test_batch_roundtrip(sample_convs):
+    batch = ConversationBatch.from_conversations(sample_convs)
+
+    assert len(batch) == 4
+    assert batch.num_messages == 6
+    # 内容存放在一块连续的 UTF-8 缓冲区中
+    assert isinstance(batch.content_buffer, bytes)
+    assert batch.content_offsets[-1] == len(batch.content_buffer)
+
+    restored = batch.to_conversations()
+    assert [c.to_dict() for c in restored] == [c.to_dict() for c in sample_convs]
+    assert batch[-1].messages[0].metadata == {"score": 1}
+
+
+def test_batch_vectorized_predicates(sample_convs):
+    batch = ConversationBatch.from_conversations(sample_convs)
+
+    assert batch.turn_counts().tolist() == [3, 1, 0, 2]
+    # 字符数而非字节数
+    assert batch.char_counts().tolist() == [7, 5, 0, 7]
+    assert batch.role_counts("user").tolist() == [1, 1, 0, 1]
+    assert batch.has_role("system").tolist() == [True, False, False, False]
+    assert batch.has_roles(["user", "assistant"]).tolist() == [True, False, False, True]
+    assert batch.has_role("missing").tolist() == [False] * 4
+    assert batch.turns_between(1, 2).tolist() == [False, True, False, True]
+
+
+def test_batch_select(sample_convs):
+    batch = ConversationBatch.from_conversations(sample_convs)
+
+    sub = batch.select(batch.turn_counts() >= 2)
+    assert len(sub) == 2
+    assert [c.to_dict() for c in sub] == [
+        sample_convs[0].to_dict(),
+        sample_convs[3].to_dict(),
+    ]
+
+    empty = batch.select([])
+    assert len(empty) == 0
+    assert empty.num_messages == 0
+
+
+def test_batch_shared_role_table(sample_convs):
+    first = ConversationBatch.from_conversations(sample_convs[:1])
+    second = ConversationBatch.from_conversations(sample_convs[1:], roles=first.roles)
+
+    assert second.roles[: len(first.roles)] == first.roles
+    assert second.role_id("user") == first.role_id("user")
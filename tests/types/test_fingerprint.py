@@ -0,0 +1,82 @@
+import hashlib
+import pytest
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.types import Message, Conversation, compute_uids
+from chatbot_dataset_tools.tasks import CheckpointManager
+
+
+@pytest.mark.parametrize(
+    "algorithm, uid_type, size",
+    [
+        ("sha256", str, 64),
+        ("sha256-legacy", str, 64),
+        ("blake2b-64", str, 16),
+        ("int64", int, None),
+    ],
+)
+def test_fingerprint_algorithms(algorithm, uid_type, size, make_convs):
+    conv = make_convs(1)[0]
+    uid = conv.get_uid(algorithm=algorithm)
+
+    assert isinstance(uid, uid_type)
+    if size:
+        assert len(uid) == size
+    else:
+        assert 0 <= uid < 2**64
+    # 确定性
+    assert uid == make_convs(1)[0].get_uid(algorithm=algorithm)
+
+
+def test_legacy_fingerprint_matches_old_uids():
+    conv = Conversation([Message("user", "你好|a:b"), Message("assistant", "")])
+    # 旧版 get_uid 的计算方式
+    joined = "|".join(f"{m.role}:{m.content}" for m in conv.messages)
+    expected = hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    assert conv.get_uid(algorithm="sha256-legacy") == expected
+    assert Conversation([]).get_uid(algorithm="sha256-legacy") == (
+        hashlib.sha256(b"").hexdigest()
+    )
+    # 默认的 sha256 使用分帧输入，与旧版不同
+    assert conv.get_uid(algorithm="sha256") != expected
+
+
+def test_fingerprint_from_config(make_convs):
+    conv = make_convs(1)[0]
+    default_uid = conv.uid
+
+    with config.switch(fingerprint="int64"):
+        assert isinstance(conv.uid, int)
+        # 切换算法后缓存自动失效
+        assert conv.uid == conv.get_uid(algorithm="int64")
+
+    assert conv.uid == default_uid
+
+
+def test_fingerprint_unknown_algorithm(make_convs):
+    with pytest.raises(ValueError, match="not found in fingerprints"):
+        make_convs(1)[0].get_uid(algorithm="md4")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_compute_uids(workers, make_convs):
+    convs = make_convs(50)
+    expected = [Conversation(c.messages).get_uid(algorithm="int64") for c in convs]
+
+    uids = compute_uids(convs, algorithm="int64", max_workers=workers, batch_size=7)
+
+    assert uids == expected
+    # 结果同时缓存在对象上
+    assert convs[0]._cached_uid == expected[0]
+
+
+def test_checkpoint_with_int_uids(tmp_path, make_convs):
+    cp_file = tmp_path / "cp.txt"
+    conv = make_convs(1)[0]
+    uid = conv.get_uid(algorithm="int64")
+
+    manager = CheckpointManager(str(cp_file), interval=1)
+    manager.save(uid)
+
+    reloaded = CheckpointManager(str(cp_file))
+    assert reloaded.is_processed(uid)
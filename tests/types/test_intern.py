@@ -0,0 +1,76 @@
+import json
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.types import InternPool, get_intern_pool, intern_stats
+from chatbot_dataset_tools.connectors import FileSource
+from chatbot_dataset_tools.formatters import ShareGPTFormatter
+
+
+def fresh(s: str) -> str:
+    """构造一个与字面量内容相同但对象不同的字符串 (模拟 json 解析结果)"""
+    return "".join(list(s))
+
+
+def test_intern_pool_threshold_and_stats():
+    pool = InternPool(threshold=2, max_size=8)
+    prompt = "You are a helpful assistant."
+
+    first = pool.content(fresh(prompt))
+    second = pool.content(fresh(prompt))  # 达到阈值，进入池中
+    third = pool.content(fresh(prompt))
+
+    assert third is second
+    assert first is not second
+
+    stats = pool.stats()
+    assert stats["content_hits"] == 1
+    assert stats["pooled"] == 1
+    assert stats["bytes_saved"] > 0
+
+    role_a = pool.role(fresh("assistant"))
+    role_b = pool.role(fresh("assistant"))
+    assert role_a is role_b
+
+
+def test_intern_pool_bounded():
+    pool = InternPool(threshold=1, max_size=4)
+    for i in range(10):
+        pool.content(f"content {i}")
+
+    stats = pool.stats()
+    assert stats["pooled"] == 4
+    assert stats["evictions"] == 6
+
+
+def test_intern_disabled_by_default():
+    assert get_intern_pool() is None
+
+
+def test_file_source_interning(tmp_path):
+    path = tmp_path / "data.jsonl"
+    record = {
+        "messages": [
+            {"role": "system", "content": "shared system prompt"},
+            {"role": "user", "content": "hi"},
+        ]
+    }
+    path.write_text("\n".join(json.dumps(record) for _ in range(3)))
+
+    with config.switch(intern_strings=True, intern_threshold=2):
+        before = intern_stats()["content_hits"]
+        convs = list(FileSource(path=path, format="jsonl").load())
+        assert intern_stats()["content_hits"] > before
+
+    assert convs[1].messages[0].content is convs[2].messages[0].content
+    assert convs[1].messages[0].role is convs[2].messages[0].role
+
+
+def test_formatter_interning():
+    data = {"conversations": [{"from": "human", "value": "same"}]}
+    fmt = ShareGPTFormatter()
+
+    with config.switch(intern_strings=True, intern_threshold=1):
+        c1 = fmt.parse(json.loads(json.dumps(data)))
+        c2 = fmt.parse(json.loads(json.dumps(data)))
+
+    assert c1.messages[0].content is c2.messages[0].content
+    assert c1.messages[0].role == "user"
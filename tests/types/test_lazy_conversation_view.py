@@ -40,3 +40,46 @@ def test_lazy_message_view():
 
     conv = filtered.to_conversation()
     assert isinstance(conv, Conversation)
+
+
+def test_lazy_message_view_fused_and_memoized():
+    ml = MessageList([Message("user", str(i)) for i in range(10)])
+    calls = []
+
+    def upper(m):
+        calls.append(m.content)
+        return Message(m.role, m.content + "!")
+
+    view = LazyMessageView(ml)
+    view = view.filter(lambda m: int(m.content) % 2 == 0).map(upper)
+
+    # 下标访问只迭代到第一条存活消息
+    assert view[0].content == "0!"
+    assert calls == ["0"]
+
+    # 前向切片同样提前停止
+    calls.clear()
+    assert [m.content for m in view[1:2]] == ["2!"]
+    assert calls == ["0", "2"]
+
+    # len 物化一次后，后续的下标访问、repr 不再重新执行算子链
+    calls.clear()
+    assert len(view) == 5
+    assert len(calls) == 5
+    for i in range(len(view)):
+        view[i]
+    repr(view)
+    assert len(calls) == 5
+
+    # 源列表被修改后缓存失效
+    ml.append(Message("user", "10"))
+    assert len(view) == 6
+
+
+def test_lazy_message_view_legacy_ops():
+    ml = MessageList([Message("user", "a"), Message("assistant", "b")])
+    view = LazyMessageView(ml, [lambda msgs: reversed(list(msgs))]).map(
+        lambda m: Message(m.role, m.content.upper())
+    )
+    assert [m.content for m in view] == ["B", "A"]
+    assert view[-1].content == "A"
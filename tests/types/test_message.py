@@ -19,4 +19,26 @@ def test_message():
     assert m2 is not m
 
 
+def test_message_slots_and_lazy_metadata():
+    m = Message("user", "hi")
+    # slots 存储，不携带 __dict__
+    assert not hasattr(m, "__dict__")
+    # 未访问前不分配 metadata 字典
+    assert m._metadata is None
+    assert m.to_dict() == {"role": "user", "content": "hi", "metadata": {}}
+    assert m._metadata is None
+
+    m.metadata["lang"] = "en"
+    assert m.to_dict()["metadata"] == {"lang": "en"}
+    assert Message.from_dict(m.to_dict()) == m
+
+
+def test_message_shares_passed_metadata_dict():
+    # 与原 dataclass 一致：传入的字典 (即使为空) 与消息共享
+    md = {}
+    m = Message("user", "x", md)
+    md["k"] = 1
+    assert m.metadata == {"k": 1}
+
+
 test_message()
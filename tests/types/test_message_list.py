@@ -44,3 +44,56 @@ def test_message_list():
 
 
 test_message_list()
+
+
+def test_message_list_copy_on_write_slices():
+    msgs = [Message("user", str(i)) for i in range(6)]
+    ml = MessageList(msgs)
+
+    view = ml[1:4]
+    tail = ml.last(2)
+    # 切片共享底层存储，不复制
+    assert view._messages is ml._messages
+    assert [m.content for m in view] == ["1", "2", "3"]
+    assert [m.content for m in tail] == ["4", "5"]
+    assert view[-1].content == "3"
+    assert [m.content for m in view[1:]] == ["2", "3"]
+    assert ml.last(0) == ml  # 与 list[-0:] 行为一致
+
+    # 写入视图不影响原列表
+    view.append(Message("user", "x"))
+    view[0] = Message("user", "y")
+    assert [m.content for m in view] == ["y", "2", "3", "x"]
+    assert [m.content for m in ml] == ["0", "1", "2", "3", "4", "5"]
+
+    # 写入原列表不影响已有视图
+    del ml[4]
+    ml.append(Message("user", "z"))
+    assert [m.content for m in tail] == ["4", "5"]
+    assert [m.content for m in ml] == ["0", "1", "2", "3", "5", "z"]
+
+
+def test_small_slices_do_not_retain_backing_list():
+    ml = MessageList([Message("user", str(i)) for i in range(10)])
+
+    # 不足底层列表一半的切片直接复制，不会拖住整个列表
+    tail = ml.last(2)
+    assert tail._messages is not ml._messages
+    assert len(tail._messages) == 2
+    assert [m.content for m in tail] == ["8", "9"]
+
+    # 视图的小切片同样按底层列表的长度判断
+    view = ml[2:]
+    assert view._messages is ml._messages
+    assert len(view[1:3]._messages) == 2
+
+
+def test_conversation_slice_shares_storage():
+    conv = Conversation([Message("user", str(i)) for i in range(4)])
+    head = conv[:2]
+
+    assert isinstance(head, Conversation)
+    assert head.messages._messages is conv.messages._messages
+    head.messages.append(Message("assistant", "new"))
+    assert len(conv.messages) == 4
+    assert len(head.messages) == 3
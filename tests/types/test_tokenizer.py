@@ -0,0 +1,101 @@
+import pytest
+from chatbot_dataset_tools.config import config
+from chatbot_dataset_tools.registry import register_tokenizer
+from chatbot_dataset_tools.types import (
+    Message,
+    Conversation,
+    BaseTokenizer,
+    get_tokenizer,
+    count_tokens,
+)
+
+
+class CountingTokenizer(BaseTokenizer):
+    """记录实际被编码的文本，用于验证缓存命中"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.seen = []
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def count_batch(self, texts):
+        self.seen.append(list(texts))
+        return super().count_batch(texts)
+
+
+def test_builtin_tokenizers():
+    assert get_tokenizer("whitespace").count("a  b\nc") == 3
+    assert get_tokenizer("bytes").count("abcde") == 2
+    # 中文按 UTF-8 字节计数：两个汉字 6 字节
+    assert get_tokenizer("bytes").count("你好") == 2
+    assert get_tokenizer("regex").count("Hello, world!") == 4
+
+
+def test_tokenizer_from_config():
+    with config.switch(tokenizer="bytes"):
+        assert get_tokenizer().name == "bytes"
+    assert get_tokenizer().name == "whitespace"
+
+
+def test_count_tokens_batches_and_caches():
+    tok = CountingTokenizer()
+    msgs = [Message("user", "a b"), Message("assistant", "c d e")]
+
+    assert count_tokens(msgs, tok) == [2, 3]
+    assert tok.seen == [["a b", "c d e"]]
+
+    # 第二次全部命中缓存
+    assert count_tokens(msgs, tok) == [2, 3]
+    assert len(tok.seen) == 1
+
+    # 修改内容只会重新计算被修改的那条
+    msgs[1].content = "f"
+    assert count_tokens(msgs, tok) == [2, 1]
+    assert tok.seen[-1] == ["f"]
+
+
+def test_cache_does_not_keep_replaced_content():
+    msg = Message("user", "a b c")
+    msg.token_count()
+    # 缓存只保存计数，重新赋值后旧文本不再被引用
+    assert msg._tokens == ("whitespace", 3)
+    msg.content = "x"
+    assert msg._tokens is None
+    assert msg.token_count() == 1
+
+
+def test_cache_keyed_by_tokenizer():
+    msg = Message("user", "abcdefgh")
+    assert msg.token_count("whitespace") == 1
+    assert msg.token_count("bytes") == 2
+    assert msg.token_count("whitespace") == 1
+
+
+def test_conversation_token_count():
+    conv = Conversation([Message("user", "a b c"), Message("assistant", "d")])
+    assert conv.token_count() == 4
+    # copy 不携带缓存，修改副本的内容不会读到旧的计数
+    copied = conv.messages[0].copy()
+    assert copied._tokens is None
+    copied.content = "a"
+    assert copied.token_count() == 1
+    assert conv.messages[0].token_count() == 3
+
+
+def test_register_custom_tokenizer():
+    @register_tokenizer("chars-test")
+    class CharsTokenizer(BaseTokenizer):
+        name = "chars-test"
+
+        def count(self, text: str) -> int:
+            return len(text)
+
+    assert Message("user", "abc").token_count("chars-test") == 3
+
+
+def test_unknown_tokenizer():
+    with pytest.raises(Exception):
+        get_tokenizer("no-such-tokenizer")